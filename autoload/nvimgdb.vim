@@ -20,6 +20,11 @@ function! nvimgdb#ClearAugroup(name)
 endfunction
 
 
+function! nvimgdb#MatchLines(pattern)
+  return filter(range(1, line('$')), {_, l -> getline(l) =~ a:pattern})
+endfunction
+
+
 function! s:GetExpression(...) range
   let [lnum1, col1] = getpos("'<")[1:2]
   let [lnum2, col2] = getpos("'>")[1:2]
@@ -33,21 +38,28 @@ endfunction
 "Shared global state initialization (commands, keymaps etc)
 function! nvimgdb#GlobalInit()
   command! GdbDebugStop call GdbCleanup(nvim_get_current_tabpage())
-  command! GdbBreakpointToggle call GdbBreakpointToggle()
+  command! -range GdbBreakpointToggle call GdbBreakpointToggle(<line1>, <line2>)
+  command! -nargs=1 -bang GdbBreakpointPattern call GdbCallAsync('breakpoint_pattern', <q-args>, '<bang>')
   command! GdbBreakpointClearAll call GdbBreakpointClearAll()
-  command! GdbFrame call GdbSend('f')
+  command! -nargs=+ GdbBreakpointEnable call GdbCallAsync('breakpoint_enable', v:true, <f-args>)
+  command! -nargs=* GdbBreakpointDisable call GdbCallAsync('breakpoint_enable', v:false, <f-args>)
+  command! GdbFrame call GdbCallAsync('views.frames.show')
   command! GdbRun call GdbSend('run')
   command! GdbUntil call GdbSend('until {}', line('.'))
   command! GdbContinue call GdbSend('c')
   command! GdbNext call GdbSend('n')
   command! GdbStep call GdbSend('s')
   command! GdbFinish call GdbSend('finish')
-  command! GdbFrameUp call GdbSend('up')
-  command! GdbFrameDown call GdbSend('down')
+  command! GdbFrameUp call GdbCallAsync('views.frames.up')
+  command! GdbFrameDown call GdbCallAsync('views.frames.down')
   command! GdbInterrupt call GdbSend()
   command! GdbEvalWord call GdbSend('print {}', expand('<cword>'))
   command! -range GdbEvalRange call GdbSend('print {}', s:GetExpression(<f-args>))
   command! -nargs=1 GdbCreateWatch call GdbCreateWatch(<q-args>)
+  command! GdbLocals call GdbCallAsync('views.locals.open')
+  command! -nargs=1 GdbMemory call GdbCallAsync('views.memory.open', <q-args>)
+  command! GdbDisassembly call GdbCallAsync('views.disassembly.open')
+  command! -nargs=? -complete=file GdbProfile call GdbCallAsync('profiler.show', <q-args>)
   command! GdbLopenBacktrace call GdbCallAsync('lopen', 'backtrace', '<mods>')
   command! GdbLopenBreakpoints call GdbCallAsync('lopen', 'breakpoints', '<mods>')
 
@@ -58,6 +70,8 @@ function! nvimgdb#GlobalInit()
     au BufEnter * call GdbHandleEvent("on_buf_enter")
     au BufLeave * call GdbHandleEvent("on_buf_leave")
     au TabClosed * call GdbHandleTabClosed()
+    au DirChanged * call GdbHandlePathEvent("on_dir_changed", getcwd())
+    au BufWipeout,BufFilePost * call GdbHandlePathEvent("on_buf_changed", str2nr(expand("<abuf>")))
     au VimLeavePre * call GdbHandleVimLeavePre()
   augroup END
 
@@ -82,7 +96,10 @@ function! nvimgdb#GlobalCleanup()
   " Cleanup user commands and keymaps
   delcommand GdbDebugStop
   delcommand GdbBreakpointToggle
+  delcommand GdbBreakpointPattern
   delcommand GdbBreakpointClearAll
+  delcommand GdbBreakpointEnable
+  delcommand GdbBreakpointDisable
   delcommand GdbFrame
   delcommand GdbRun
   delcommand GdbUntil
@@ -96,6 +113,10 @@ function! nvimgdb#GlobalCleanup()
   delcommand GdbEvalWord
   delcommand GdbEvalRange
   delcommand GdbCreateWatch
+  delcommand GdbLocals
+  delcommand GdbMemory
+  delcommand GdbDisassembly
+  delcommand GdbProfile
   delcommand GdbLopenBacktrace
   delcommand GdbLopenBreakpoints
 endfunction
@@ -8,6 +8,7 @@ to a user.
 import abc
 import argparse
 import array
+import collections
 import errno
 import fcntl
 import logging
@@ -17,16 +18,22 @@ import re
 import select
 import signal
 import socket
+import tempfile
 import termios
 import tty
 from typing import Union
 
+import capture
+import ring_log
 import stream_filter
 
 
 class BaseProxy:
     """This class does the actual work of the pseudo terminal."""
 
+    # How long a batch of side commands may keep the debugger silent
+    BATCH_PATIENCE = 30.
+
     def __init__(self, app_name: str):
         """Create a spawned process."""
         parser = argparse.ArgumentParser(
@@ -38,13 +45,20 @@ class BaseProxy:
         args = parser.parse_args()
 
         self.server_address: str = args.address
-        self.argv = args.cmd
-        log_handler = logging.NullHandler() if not os.environ.get('CI') \
-                else logging.FileHandler("proxy.log")
+        self.argv = self.prepare_argv(args.cmd)
+        # Keep the last records in memory to dump them on errors or when
+        # requested by the plugin. The debug records, like every chunk of
+        # the debugger output, are enabled at runtime.
+        self.log_handler = ring_log.RingHandler(
+            10000, os.path.join(tempfile.gettempdir(),
+                                f"nvimgdb-proxy-{os.getpid()}.log"))
+        log_handlers = [self.log_handler]
+        if os.environ.get('CI'):
+            log_handlers.append(logging.FileHandler("proxy.log"))
         logging.basicConfig(
-            level=logging.DEBUG,
-            format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-            handlers=[log_handler])
+            level=logging.DEBUG if os.environ.get('CI') else logging.INFO,
+            format=ring_log.FORMAT,
+            handlers=log_handlers)
         self.logger = logging.getLogger(type(self).__name__)
         self.logger.info("Starting proxy: %s", app_name)
 
@@ -55,10 +69,24 @@ class BaseProxy:
             self.sock.bind(self.server_address)
             self.sock.settimeout(0.5)
 
+        # Tee the session into the session directory for offline replay,
+        # the plugin moves it to $NVIMGDB_CAPTURE in the end
+        self.capture: Union[capture.Writer, None] = None
+        capture_dir = os.environ.get('NVIMGDB_CAPTURE')
+        if self.server_address and capture_dir and os.path.isdir(capture_dir):
+            self.capture = capture.Writer(
+                os.path.join(os.path.dirname(self.server_address), 'capture'),
+                app_name)
+
         # Create the filter
         self.filter = [(stream_filter.Filter(), lambda _: None)]
         # Where was the last command received from?
         self.last_addr = None
+        # The id of the last command to tag the response with
+        self.last_id = b''
+        # Side commands waiting for the current one to finish:
+        # [(id, command, addr)]
+        self.pending = collections.deque()
 
         # Spawn the process in a PTY
         pid, self.master_fd = pty.fork()
@@ -92,6 +120,10 @@ class BaseProxy:
             self.master_fd = None
             signal.signal(signal.SIGWINCH, old_handler)
 
+            if self.capture:
+                self.capture.close()
+                self.capture = None
+
             if self.server_address:
                 # Make sure the socket does not already exist
                 try:
@@ -99,6 +131,10 @@ class BaseProxy:
                 except OSError:
                     pass
 
+    def prepare_argv(self, argv):
+        """Adjust the debugger command line if necessary."""
+        return argv
+
     def set_filter(self, filt, handler):
         """Push a new filter with given handler."""
         self.logger.info("set_filter %s %s", str(filt), str(handler))
@@ -109,6 +145,7 @@ class BaseProxy:
             if self.filter:
                 self._timeout()
             self.filter.append((filt, handler))
+            self._capture(capture.FILTER, filt.matcher.pattern)
             return True
         self.logger.warning("filter rejected")
         return False
@@ -128,16 +165,26 @@ class BaseProxy:
         return result
 
     def filter_command(self, command):
-        """Prepare a requested command for execution."""
+        """Prepare a requested command for execution.
+
+        The output of "handle-command" is expected without a pause,
+        "handle-batch" may run silently for BATCH_PATIENCE seconds.
+        """
         tokens = re.split(r'\s+', command.decode('utf-8'))
-        if tokens[0] == 'handle-command':
-            cmd = command[len('handle-command '):]
+        if tokens[0] in ('handle-command', 'handle-batch'):
+            cmd = self.prepare_command(command[len(tokens[0]) + 1:])
+            patience = self.BATCH_PATIENCE \
+                if tokens[0] == 'handle-batch' else 0.
             res = self.set_filter(
-                stream_filter.StreamFilter(self.get_prompt()),
+                stream_filter.StreamFilter(self.get_prompt(), patience),
                 lambda resp: self.process_handle_command(cmd, resp))
             return cmd if res else b''
         return command
 
+    def prepare_command(self, command):
+        """Adjust the side command for the debugger if necessary."""
+        return command
+
     def _set_pty_size(self):
         """Set the window size of the child pty."""
         assert self.master_fd is not None
@@ -170,23 +217,58 @@ class BaseProxy:
             # breaking into user input.
             if self.master_fd in rfds:
                 data = os.read(self.master_fd, 1024)
+                self._capture(capture.OUTPUT, data)
                 self.master_read(data)
             elif pty.STDIN_FILENO in rfds:
                 data = os.read(pty.STDIN_FILENO, 1024)
+                self._capture(capture.INPUT, data)
                 self.stdin_read(data)
             elif self.sock in rfds:
-                data, self.last_addr = self.sock.recvfrom(65536)
-                if data[-1] == b'\n':
-                    self.logger.warning(
-                        "The command ending with <nl>. "
-                        "The StreamProxy filter known to fail.")
-                self.logger.info("Got command '%s'", data.decode('utf-8'))
-                command = self.filter_command(data)
-                self.logger.info("Translated command '%s'",
-                                 command.decode('utf-8'))
-                if command:
-                    self.write_master(command)
-                    self.write_master(b'\n')
+                data, addr = self.sock.recvfrom(65536)
+                self._capture(capture.REQUEST, data)
+                # Every request is tagged: "<id> <command>"
+                req_id, _, command = data.partition(b' ')
+                if command.startswith(b'nvim-gdb-log-'):
+                    self._serve_log(req_id, command, addr)
+                    return
+                self.pending.append((req_id, command, addr))
+                self._dispatch_pending()
+
+    def _serve_log(self, req_id, command, addr):
+        """Serve the logging requests without the debugger."""
+        request, _, args = command.decode('utf-8').partition(' ')
+        res = b''
+        try:
+            if request == 'nvim-gdb-log-level':
+                level, _, name = args.partition(' ')
+                logging.getLogger(name.strip()).setLevel(level)
+                res = b'ok'
+            elif request == 'nvim-gdb-log-dump':
+                res = str(self.log_handler.dump(args)).encode('utf-8')
+        except (ValueError, OSError):
+            self.logger.warning("Failed to serve %s", request, exc_info=True)
+        self.sock.sendto(req_id + b' ' + res, 0, addr)
+
+    def _dispatch_pending(self):
+        """Execute the next side command if none is in progress."""
+        while self.pending and len(self.filter) == 1:
+            self.last_id, data, self.last_addr = self.pending.popleft()
+            if data[-1:] == b'\n':
+                self.logger.warning(
+                    "The command ending with <nl>. "
+                    "The StreamProxy filter known to fail.")
+            self.logger.info("Got command %s '%s'", self.last_id,
+                             data.decode('utf-8'))
+            command = self.filter_command(data)
+            self.logger.info("Translated command '%s'",
+                             command.decode('utf-8'))
+            if command:
+                self.write_master(command)
+                self.write_master(b'\n')
+
+    def _capture(self, kind: bytes, data: bytes):
+        if self.capture:
+            self.capture.write(kind, data)
 
     @staticmethod
     def _write(fdesc, data):
@@ -197,11 +279,19 @@ class BaseProxy:
 
     def _timeout(self):
         filt, _ = self.filter[-1]
+        if len(self.filter) > 1 and not filt.is_expired():
+            # A batch is still running
+            return
         data = filt.timeout()
         self._write(pty.STDOUT_FILENO, data)
         # Get back to the passthrough filter on timeout
         if len(self.filter) > 1:
             self.filter.pop()
+            self._capture(capture.TIMEOUT, b'')
+            # Don't keep the client waiting for the response
+            if self.sock and self.last_addr:
+                self.sock.sendto(self.last_id + b' ', 0, self.last_addr)
+            self._dispatch_pending()
 
     def write_stdout(self, data):
         """Write to stdout for the child process."""
@@ -215,7 +305,9 @@ class BaseProxy:
             assert callable(handler)
             res = handler(filtered)
             self.logger.debug("Sending to %s: %s", self.last_addr, res)
-            self.sock.sendto(res, 0, self.last_addr)
+            self._capture(capture.RESPONSE, self.last_id + b' ' + res)
+            self.sock.sendto(self.last_id + b' ' + res, 0, self.last_addr)
+            self._dispatch_pending()
 
     def write_master(self, data):
         """Write to the child process from its controlling terminal."""
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark the parsing of the breakpoint tables.
+
+Realistic tables of GDB, PDB and BashDB are generated with the given
+number of entries: multiple locations, pending and disabled breakpoints,
+hit counts, long paths. Every backend parser is timed, as well as
+the whole Breakpoint.query() path up to the signs. Each timing is the
+median of several runs of a batch of calls lasting MIN_BATCH at least,
+normalized by a calibration loop run just before to be comparable
+between machines, and checked against a baseline if any.
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'rplugin', 'python3'))
+
+# pylint: disable=wrong-import-position
+from gdb.common import BaseCommon                 # noqa: E402
+from gdb.breakpoint import Breakpoint             # noqa: E402
+from gdb.pathmgr import PathMgr                   # noqa: E402
+from gdb.profiler import Profiler                 # noqa: E402
+from gdb.backend.gdb import Gdb                   # noqa: E402
+from gdb.backend.pdb import Pdb                   # noqa: E402
+from gdb.backend.bashdb import BashDB             # noqa: E402
+from fakes import FakeVim, FakeConfig, FakeProxy, FakeWorker  # noqa: E402
+
+
+BACKENDS = {"gdb": Gdb, "pdb": Pdb, "bashdb": BashDB}
+SIZES = [10, 1000, 100000]
+
+# The shortest batch of calls to time, the small tables are parsed in
+# microseconds, which is below the timer noise
+MIN_BATCH = 0.01
+
+_EXTENSIONS = {"gdb": ".cpp", "pdb": ".py", "bashdb": ".sh"}
+
+# {line -> [id]}
+Breaks = Dict[str, List[str]]
+
+
+def generate(backend: str, count: int,
+             seed: int = 0) -> Tuple[str, str, Breaks]:
+    """Generate a breakpoint table with count entries.
+
+    Returns the table, the file of interest and the breakpoints
+    expected to be parsed for it.
+    """
+    rnd = random.Random(seed)
+    ext = _EXTENSIONS[backend]
+    root = "/home/user/projects/" + "/".join(
+        f"component{i}" for i in range(8))
+    files = [f"{root}/module{i}/source_file_{i}{ext}" for i in range(50)]
+    target = files[0]
+    expected: Breaks = {}
+
+    def expect(fname, line, bid):
+        if fname == target:
+            expected.setdefault(str(line), []).append(bid)
+
+    rows = []
+    if backend == "gdb":
+        rows.append("Num     Type           Disp Enb Address            What")
+    elif backend == "pdb":
+        rows.append("Num Type         Disp Enb   Where")
+    else:
+        rows.append("Num Type       Disp Enb What")
+    for bid in range(1, count + 1):
+        kind = rnd.random()
+        fname = rnd.choice(files)
+        line = rnd.randint(1, 5000)
+        enabled = rnd.random() > 0.15
+        if backend == "gdb":
+            addr = f"0x{rnd.getrandbits(48):016x}"
+            if kind < 0.1:
+                rows.append(f"{bid:<7} breakpoint     keep y   <MULTIPLE>")
+                for loc in range(1, rnd.randint(2, 4) + 1):
+                    fname = rnd.choice(files)
+                    line = rnd.randint(1, 5000)
+                    enb = 'y' if rnd.random() > 0.2 else 'n'
+                    rows.append(f"{bid}.{loc:<5}                      {enb}"
+                                f"   {addr} in func{loc}(int) at"
+                                f" {fname}:{line}")
+                    if enb == 'y':
+                        expect(fname, line, str(bid))
+            elif kind < 0.15:
+                rows.append(f"{bid:<7} breakpoint     keep y   <PENDING>"
+                            f"          missing{ext}:{line}")
+            else:
+                enb = 'y' if enabled else 'n'
+                rows.append(f"{bid:<7} breakpoint     keep {enb}   {addr}"
+                            f" in func(int) at {fname}:{line}")
+                if enabled:
+                    expect(fname, line, str(bid))
+        elif backend == "pdb":
+            enb = 'yes' if enabled else 'no '
+            rows.append(f"{bid:<3} breakpoint   keep {enb}   at"
+                        f" {fname}:{line}")
+            if enabled:
+                expect(fname, line, str(bid))
+        else:
+            enb = 'y' if enabled else 'n'
+            rows.append(f"{bid:<3} breakpoint keep {enb}   {fname}:{line}")
+            if enabled:
+                expect(fname, line, str(bid))
+        if rnd.random() < 0.3:
+            hits = rnd.randint(1, 100)
+            rows.append(f"\tbreakpoint already hit {hits}"
+                        f" time{'s' if hits > 1 else ''}")
+    return "\n".join(rows), target, expected
+
+
+def _time(func: Callable[[], object], number: int) -> float:
+    # The collections of the garbage of the previous runs are noise
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def _median_of(func: Callable[[], object], repeat: int) -> float:
+    """Get the median time of a call over several batches."""
+    number = 1
+    while _time(func, number) < MIN_BATCH:
+        number *= 2
+    return statistics.median(_time(func, number)
+                             for _ in range(repeat)) / number
+
+
+def calibrate(repeat: int = 7) -> float:
+    """Time a fixed line-splitting workload to normalize the results."""
+    text = "\n".join(f"{i:<7} breakpoint keep y /tmp/file{i}.c:{i}"
+                     for i in range(10000))
+    pattern = re.compile(r"([^:]+):(\d+)")
+
+    def work():
+        for line in text.splitlines():
+            pattern.fullmatch(re.split(r"\s+", line)[-1])
+    return _median_of(work, repeat)
+
+
+def run(backend: str, count: int, repeat: int = 5) -> Dict[str, float]:
+    """Time the parser and the whole query path for the table size.
+
+    The parsed breakpoints are verified against the generated ones.
+    """
+    table, target, expected = generate(backend, count)
+    vim = FakeVim(getcwd=os.getcwd, expand=lambda _: target,
+                  stdpath=lambda _: tempfile.gettempdir(),
+                  sign_place=lambda *_: 0, sign_unplace=lambda *_: 0)
+    common = BaseCommon(vim, FakeConfig())
+    pathmgr = PathMgr(common)
+    proxy = FakeProxy(table)
+    impl = BACKENDS[backend]().create_breakpoint_impl(proxy, None, pathmgr)
+    breaks = impl.query(target)
+    if breaks != expected:
+        raise AssertionError(f"{backend} parsed the table wrongly")
+    breakpoint = Breakpoint(common, proxy, impl, pathmgr, FakeWorker(),
+                            Profiler(common))
+    return {
+        "parse": _median_of(lambda: impl.query(target), repeat),
+        "query": _median_of(lambda: breakpoint.query(1, target), repeat),
+    }
+
+
+def measure(backend: str, size: int, repeat: int) -> Dict[str, float]:
+    """Get the normalized timings {backend/stage/size -> units}."""
+    # Calibrate next to the measurement, the speed drifts
+    unit = calibrate()
+    results = {}
+    for name, seconds in run(backend, size, repeat).items():
+        key = f"{backend}/{name}/{size}"
+        results[key] = seconds / unit
+        print(f"{key:<24} {seconds * 1e3:10.3f} ms"
+              f" {seconds / unit:10.4f} units")
+    return results
+
+
+def load(path: str) -> Dict[str, float]:
+    """Load the saved results."""
+    with open(path, encoding='utf-8') as baseline_file:
+        return json.load(baseline_file)
+
+
+def regressions(results: Dict[str, float], baseline: Dict[str, float],
+                threshold: float, retries: int, repeat: int) -> List[str]:
+    """Get the keys of the results slower than the baseline.
+
+    A regression must reproduce, a single slow run is noise: the suspects
+    are measured again, and the best timing is kept in the results.
+    """
+    def slow(key):
+        base = baseline.get(key)
+        return base is not None and results[key] > base * (1 + threshold)
+
+    for _ in range(retries):
+        suspects = {tuple(key.split('/')[::2])
+                    for key in results if slow(key)}
+        for backend, size in sorted(suspects):
+            print(f"Measure {backend}/{size} again")
+            for key, value in measure(backend, int(size), repeat).items():
+                results[key] = min(results[key], value)
+    return [key for key in results if slow(key)]
+
+
+def main():
+    """Run the benchmark, compare with the baseline."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the breakpoint table parsers.")
+    parser.add_argument('-b', '--backend', action='append',
+                        choices=sorted(BACKENDS),
+                        help='backends to benchmark, all by default')
+    parser.add_argument('-s', '--size', action='append', type=int,
+                        help=f'table sizes, {SIZES} by default')
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='take the median of several runs')
+    parser.add_argument('--baseline', metavar='FILE',
+                        help='compare with the saved results')
+    parser.add_argument('--threshold', type=float, default=0.5,
+                        help='the relative slowdown considered a regression')
+    parser.add_argument('--retries', type=int, default=2,
+                        help='measure a regression again to confirm it')
+    parser.add_argument('--save', metavar='FILE',
+                        help='save the results as a new baseline')
+    args = parser.parse_args()
+
+    results: Dict[str, float] = {}
+    for backend in args.backend or sorted(BACKENDS):
+        for size in args.size or SIZES:
+            results.update(measure(backend, size, args.repeat))
+
+    failed = False
+    if args.baseline:
+        baseline = load(args.baseline)
+        for key in regressions(results, baseline, args.threshold,
+                               args.retries, args.repeat):
+            print(f"REGRESSION {key}: {results[key]:.4f} units,"
+                  f" baseline {baseline[key]:.4f}")
+            failed = True
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as save_file:
+            json.dump(results, save_file, indent=2, sort_keys=True)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
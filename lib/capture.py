@@ -0,0 +1,61 @@
+"""Capture of a debugger session for offline replay.
+
+The proxy tees everything it sees into a compact binary file: a sequence
+of records (timestamp: double, kind: byte, length: uint32, payload).
+The kinds are defined below. See replay.py for the consumer.
+"""
+
+import struct
+import time
+from typing import BinaryIO, Iterator, Tuple
+
+
+# The name of the debugger, the first record
+HEADER = b'h'
+# The bytes read from the debugger pty
+OUTPUT = b'o'
+# The bytes typed by the user
+INPUT = b'i'
+# A side channel request: "<id> <command>"
+REQUEST = b'q'
+# A filter pushed to conceal the output of a side command: the prompt regex
+FILTER = b'f'
+# The filter has been dropped on timeout
+TIMEOUT = b't'
+# A side channel response: "<id> <payload>"
+RESPONSE = b'r'
+
+_RECORD = struct.Struct('<dcI')
+
+
+class Writer:
+    """Append the records to a capture file."""
+
+    def __init__(self, path: str, app_name: str):
+        """ctor."""
+        self.file: BinaryIO = open(path, 'wb')
+        self.write(HEADER, app_name.encode('utf-8'))
+
+    def write(self, kind: bytes, data: bytes):
+        """Record the data of the given kind timestamped now."""
+        self.file.write(_RECORD.pack(time.monotonic(), kind, len(data)))
+        self.file.write(data)
+
+    def close(self):
+        """Flush and close the file."""
+        self.file.close()
+
+
+def read(path: str) -> Iterator[Tuple[float, bytes, bytes]]:
+    """Iterate over the records of a capture: (timestamp, kind, data)."""
+    with open(path, 'rb') as capture:
+        while True:
+            head = capture.read(_RECORD.size)
+            if len(head) < _RECORD.size:
+                return
+            timestamp, kind, length = _RECORD.unpack(head)
+            data = capture.read(length)
+            if len(data) < length:
+                # The session was interrupted in the middle of a record
+                return
+            yield timestamp, kind, data
@@ -0,0 +1,23 @@
+'''Fixtures for the unit tests.'''
+
+# pylint: disable=redefined-outer-name
+
+import os
+import sys
+import pytest
+
+# The plugin classes are tested with fake editors
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'rplugin', 'python3'))
+
+# pylint: disable=wrong-import-position
+from gdb.common import BaseCommon                 # noqa: E402
+from fakes import FakeVim, FakeConfig             # noqa: E402
+
+
+@pytest.fixture(scope='function')
+def common(tmp_path):
+    '''Supply the context with a fake editor.'''
+    vim = FakeVim(getcwd=lambda: str(tmp_path),
+                  stdpath=lambda _: str(tmp_path / "cache"))
+    return BaseCommon(vim, FakeConfig())
@@ -0,0 +1,77 @@
+'''The fake editor and collaborators for the tests and the benchmarks.
+
+The plugin package rplugin/python3 must be importable.
+'''
+
+from typing import Callable, Dict, List
+
+from gdb.config import Config
+
+
+class FakeVim:
+    '''Just enough of the editor: the calls are answered by the handlers.
+
+    The commands are remembered, the calls scheduled to the main loop
+    are executed right away.
+    '''
+
+    class _Tabpage:
+        handle = 1
+
+    class _Current:
+        def __init__(self):
+            self.tabpage = FakeVim._Tabpage()
+
+    def __init__(self, **handlers: Callable):
+        self.handlers: Dict[str, Callable] = handlers
+        self.commands: List[str] = []
+        self.current = self._Current()
+
+    def call(self, func: str, *args):
+        '''Answer the function call.'''
+        return self.handlers[func](*args)
+
+    def command(self, cmd: str):
+        '''Remember the command.'''
+        self.commands.append(cmd)
+
+    @staticmethod
+    def async_call(func, *args):
+        '''Execute the function right away.'''
+        func(*args)
+
+
+class FakeConfig:
+    '''The defaults only.'''
+
+    @staticmethod
+    def get(key: str):
+        '''Get the default setting.'''
+        return Config.default[key]
+
+    @staticmethod
+    def get_or(_key: str, val):
+        '''Take the default.'''
+        return val
+
+
+class FakeProxy:
+    '''Answer every query with the same response.'''
+
+    def __init__(self, response: str):
+        self.response = response
+        self.requests: List[str] = []
+
+    def query(self, request: str, timeout: float = 0.5):
+        '''Respond immediately.'''
+        self.requests.append(request)
+        return self.response if timeout else None
+
+
+class FakeWorker:
+    '''Execute the jobs right away.'''
+
+    @staticmethod
+    def submit(func, *args):
+        '''Execute the job.'''
+        func(*args)
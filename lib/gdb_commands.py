@@ -0,0 +1,469 @@
+"""The commands injected into GDB to answer the plugin requests in JSON.
+
+The plugin runs them through the proxy, so the output never reaches
+the terminal: handle-command nvim-gdb-<request> [arguments]. The errors
+are reported as {"_error": message}.
+"""
+
+import abc
+import itertools
+import json
+import re
+import gdb  # type: ignore
+
+
+def _frame_info(level: int, frame: gdb.Frame):
+    info = {"level": level, "function": frame.name() or "??",
+            "address": hex(frame.pc())}
+    sal = frame.find_sal()
+    if sal.symtab is not None:
+        info["file"] = sal.symtab.fullname()
+        info["line"] = sal.line
+    return info
+
+
+def _frame_level(frame: gdb.Frame) -> int:
+    level = 0
+    while frame.newer() is not None:
+        frame = frame.newer()
+        level += 1
+    return level
+
+
+class _FrameWalk:
+    """The frame the last walk down the stack reached at this stop.
+
+    The frames are unwound one by one from the newest, so the walk goes
+    on from where the previous one ended, and the pages of a deep stack
+    cost as many unwinds as the stack has frames.
+    """
+
+    def __init__(self):
+        self.level = 0
+        self.frame = None
+        gdb.events.stop.connect(self.reset)
+        gdb.events.cont.connect(self.reset)
+        gdb.events.exited.connect(self.reset)
+
+    def reset(self, _event=None):
+        """Forget the frames when the program moves on."""
+        self.level = 0
+        self.frame = None
+
+    def frame_at(self, level: int):
+        """Find the frame by the level, None if the stack is shallower."""
+        if self.frame is None or level < self.level or \
+                not self.frame.is_valid():
+            self.level = 0
+            self.frame = gdb.newest_frame()
+        while self.level < level:
+            older = self.frame.older()
+            if older is None:
+                return None
+            self.level += 1
+            self.frame = older
+        return self.frame
+
+
+_WALK = _FrameWalk()
+
+
+def _frame_at(level: int) -> gdb.Frame:
+    frame = _WALK.frame_at(level)
+    if frame is None:
+        raise ValueError(f"No frame at level {level}")
+    return frame
+
+
+# The longest value description sent to the plugin
+_MAX_VALUE = 256
+# The code disassembled around the pc outside of the known functions
+_DISASSEMBLY_PAGE = 256
+
+
+def _describe(value: gdb.Value) -> str:
+    """Describe the value briefly: aggregates aren't printed whole."""
+    # pylint: disable=broad-except
+    try:
+        printer = gdb.default_visualizer(value)
+        if printer is not None:
+            text = printer.to_string() if hasattr(printer, "to_string") \
+                else None
+            if text is None:
+                return "{...}"
+            if isinstance(text, gdb.Value):
+                text = text.format_string(max_elements=0)
+            text = str(text)
+        else:
+            code = value.type.strip_typedefs().code
+            if code in (gdb.TYPE_CODE_STRUCT, gdb.TYPE_CODE_UNION):
+                text = "{...}"
+            elif code == gdb.TYPE_CODE_ARRAY:
+                low, high = value.type.strip_typedefs().range()
+                text = f"[{high - low + 1}]"
+            else:
+                text = value.format_string(max_elements=16)
+    except Exception as ex:
+        text = f"<error: {ex}>"
+    if len(text) > _MAX_VALUE:
+        text = text[:_MAX_VALUE] + "..."
+    return text
+
+
+def _is_expandable(value: gdb.Value) -> bool:
+    printer = gdb.default_visualizer(value)
+    if printer is not None:
+        return hasattr(printer, "children")
+    vtype = value.type.strip_typedefs()
+    if vtype.code in (gdb.TYPE_CODE_STRUCT, gdb.TYPE_CODE_UNION):
+        return bool(vtype.fields())
+    if vtype.code == gdb.TYPE_CODE_ARRAY:
+        low, high = vtype.range()
+        return high >= low
+    if vtype.code == gdb.TYPE_CODE_PTR:
+        target = vtype.target().strip_typedefs().code
+        return target not in (gdb.TYPE_CODE_VOID, gdb.TYPE_CODE_FUNC) \
+            and int(value) != 0
+    return False
+
+
+def _children(value: gdb.Value):
+    """Enumerate the children lazily: (name, value)."""
+    printer = gdb.default_visualizer(value)
+    if printer is not None:
+        if not hasattr(printer, "children"):
+            return
+        is_map = hasattr(printer, "display_hint") and \
+            printer.display_hint() == "map"
+        children = iter(printer.children())
+        for name, child in children:
+            if not isinstance(child, gdb.Value):
+                child = gdb.Value(child)
+            if is_map:
+                # The keys and the values alternate
+                _, val = next(children)
+                if not isinstance(val, gdb.Value):
+                    val = gdb.Value(val)
+                name, child = f"[{_describe(child)}]", val
+            yield name, child
+        return
+    vtype = value.type.strip_typedefs()
+    if vtype.code in (gdb.TYPE_CODE_STRUCT, gdb.TYPE_CODE_UNION):
+        for field in vtype.fields():
+            if not hasattr(field, "bitpos"):
+                # Skip the static members
+                continue
+            if field.is_base_class:
+                yield f"<{field.type}>", value.cast(field.type)
+            else:
+                yield field.name or "<anonymous>", value[field]
+    elif vtype.code == gdb.TYPE_CODE_ARRAY:
+        low, high = vtype.range()
+        for i in range(low, high + 1):
+            yield f"[{i}]", value[i]
+    elif vtype.code == gdb.TYPE_CODE_PTR:
+        yield "*", value.dereference()
+
+
+def _variable_info(path: str, name: str, value: gdb.Value):
+    try:
+        expandable = _is_expandable(value)
+    except gdb.error:
+        expandable = False
+    return {"name": name, "path": path, "type": str(value.type),
+            "value": _describe(value), "expandable": expandable}
+
+
+def _resolve(path: str) -> gdb.Value:
+    """Find the value by the path: variable/index/index..."""
+    name, *indices = path.split("/")
+    value = gdb.selected_frame().read_var(name)
+    for index in indices:
+        children = itertools.islice(_children(value), int(index), None)
+        try:
+            _, value = next(children)
+        except StopIteration as ex:
+            raise ValueError(f"No such child {path}") from ex
+    return value
+
+
+# The addresses of the enabled locations in the breakpoint table
+_ENABLED_ADDRESS = re.compile(r'\sy\s+(0x[0-9a-fA-F]+)\s')
+
+
+def _breakpoint_locations(bpt: gdb.Breakpoint):
+    """The source lines of the enabled locations: [[file, line]]."""
+    if not bpt.enabled or bpt.pending:
+        return []
+    if hasattr(bpt, "locations"):
+        # GDB 13 lists the locations
+        addresses = [loc.address for loc in bpt.locations if loc.enabled]
+    else:
+        table = gdb.execute(f"info breakpoints {bpt.number}",
+                            to_string=True)
+        addresses = [int(addr, 16)
+                     for addr in _ENABLED_ADDRESS.findall(table)]
+    locations = []
+    for address in addresses:
+        sal = gdb.find_pc_line(address)
+        if sal.symtab is not None:
+            locations.append([sal.symtab.fullname(), sal.line])
+    return locations
+
+
+def _find_breakpoints(ids):
+    """The user breakpoints with the ids, all of them if no ids."""
+    numbers = {int(bid) for bid in ids}
+    return [bpt for bpt in gdb.breakpoints() or ()
+            if bpt.number > 0 and (not ids or bpt.number in numbers)]
+
+
+class _Command(gdb.Command, metaclass=abc.ABCMeta):
+    """The base of the commands printing the result in JSON."""
+
+    # Whether the argument is passed as is or split into argv
+    verbatim = False
+
+    def __init__(self, request: str):
+        super().__init__("nvim-gdb-" + request, gdb.COMMAND_USER)
+
+    def invoke(self, argument, _from_tty):
+        # pylint: disable=broad-except
+        try:
+            result = self.query(argument if self.verbatim
+                                else gdb.string_to_argv(argument))
+        except Exception as ex:
+            result = {"_error": str(ex)}
+        gdb.write(json.dumps(result) + "\n")
+
+    @abc.abstractmethod
+    def query(self, args):
+        """Produce the result, it's serialized in JSON.
+
+        The args are the argument string if verbatim, otherwise the list
+        of the arguments.
+        """
+
+
+class _Stack(_Command):
+    """stack [start [count]]: the frames innermost first and the level
+    of the selected one."""
+
+    def __init__(self):
+        super().__init__("stack")
+
+    def query(self, args):
+        start = int(args[0]) if args else 0
+        end = start + int(args[1]) if len(args) > 1 else None
+        frames = []
+        level = start
+        while end is None or level < end:
+            frame = _WALK.frame_at(level)
+            if frame is None:
+                break
+            frames.append(_frame_info(level, frame))
+            level += 1
+        return {"selected": _frame_level(gdb.selected_frame()),
+                "frames": frames}
+
+
+class _SelectFrame(_Command):
+    """select-frame level: select the frame without printing it."""
+
+    def __init__(self):
+        super().__init__("select-frame")
+
+    def query(self, args):
+        level = int(args[0])
+        frame = _frame_at(level)
+        frame.select()
+        return _frame_info(level, frame)
+
+
+class _Locals(_Command):
+    """locals: the top-level variables of the selected frame."""
+
+    def __init__(self):
+        super().__init__("locals")
+
+    def query(self, args):
+        frame = gdb.selected_frame()
+        block = frame.block()
+        variables = []
+        seen = set()
+        while block is not None:
+            for symbol in block:
+                if not (symbol.is_variable or symbol.is_argument) or \
+                        symbol.name in seen:
+                    continue
+                seen.add(symbol.name)
+                variables.append(_variable_info(
+                    symbol.name, symbol.name, symbol.value(frame)))
+            if block.function is not None:
+                break
+            block = block.superblock
+        return {"variables": variables}
+
+
+class _Children(_Command):
+    """children path start count: a page of the children of a value."""
+
+    def __init__(self):
+        super().__init__("children")
+
+    def query(self, args):
+        path, start, count = args[0], int(args[1]), int(args[2])
+        value = _resolve(path)
+        # Take one more child to know whether there are more.
+        children = list(itertools.islice(_children(value), start,
+                                         start + count + 1))
+        return {"children": [
+                    _variable_info(f"{path}/{start + i}", name, child)
+                    for i, (name, child) in enumerate(children[:count])],
+                "more": len(children) > count}
+
+
+class _EvaluateAddress(_Command):
+    """evaluate-address expression: the address the expression gives."""
+
+    # The expression is taken verbatim.
+    verbatim = True
+
+    def __init__(self):
+        super().__init__("evaluate-address")
+
+    def query(self, args):
+        value = gdb.parse_and_eval(args)
+        if value.type.strip_typedefs().code == gdb.TYPE_CODE_ARRAY:
+            # An array gives its own address
+            value = value.address
+        return {"address": int(value)}
+
+
+class _ReadMemory(_Command):
+    """read-memory address count: the bytes in hex."""
+
+    def __init__(self):
+        super().__init__("read-memory")
+
+    def query(self, args):
+        address, count = int(args[0]), int(args[1])
+        data = gdb.selected_inferior().read_memory(address, count)
+        return {"address": address, "data": data.tobytes().hex()}
+
+
+class _FunctionRange(_Command):
+    """function-range pc: the module and the address range of the function.
+
+    The module is identified by the build-id if any.
+    """
+
+    def __init__(self):
+        super().__init__("function-range")
+
+    def query(self, args):
+        pc = int(args[0])
+        progspace = gdb.current_progspace()
+        name = progspace.solib_name(pc) or progspace.filename or ""
+        module = name
+        for objfile in gdb.objfiles():
+            if objfile.filename == name:
+                module = objfile.build_id or name
+                break
+        block = gdb.block_for_pc(pc)
+        while block is not None and block.function is None:
+            block = block.superblock
+        if block is None:
+            # No debug information, take a piece of code after the pc.
+            return {"module": module, "start": pc,
+                    "end": pc + _DISASSEMBLY_PAGE, "function": "??"}
+        return {"module": module, "start": block.start, "end": block.end,
+                "function": block.function.print_name}
+
+
+class _Disassemble(_Command):
+    """disassemble start end count: up to count instructions in the range.
+
+    The address of the next instruction is reported as well.
+    """
+
+    def __init__(self):
+        super().__init__("disassemble")
+
+    def query(self, args):
+        start, end, count = int(args[0]), int(args[1]), int(args[2])
+        arch = gdb.selected_frame().architecture()
+        instructions = arch.disassemble(start, end - 1, count)
+        if len(instructions) < count:
+            next_address = end
+        else:
+            next_address = instructions[-1]["addr"] + \
+                instructions[-1]["length"]
+        return {"instructions": [{"address": i["addr"], "text": i["asm"]}
+                                 for i in instructions],
+                "next": next_address}
+
+
+class _BreakpointSet(_Command):
+    """breakpoint-set location: the id and the locations of the new
+    breakpoint."""
+
+    # The location is taken verbatim.
+    verbatim = True
+
+    def __init__(self):
+        super().__init__("breakpoint-set")
+
+    def query(self, args):
+        bpt = gdb.Breakpoint(args)
+        if bpt.pending:
+            # Not to keep a breakpoint the user can't see
+            bpt.delete()
+            return {"_error": f"No code at {args}"}
+        bid = str(bpt.number)
+        return {"id": bid, "breakpoints": {bid: _breakpoint_locations(bpt)}}
+
+
+class _BreakpointDelete(_Command):
+    """breakpoint-delete [id...]: delete the breakpoints, all if no ids."""
+
+    def __init__(self):
+        super().__init__("breakpoint-delete")
+
+    def query(self, args):
+        breakpoints = {}
+        for bpt in _find_breakpoints(args):
+            breakpoints[str(bpt.number)] = []
+            bpt.delete()
+        return {"breakpoints": breakpoints}
+
+
+class _BreakpointEnable(_Command):
+    """breakpoint-enable/disable id...: the locations of the breakpoints
+    after the change."""
+
+    def __init__(self, enabled: bool):
+        super().__init__("breakpoint-enable" if enabled
+                         else "breakpoint-disable")
+        self.enabled = enabled
+
+    def query(self, args):
+        breakpoints = {}
+        for bpt in _find_breakpoints(args):
+            bpt.enabled = self.enabled
+            breakpoints[str(bpt.number)] = _breakpoint_locations(bpt)
+        return {"breakpoints": breakpoints}
+
+
+_Stack()
+_SelectFrame()
+_Locals()
+_Children()
+_EvaluateAddress()
+_ReadMemory()
+_FunctionRange()
+_Disassemble()
+_BreakpointSet()
+_BreakpointDelete()
+_BreakpointEnable(True)
+_BreakpointEnable(False)
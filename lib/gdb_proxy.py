@@ -10,7 +10,6 @@ to a user.
 import re
 
 from base_proxy import BaseProxy
-from stream_filter import StreamFilter
 
 
 class GdbProxy(BaseProxy):
@@ -24,16 +23,9 @@ class GdbProxy(BaseProxy):
     def get_prompt(self):
         return self.prompt
 
-    def filter_command(self, command):
-        """Prepare a requested command for execution."""
-        tokens = re.split(r'\s+', command.decode('utf-8'))
-        if tokens[0] == 'handle-command':
-            cmd = b'server ' + command[len('handle-command '):]
-            res = self.set_filter(
-                StreamFilter(self.get_prompt()),
-                lambda resp: self.process_handle_command(cmd, resp))
-            return cmd if res else b''
-        return command
+    def prepare_command(self, command):
+        """Don't keep the side commands in the history."""
+        return b'server ' + command
 
 
 if __name__ == '__main__':
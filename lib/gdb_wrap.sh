@@ -29,6 +29,7 @@ set confirm off
 set pagination off
 set filename-display absolute
 python gdb.prompt_hook = lambda p: p + ("" if p.endswith("\x1a\x1a\x1a") else "\x1a\x1a\x1a")
+source $this_dir/gdb_commands.py
 EOF
 
 cleanup()
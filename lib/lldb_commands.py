@@ -7,139 +7,473 @@ import socket
 import sys
 import re
 import json
+import struct
 import lldb  # type: ignore
+try:
+    import msgpack  # type: ignore
+except ImportError:
+    msgpack = None
 
 
-# Get list of enabled breakpoints for a given source file
-def _enum_breaks(debugger: lldb.SBDebugger):
-    # Ensure target is the actually selected one
-    target = debugger.GetSelectedTarget()
+# Get the source locations of an enabled breakpoint
+def _enum_locations(bpt: lldb.SBBreakpoint):
+    if not bpt.IsEnabled():
+        return
 
-    # Consider every breakpoint while skipping over the disabled ones
-    for bidx in range(target.GetNumBreakpoints()):
-        bpt = target.GetBreakpointAtIndex(bidx)
-        if not bpt.IsEnabled():
+    # Consider every location of a breakpoint
+    for lidx in range(bpt.GetNumLocations()):
+        loc = bpt.GetLocationAtIndex(lidx)
+        lineentry = loc.GetAddress().GetLineEntry()
+        filespec = lineentry.GetFileSpec()
+        filename = filespec.GetFilename()
+        if not filename:
             continue
-        bid = str(bpt.GetID())
+        path = os.path.join(filespec.GetDirectory(), filename)
 
-        # Consider every location of a breakpoint
-        for lidx in range(bpt.GetNumLocations()):
-            loc = bpt.GetLocationAtIndex(lidx)
-            lineentry = loc.GetAddress().GetLineEntry()
-            filespec = lineentry.GetFileSpec()
-            filename = filespec.GetFilename()
-            if not filename:
-                continue
-            path = os.path.join(filespec.GetDirectory(), filename)
+        yield path, lineentry.GetLine()
 
-            yield path, lineentry.GetLine(), bid
 
+def _frame_info(frame: lldb.SBFrame):
+    info = {"level": frame.GetFrameID(),
+            "function": frame.GetDisplayFunctionName() or "??",
+            "address": hex(frame.GetPC())}
+    filespec = frame.GetLineEntry().GetFileSpec()
+    filename = filespec.GetFilename()
+    if filename:
+        info["file"] = os.path.join(filespec.GetDirectory(), filename)
+        info["line"] = frame.GetLineEntry().GetLine()
+    return info
 
-# Get list of enabled breakpoints for a given source file
-def _get_breaks(fname, debugger: lldb.SBDebugger):
-    breaks = {}
 
-    for path, line, bid in _enum_breaks(debugger):
-        # See whether the breakpoint is in the file in question
-        if fname == path:
-            try:
-                breaks[line].append(bid)
-            except KeyError:
-                breaks[line] = [bid]
+# The longest value description sent to the plugin
+_MAX_VALUE = 256
+# The code disassembled around the pc outside of the known functions
+_DISASSEMBLY_PAGE = 256
+
+
+def _variable_info(path: str, value: lldb.SBValue):
+    text = value.GetValue() or value.GetSummary() or ""
+    if not text and value.MightHaveChildren():
+        text = "{...}"
+    if len(text) > _MAX_VALUE:
+        text = text[:_MAX_VALUE] + "..."
+    return {"name": value.GetName() or "", "path": path,
+            "type": value.GetDisplayTypeName() or "", "value": text,
+            "expandable": value.MightHaveChildren()}
 
-    # Return the filtered breakpoints
-    return json.dumps(breaks)
 
+class _BreakIndex:
+    """Enabled breakpoints indexed by source file: {path -> {line -> [id]}}.
 
-# Get list of all enabled breakpoints suitable for location list
-def _get_all_breaks(debugger: lldb.SBDebugger):
-    breaks = []
+    The index is built once for the selected target and then maintained
+    from the breakpoint-changed events, which are collected before every
+    query. A single breakpoint is reindexed when it changes.
+    """
 
-    for path, line, bid in _enum_breaks(debugger):
-        breaks.append(f"{path}:{line} breakpoint {bid}")
+    def __init__(self, debugger: lldb.SBDebugger):
+        self.debugger = debugger
+        self.target = None
+        self.listener = lldb.SBListener("nvim-gdb-breakpoints")
+        self.files = {}
+        # The known locations of every breakpoint: {id -> [(path, line)]}
+        self.locations = {}
+
+    def _sync(self):
+        # Ensure target is the actually selected one
+        target = self.debugger.GetSelectedTarget()
+        if self.target is None or self.target != target:
+            self._rebuild(target)
+            return
+        event = lldb.SBEvent()
+        while self.listener.GetNextEvent(event):
+            if not lldb.SBBreakpoint.EventIsBreakpointEvent(event):
+                continue
+            bpt = lldb.SBBreakpoint.GetBreakpointFromEvent(event)
+            etype = lldb.SBBreakpoint.GetBreakpointEventTypeFromEvent(event)
+            self._remove(str(bpt.GetID()))
+            if etype != lldb.eBreakpointEventTypeRemoved:
+                self._add(bpt)
+
+    def _rebuild(self, target: lldb.SBTarget):
+        if self.target is not None and self.target.IsValid():
+            self.target.GetBroadcaster().RemoveListener(
+                self.listener, lldb.SBTarget.eBroadcastBitBreakpointChanged)
+        self.files = {}
+        self.locations = {}
+        self.target = target
+        if not target.IsValid():
+            self.target = None
+            return
+        # Subscribe before the walk not to miss any change.
+        target.GetBroadcaster().AddListener(
+            self.listener, lldb.SBTarget.eBroadcastBitBreakpointChanged)
+        for bidx in range(target.GetNumBreakpoints()):
+            self._add(target.GetBreakpointAtIndex(bidx))
+
+    def _add(self, bpt: lldb.SBBreakpoint):
+        bid = str(bpt.GetID())
+        locations = list(_enum_locations(bpt))
+        if not locations:
+            return
+        self.locations[bid] = locations
+        for path, line in locations:
+            self.files.setdefault(path, {}).setdefault(line, []).append(bid)
 
-    return "\n".join(breaks)
+    def _remove(self, bid: str):
+        for path, line in self.locations.pop(bid, []):
+            lines = self.files[path]
+            lines[line].remove(bid)
+            if not lines[line]:
+                del lines[line]
+            if not lines:
+                del self.files[path]
 
+    def get_breaks(self, fname):
+        """Get list of enabled breakpoints for a given source file."""
+        self._sync()
+        return json.dumps(self.files.get(fname, {}))
 
-def _server(server_address: str, debugger_id: int):
-    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
-    sock.bind(server_address)
+    def get_all_breaks(self):
+        """Get list of all enabled breakpoints for the location list."""
+        self._sync()
+        breaks = []
+        for bid in sorted(self.locations, key=int):
+            for path, line in self.locations[bid]:
+                breaks.append(f"{path}:{line} breakpoint {bid}")
+        return "\n".join(breaks)
 
-    debugger = lldb.SBDebugger_FindDebuggerWithID(debugger_id)
 
-    try:
-        while True:
-            data, addr = sock.recvfrom(65536)
-            command = re.split(r"\s+", data.decode("utf-8"))
-            if command[0] == "info-breakpoints":
-                fname = command[1]
-                # response_addr = command[3]
-                breaks = _get_breaks(fname, debugger)
-                sock.sendto(breaks.encode("utf-8"), 0, addr)
-            elif command[0] == "handle-command":
-                # pylint: disable=broad-except
+class _Server:
+    """Side channel server answering the requests of the clients.
+
+    The requests are served one by one in the order of arrival by a single
+    thread, the debugger isn't supposed to be driven by several threads
+    at once. The responses are tagged with the request ids.
+    """
+
+    def __init__(self, server_address: str, debugger_id: int):
+        self.server_address = server_address
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(server_address)
+        self.debugger = lldb.SBDebugger_FindDebuggerWithID(debugger_id)
+        self.breaks = _BreakIndex(self.debugger)
+        # The stop events are sent to the plugin directly
+        self.stop_address = os.path.join(os.path.dirname(server_address),
+                                         "stop")
+        self.hooked_targets = []
+        self.handlers = {
+            "info-breakpoints": self._info_breakpoints,
+            "handle-command": self._handle_command,
+            "stack": self._stack,
+            "select-frame": self._select_frame,
+            "locals": self._locals,
+            "children": self._children,
+            "evaluate-address": self._evaluate_address,
+            "read-memory": self._read_memory,
+            "function-range": self._function_range,
+            "disassemble": self._disassemble,
+            "breakpoint-set": self._breakpoint_set,
+            "breakpoint-delete": self._breakpoint_delete,
+            "breakpoint-enable": lambda args: self._breakpoint_enable(
+                args, True),
+            "breakpoint-disable": lambda args: self._breakpoint_enable(
+                args, False),
+        }
+
+    def run(self):
+        """Serve the requests until the socket is gone."""
+        try:
+            while True:
                 try:
-                    if command[1] == 'nvim-gdb-info-breakpoints':
-                        # Fake a command info-breakpoins for GdbLopenBreakpoins
-                        resp = _get_all_breaks(debugger)
-                        sock.sendto(resp.encode("utf-8"), 0, addr)
-                        return
-                    command_to_handle = " ".join(command[1:])
-                    if sys.version_info.major < 3:
-                        command_to_handle = command_to_handle.encode("ascii")
-                    return_object = lldb.SBCommandReturnObject()
-                    debugger.GetCommandInterpreter().HandleCommand(
-                        command_to_handle, return_object
-                    )
-                    result = ""
-                    if return_object.GetError():
-                        result += return_object.GetError()
-                    if return_object.GetOutput():
-                        result += return_object.GetOutput()
-                    result = b"" if result is None else result.encode("utf-8")
-                    sock.sendto(result.strip(), 0, addr)
-                except Exception as ex:
-                    print("Exception: " + str(ex))
-    finally:
+                    data, addr = self.sock.recvfrom(65536)
+                except OSError:
+                    return
+                # Every request is tagged: "<id> <command>"
+                req_id, _, data = data.partition(b" ")
+                self._serve(req_id, data, addr)
+        finally:
+            self.sock.close()
+            try:
+                os.unlink(self.server_address)
+            except OSError:
+                pass
+
+    def _serve(self, req_id: bytes, data: bytes, addr):
+        # pylint: disable=broad-except
         try:
-            os.unlink(server_address)
-        except OSError:
-            pass
-class NvimGDBStopHook:
-    def __init__(
-        self, target: lldb.SBTarget, extra_args: lldb.SBStructuredData, d: dict
-    ):
-        # unused block
-        target
-        extra_args
-        d
-        # unused block
+            command = re.split(r"\s+", data.decode("utf-8").strip())
+            handler = self.handlers.get(command[0], None)
+            if handler is None:
+                result = f"Unknown request {command[0]}"
+            else:
+                self._ensure_stop_hook()
+                result = handler(command[1:])
+        except Exception as ex:
+            result = f"Exception: {ex}"
+        self.sock.sendto(req_id + b" " + result.encode("utf-8"), 0, addr)
+
+    def _ensure_stop_hook(self):
+        """Install the stop hook into every new target."""
+        target = self.debugger.GetSelectedTarget()
+        if not target.IsValid() or \
+                any(t == target for t in self.hooked_targets):
+            return
+        self.hooked_targets.append(target)
+        # Scripted stop hooks are available since LLDB 12, the older
+        # versions will keep parsing the location from the console.
+        return_object = lldb.SBCommandReturnObject()
+        self.debugger.GetCommandInterpreter().HandleCommand(
+            "target stop-hook add -P lldb_commands.NvimGDBStopHook"
+            f" -k address -v {self.stop_address}", return_object)
+
+    def _info_breakpoints(self, args):
+        return self.breaks.get_breaks(args[0])
+
+    def _get_thread(self) -> lldb.SBThread:
+        process = self.debugger.GetSelectedTarget().GetProcess()
+        thread = process.GetSelectedThread()
+        if not thread.IsValid():
+            raise ValueError("No thread selected")
+        return thread
 
-        self.proxy = xmlrpc.client.ServerProxy("http://localhost:8098")
+    def _stack(self, args):
+        """stack [start [count]]: the frames innermost first and the level
+        of the selected one."""
+        thread = self._get_thread()
+        start = int(args[0]) if args else 0
+        end = start + int(args[1]) if len(args) > 1 else None
+        frames = []
+        level = start
+        while end is None or level < end:
+            frame = thread.GetFrameAtIndex(level)
+            if not frame.IsValid():
+                break
+            frames.append(_frame_info(frame))
+            level += 1
+        return json.dumps({"selected": thread.GetSelectedFrame().GetFrameID(),
+                           "frames": frames})
 
-    def handle_stop(self, ctx: lldb.SBExecutionContext, stream: lldb.SBStream):
-        # unused block
-        stream
+    def _select_frame(self, args):
+        """select-frame level: select the frame without printing it."""
+        thread = self._get_thread()
+        frame = thread.GetFrameAtIndex(int(args[0]))
+        if not frame.IsValid():
+            return json.dumps({"_error": f"No frame at level {args[0]}"})
+        thread.SetSelectedFrame(frame.GetFrameID())
+        return json.dumps(_frame_info(frame))
 
-        f: lldb.SBFrame = ctx.frame
-        le: lldb.SBLineEntry = f.GetLineEntry()
-        file: lldb.SBFileSpec = le.file
+    def _locals(self, _args):
+        """locals: the top-level variables of the selected frame."""
+        frame = self._get_thread().GetSelectedFrame()
+        # arguments, locals, statics, in scope only
+        values = frame.GetVariables(True, True, False, True)
+        variables = []
+        seen = set()
+        for i in range(values.GetSize()):
+            value = values.GetValueAtIndex(i)
+            name = value.GetName()
+            if name in seen:
+                continue
+            seen.add(name)
+            variables.append(_variable_info(name, value))
+        return json.dumps({"variables": variables})
+
+    def _children(self, args):
+        """children path start count: a page of the children of a value."""
+        path, start, count = args[0], int(args[1]), int(args[2])
+        name, *indices = path.split("/")
+        frame = self._get_thread().GetSelectedFrame()
+        value = frame.FindVariable(name)
+        for index in indices:
+            value = value.GetChildAtIndex(int(index))
+        if not value.IsValid():
+            return json.dumps({"_error": f"No such value {path}"})
+        # Don't let the synthetic providers count all the children.
+        total = value.GetNumChildren(start + count + 1)
+        children = [_variable_info(f"{path}/{i}", value.GetChildAtIndex(i))
+                    for i in range(start, min(total, start + count))]
+        return json.dumps({"children": children,
+                           "more": total > start + count})
+
+    def _evaluate_address(self, args):
+        """evaluate-address expression: the address the expression gives."""
+        frame = self._get_thread().GetSelectedFrame()
+        value = frame.EvaluateExpression(" ".join(args))
+        if value.GetError().Fail():
+            return json.dumps({"_error": value.GetError().GetCString()})
+        if value.GetType().IsArrayType():
+            # An array gives its own address
+            return json.dumps({"address": value.GetLoadAddress()})
+        return json.dumps({"address": value.GetValueAsUnsigned()})
+
+    def _read_memory(self, args):
+        """read-memory address count: the bytes in hex."""
+        address, count = int(args[0]), int(args[1])
+        process = self.debugger.GetSelectedTarget().GetProcess()
+        error = lldb.SBError()
+        data = process.ReadMemory(address, count, error)
+        if error.Fail():
+            return json.dumps({"_error": error.GetCString()})
+        return json.dumps({"address": address, "data": data.hex()})
+
+    def _function_range(self, args):
+        """function-range pc: the module and the address range
+        of the function. The module is identified by the UUID if any."""
+        pc = int(args[0])
+        target = self.debugger.GetSelectedTarget()
+        ctx = target.ResolveSymbolContextForAddress(
+            target.ResolveLoadAddress(pc), lldb.eSymbolContextEverything)
+        module = ""
+        if ctx.GetModule().IsValid():
+            module = ctx.GetModule().GetUUIDString() or \
+                str(ctx.GetModule().GetFileSpec())
+        for scope in (ctx.GetFunction(), ctx.GetSymbol()):
+            if not scope.IsValid():
+                continue
+            start = scope.GetStartAddress().GetLoadAddress(target)
+            end = scope.GetEndAddress().GetLoadAddress(target)
+            if start <= pc < end:
+                return json.dumps({"module": module, "start": start,
+                                   "end": end,
+                                   "function": scope.GetName()})
+        # No symbols, take a piece of code after the pc.
+        return json.dumps({"module": module, "start": pc,
+                           "end": pc + _DISASSEMBLY_PAGE, "function": "??"})
+
+    def _disassemble(self, args):
+        """disassemble start end count: up to count instructions
+        in the range and the address of the next instruction."""
+        start, end, count = int(args[0]), int(args[1]), int(args[2])
+        target = self.debugger.GetSelectedTarget()
+        instructions = target.ReadInstructions(
+            target.ResolveLoadAddress(start), count)
+        result = []
+        next_address = end
+        for i in range(instructions.GetSize()):
+            inst = instructions.GetInstructionAtIndex(i)
+            address = inst.GetAddress().GetLoadAddress(target)
+            if address >= end:
+                break
+            text = f"{inst.GetMnemonic(target)} {inst.GetOperands(target)}"
+            result.append({"address": address, "text": text.strip()})
+            next_address = address + inst.GetByteSize()
+        if len(result) < count:
+            next_address = end
+        return json.dumps({"instructions": result, "next": next_address})
+
+    @staticmethod
+    def _find_breakpoints(target: lldb.SBTarget, ids):
+        """The breakpoints with the ids, all of them if no ids."""
+        if not ids:
+            return [target.GetBreakpointAtIndex(i)
+                    for i in range(target.GetNumBreakpoints())]
+        bpts = [target.FindBreakpointByID(int(bid)) for bid in ids]
+        return [bpt for bpt in bpts if bpt.IsValid()]
+
+    def _breakpoint_set(self, args):
+        """breakpoint-set file:line: the id and the locations of the new
+        breakpoint."""
+        fname, _, line = args[0].rpartition(":")
+        target = self.debugger.GetSelectedTarget()
+        bpt = target.BreakpointCreateByLocation(fname, int(line))
+        if not bpt.IsValid():
+            return json.dumps({"_error": f"Can't set a breakpoint {args[0]}"})
+        bid = str(bpt.GetID())
+        return json.dumps({"id": bid, "breakpoints": {
+            bid: [list(loc) for loc in _enum_locations(bpt)]}})
+
+    def _breakpoint_delete(self, args):
+        """breakpoint-delete [id...]: delete the breakpoints, all if no
+        ids."""
+        target = self.debugger.GetSelectedTarget()
+        breakpoints = {}
+        for bpt in self._find_breakpoints(target, args):
+            breakpoints[str(bpt.GetID())] = []
+            target.BreakpointDelete(bpt.GetID())
+        return json.dumps({"breakpoints": breakpoints})
 
-        self.proxy.did_stop(file.fullpath, le.line)
+    def _breakpoint_enable(self, args, enabled: bool):
+        """breakpoint-enable/disable id...: the locations of the
+        breakpoints after the change."""
+        target = self.debugger.GetSelectedTarget()
+        breakpoints = {}
+        for bpt in self._find_breakpoints(target, args):
+            bpt.SetEnabled(enabled)
+            breakpoints[str(bpt.GetID())] = \
+                [list(loc) for loc in _enum_locations(bpt)]
+        return json.dumps({"breakpoints": breakpoints})
 
+    def _handle_command(self, args):
+        if args[0] == 'nvim-gdb-info-breakpoints':
+            # Fake a command info-breakpoins for GdbLopenBreakpoins
+            return self.breaks.get_all_breaks()
+        command_to_handle = " ".join(args)
+        if sys.version_info.major < 3:
+            command_to_handle = command_to_handle.encode("ascii")
+        return_object = lldb.SBCommandReturnObject()
+        self.debugger.GetCommandInterpreter().HandleCommand(
+            command_to_handle, return_object
+        )
+        result = ""
+        if return_object.GetError():
+            result += return_object.GetError()
+        if return_object.GetOutput():
+            result += return_object.GetOutput()
+        return result.strip()
+
+
+def _pack(obj) -> bytes:
+    """Serialize lists of strings and integers in msgpack."""
+    if msgpack is not None:
+        return msgpack.packb(obj)
+    # Fallback for the python, which is missing msgpack.
+    if obj is None:
+        return b"\xc0"
+    if isinstance(obj, int):
+        if 0 <= obj < 0x80:
+            return struct.pack(">B", obj)
+        return struct.pack(">Bq", 0xd3, obj)
+    if isinstance(obj, str):
+        data = obj.encode("utf-8")
+        return struct.pack(">BI", 0xdb, len(data)) + data
+    return struct.pack(">BI", 0xdd, len(obj)) + \
+        b"".join(_pack(o) for o in obj)
+
+
+class NvimGDBStopHook:
+    """Scripted stop hook notifying the plugin of the stop location.
+
+    The event did_stop(file, line, frame, thread) is sent in msgpack
+    to the socket in the session directory given in the address key.
+    """
+
+    def __init__(self, _target: lldb.SBTarget,
+                 extra_args: lldb.SBStructuredData, _dict):
+        self.address = extra_args.GetValueForKey("address") \
+            .GetStringValue(4096)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+
+    def handle_stop(self, ctx: lldb.SBExecutionContext, _stream):
+        """Report the stop location."""
+        frame = ctx.GetFrame()
+        lineentry = frame.GetLineEntry()
+        filespec = lineentry.GetFileSpec()
+        filename = filespec.GetFilename()
+        if filename:
+            path = os.path.join(filespec.GetDirectory(), filename)
+            event = ["did_stop", path, lineentry.GetLine(),
+                     frame.GetFrameID(), ctx.GetThread().GetThreadID()]
+            try:
+                self.sock.sendto(_pack(event), self.address)
+            except OSError:
+                # The plugin will parse the location from the console.
+                pass
+        # Don't resume the process
+        return True
 
 
 def init(debugger: lldb.SBDebugger, command: str, _3, _4):
     """Entry point."""
-    server_address = command
-    thrd = threading.Thread(target=_server, args=(server_address, debugger.GetID()))
-    # try:
-    #     v: str = debugger.GetVersionString()
-    #     version = int(v[13:15])
-    #     if version > 11:
-    #         ci = debugger.GetCommandInterpreter()
-    #         ro = lldb.SBCommandReturnObject()
-    #         ci.HandleCommand("target stop-hook add -P lldb_commands.NvimGDBStopHook", ro)
-    # except Exception as _:
-    #     pass
+    server = _Server(command, debugger.GetID())
+    thrd = threading.Thread(target=server.run, daemon=True)
     thrd.start()
@@ -7,6 +7,7 @@ This will allow to inject server commands not exposing them
 to a user.
 """
 
+import os
 import re
 
 from base_proxy import BaseProxy
@@ -23,6 +24,20 @@ class PdbProxy(BaseProxy):
     def get_prompt(self):
         return self.prompt
 
+    def prepare_argv(self, argv):
+        """Launch "python -m pdb" through the shim with a side channel."""
+        if not self.server_address:
+            return argv
+        for i in range(len(argv) - 1):
+            if argv[i] == '-m' and argv[i + 1] == 'pdb':
+                this_dir = os.path.dirname(os.path.abspath(__file__))
+                shim = os.path.join(this_dir, 'pdb_shim.py')
+                # The plugin expects the service next to the proxy socket.
+                address = os.path.join(
+                    os.path.dirname(self.server_address), 'pdb')
+                return argv[:i] + [shim, '-a', address] + argv[i + 2:]
+        return argv
+
 
 if __name__ == '__main__':
     PdbProxy().run()
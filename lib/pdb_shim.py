@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+
+"""
+Run PDB with a side channel inside.
+
+Accepts the arguments of "python -m pdb" preceded by the side channel
+address: pdb_shim.py -a ADDR [pdb arguments]. The queries of the plugin
+are answered in JSON from a background thread using the debugger state
+directly, so the terminal never sees the service commands. The state is
+accessed only while the debugger waits for a command at the prompt.
+"""
+
+import atexit
+import bdb
+import io
+import itertools
+import json
+import os
+import pdb
+import reprlib
+import socket
+import sys
+import threading
+
+
+class _Server:
+    """Side channel server answering from the debugger state."""
+
+    # How long to wait for the prompt before giving up on a request
+    PROMPT_TIMEOUT = 0.25
+
+    def __init__(self, address: str, debugger: pdb.Pdb):
+        self.address = address
+        self.debugger = debugger
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(address)
+        atexit.register(self.cleanup)
+        self.handlers = {
+            "info-breakpoints": self._info_breakpoints,
+            "all-breakpoints": self._all_breakpoints,
+            "breakpoint-set": self._breakpoint_set,
+            "breakpoint-delete": self._breakpoint_delete,
+            "breakpoint-enable": lambda ids: self._breakpoint_enable(
+                ids, True),
+            "breakpoint-disable": lambda ids: self._breakpoint_enable(
+                ids, False),
+            "stack": self._stack,
+            "select-frame": self._select_frame,
+            "location": self._location,
+            "locals": self._locals,
+            "children": self._children,
+        }
+        # The values are described briefly: no megabytes of containers.
+        self.repr = reprlib.Repr()
+        self.repr.maxstring = 256
+        self.repr.maxother = 256
+
+    def cleanup(self):
+        """Remove the socket."""
+        self.sock.close()
+        try:
+            os.unlink(self.address)
+        except OSError:
+            pass
+
+    def run(self):
+        """Serve the requests until the socket is gone."""
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(65536)
+            except OSError:
+                return
+            # Every request is tagged: "<id> <command>"
+            req_id, _, data = data.partition(b" ")
+            command, *args = data.decode("utf-8").strip().split(" ", 1)
+            handler = self.handlers.get(command, None)
+            # pylint: disable=broad-except
+            try:
+                if handler is None:
+                    result = {"_error": f"Unknown request {command}"}
+                elif not self.debugger.lock.acquire(
+                        timeout=self.PROMPT_TIMEOUT):
+                    result = {"_error": "The debugger is busy"}
+                else:
+                    try:
+                        result = handler(*args)
+                    finally:
+                        self.debugger.lock.release()
+            except Exception as ex:
+                result = {"_error": str(ex)}
+            self.sock.sendto(req_id + b" " + json.dumps(result).encode(),
+                             0, addr)
+
+    def _info_breakpoints(self, fname):
+        """Get enabled breakpoints in a file: {line: [id]}."""
+        fname = self.debugger.canonic(fname)
+        breaks = {}
+        for line in self.debugger.breaks.get(fname, []):
+            for bpt in bdb.Breakpoint.bplist.get((fname, line), []):
+                if bpt.enabled:
+                    breaks.setdefault(str(line), []).append(str(bpt.number))
+        return breaks
+
+    def _all_breakpoints(self):
+        """Get all enabled breakpoints: {file: {line: [id]}}."""
+        breaks = {}
+        for (fname, line), bpts in list(bdb.Breakpoint.bplist.items()):
+            ids = [str(bpt.number) for bpt in bpts if bpt.enabled]
+            if ids:
+                breaks.setdefault(fname, {})[str(line)] = ids
+        return breaks
+
+    def _find_breakpoints(self, ids):
+        """The breakpoints with the ids, all of them if no ids."""
+        if not ids.split():
+            return [bpt for bpt in bdb.Breakpoint.bpbynumber if bpt]
+        return [self.debugger.get_bpbynumber(bid) for bid in ids.split()]
+
+    def _breakpoint_set(self, location):
+        """Set a breakpoint: the id and the location."""
+        fname, _, line = location.rpartition(":")
+        fname, line = self.debugger.canonic(fname), int(line)
+        if not self._checkline(fname, line):
+            return {"_error": f"Blank or comment line {fname}:{line}"}
+        err = self.debugger.set_break(fname, line)
+        if err:
+            return {"_error": err}
+        bpt = self.debugger.get_breaks(fname, line)[-1]
+        return {"id": str(bpt.number),
+                "breakpoints": {str(bpt.number): [[bpt.file, bpt.line]]}}
+
+    def _checkline(self, fname, line):
+        """Validate the line like "break" does, but quietly."""
+        stdout, self.debugger.stdout = self.debugger.stdout, io.StringIO()
+        try:
+            return self.debugger.checkline(fname, line)
+        finally:
+            self.debugger.stdout = stdout
+
+    def _breakpoint_delete(self, ids=""):
+        """Delete the breakpoints, all of them if no ids."""
+        breakpoints = {}
+        for bpt in self._find_breakpoints(ids):
+            breakpoints[str(bpt.number)] = []
+            self.debugger.clear_bpbynumber(bpt.number)
+        return {"breakpoints": breakpoints}
+
+    def _breakpoint_enable(self, ids, enabled):
+        """Enable or disable the breakpoints: their locations after that."""
+        breakpoints = {}
+        for bpt in self._find_breakpoints(ids):
+            if enabled:
+                bpt.enable()
+            else:
+                bpt.disable()
+            breakpoints[str(bpt.number)] = \
+                [[bpt.file, bpt.line]] if enabled else []
+        return {"breakpoints": breakpoints}
+
+    @staticmethod
+    def _frame_info(level, frame_lineno):
+        frame, line = frame_lineno
+        info = {"level": level, "function": frame.f_code.co_name}
+        # Skip the pseudo files like <string>
+        if not frame.f_code.co_filename.startswith("<"):
+            info["file"] = frame.f_code.co_filename
+            info["line"] = line
+        return info
+
+    def _stack(self, bounds=""):
+        """Get the frames innermost first and the level of the selected one.
+
+        The optional bounds are "start [count]".
+        """
+        bounds = [int(b) for b in bounds.split()]
+        stack = list(reversed(self.debugger.stack))
+        start = bounds[0] if bounds else 0
+        end = start + bounds[1] if len(bounds) > 1 else len(stack)
+        frames = [self._frame_info(level, stack[level])
+                  for level in range(start, min(end, len(stack)))]
+        return {"selected": len(stack) - 1 - self.debugger.curindex,
+                "frames": frames}
+
+    def _select_frame(self, level):
+        """Select the frame like up/down do without printing it."""
+        level = int(level)
+        stack = self.debugger.stack
+        index = len(stack) - 1 - level
+        if not 0 <= index < len(stack):
+            return {"_error": f"No frame at level {level}"}
+        self.debugger.curindex = index
+        self.debugger.curframe = stack[index][0]
+        self.debugger.curframe_locals = self.debugger.curframe.f_locals
+        self.debugger.lineno = None
+        return self._frame_info(level, stack[index])
+
+    def _location(self):
+        """Get the currently selected frame."""
+        stack = list(self.debugger.stack)
+        curindex = self.debugger.curindex
+        if not stack:
+            return {}
+        return self._frame_info(len(stack) - 1 - curindex, stack[curindex])
+
+    def _variable_info(self, path, name, value):
+        return {"name": name, "path": path, "type": type(value).__name__,
+                "value": self.repr.repr(value),
+                "expandable": next(_children(value), None) is not None}
+
+    def _locals(self):
+        """Get the top-level variables of the selected frame."""
+        if self.debugger.curframe is None:
+            return {"_error": "No frame selected"}
+        return {"variables": [
+            self._variable_info(name, name, value)
+            for name, value in self.debugger.curframe_locals.items()]}
+
+    def _children(self, args):
+        """Get a page of the children of a value: "path start count"."""
+        path, start, count = args.split()
+        start, count = int(start), int(count)
+        name, *indices = path.split("/")
+        value = self.debugger.curframe_locals[name]
+        for index in indices:
+            _, value = next(itertools.islice(_children(value), int(index),
+                                             None))
+        # Take one more child to know whether there are more.
+        children = list(itertools.islice(_children(value), start,
+                                         start + count + 1))
+        return {"children": [
+                    self._variable_info(f"{path}/{start + i}", name, child)
+                    for i, (name, child) in enumerate(children[:count])],
+                "more": len(children) > count}
+
+
+def _children(value):
+    """Enumerate the children of a value lazily: (name, value)."""
+    if isinstance(value, (str, bytes, bytearray, int, float, complex)):
+        return
+    if isinstance(value, dict):
+        for key, val in value.items():
+            yield f"[{key!r}]", val
+    elif isinstance(value, (list, tuple)):
+        for i, val in enumerate(value):
+            yield f"[{i}]", val
+    elif isinstance(value, (set, frozenset)):
+        for val in value:
+            yield "", val
+    elif hasattr(value, "__dict__") and \
+            not callable(value) and isinstance(value.__dict__, dict):
+        yield from value.__dict__.items()
+
+
+class NvimPdb(pdb.Pdb):
+    """PDB serving the plugin queries from a background thread.
+
+    The debugger holds the lock all the time but waiting for a command
+    at the prompt, so the side channel doesn't race with the commands
+    or the program being debugged.
+    """
+
+    # The side channel address, the server is started by the first instance
+    address = None
+    server = None
+
+    def __init__(self, *args, **kwargs):
+        """ctor."""
+        super().__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+        self.lock.acquire()   # pylint: disable=consider-using-with
+        self.lock_held = True
+        # Let the side channel access the state before the first stop.
+        self.stack, self.curindex = [], 0
+        if NvimPdb.address and NvimPdb.server is None:
+            # The breakpoints of the previous session are set like .pdbrc
+            script = os.path.join(os.path.dirname(NvimPdb.address),
+                                  "breakpoints")
+            if os.path.exists(script):
+                with open(script, encoding="utf-8") as rc_file:
+                    self.rcLines.extend(rc_file.read().splitlines())
+            NvimPdb.server = _Server(NvimPdb.address, self)
+            thread = threading.Thread(target=NvimPdb.server.run, daemon=True)
+            thread.start()
+
+    def _hold(self, held):
+        if held and not self.lock_held:
+            self.lock.acquire()   # pylint: disable=consider-using-with
+        elif not held and self.lock_held:
+            self.lock.release()
+        self.lock_held = held
+
+    def preloop(self):
+        """Let the side channel in at the prompt."""
+        super().preloop()
+        self._hold(False)
+
+    def precmd(self, line):
+        """Take the state back for the command."""
+        self._hold(True)
+        return super().precmd(line)
+
+    def postcmd(self, stop, line):
+        """Back to the prompt unless the program continues."""
+        stop = super().postcmd(stop, line)
+        if not stop:
+            self._hold(False)
+        return stop
+
+
+def main():
+    """Entry point."""
+    if len(sys.argv) < 3 or sys.argv[1] not in ('-a', '--address'):
+        print("usage: pdb_shim.py -a ADDR [pdb arguments]", file=sys.stderr)
+        sys.exit(2)
+    NvimPdb.address = sys.argv[2]
+    sys.argv[1:] = sys.argv[3:]
+    # Like "python -m pdb" would have, the script directory is replaced
+    # by pdb.
+    sys.path[0] = os.getcwd()
+    # pdb.main() instantiates the debugger from the module namespace.
+    pdb.Pdb = NvimPdb
+    pdb.main()
+
+
+if __name__ == '__main__':
+    # pdb runs the program in the namespace of __main__ clearing it first,
+    # so the shim must live in a module of its own.
+    import pdb_shim   # pylint: disable=import-self
+    pdb_shim.main()
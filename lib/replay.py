@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+
+"""
+Replay a captured debugger session through the parsing pipeline.
+
+The capture is recorded by the proxy when the environment variable
+NVIMGDB_CAPTURE names an existing directory (see capture.py). The
+debugger output is passed through the stream filters like in the proxy,
+then through the parser of the backend like in the plugin, but without
+the editor. The tool reports the throughput and the latency, so a recorded
+session can serve as a regression benchmark.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from typing import Dict, List
+
+import capture
+import stream_filter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'rplugin', 'python3'))
+
+# pylint: disable=wrong-import-position
+from gdb.common import BaseCommon                 # noqa: E402
+from gdb.backend.base import ParserHandler        # noqa: E402
+from gdb.backend.gdb import Gdb                   # noqa: E402
+from gdb.backend.lldb import Lldb                 # noqa: E402
+from gdb.backend.pdb import Pdb                   # noqa: E402
+from gdb.backend.bashdb import BashDB             # noqa: E402
+from fakes import FakeVim                         # noqa: E402
+
+
+_BACKENDS = {"gdb": Gdb, "lldb": Lldb, "pdb": Pdb, "bashdb": BashDB}
+
+# The same as in App: the terminal control sequences aren't parsed
+_ANSI_ESCAPER = re.compile(r'\x1B[@-_][0-?]*[ -/]*[@-~]')
+
+# The timer scheduled by the parser to wait for more output
+_DELAY = re.compile(r'GdbParserDelayElapsed\(\d+, (\d+)\)')
+
+
+class _Handler(ParserHandler):
+    """Count the parser events."""
+
+    def __init__(self):
+        self.events: Dict[str, int] = {}
+
+    def _count(self, event: str):
+        self.events[event] = self.events.get(event, 0) + 1
+
+    def continue_program(self):
+        self._count("continue_program")
+
+    def jump_to_source(self, fname: str, line: int):
+        self._count("jump_to_source")
+
+    def query_breakpoints(self):
+        self._count("query_breakpoints")
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def replay(path: str, backend: str = '') -> Dict:
+    """Push the capture through the pipeline, return the statistics.
+
+    The latency is the processing time of a chunk of the debugger output
+    from the stream filter to the end of the parsing. The side channel
+    latency is taken from the timestamps in the capture.
+    """
+    records = list(capture.read(path))
+    if not backend:
+        backend = next((data.decode('utf-8').lower()
+                        for _, kind, data in records
+                        if kind == capture.HEADER), 'gdb')
+
+    vim = FakeVim()
+    handler = _Handler()
+    parser = _BACKENDS[backend]().create_parser_impl(
+        BaseCommon(vim, None), handler)
+
+    filters: List[stream_filter.Filter] = [stream_filter.Filter()]
+    requests: Dict[bytes, float] = {}
+    side_latencies: List[float] = []
+    latencies: List[float] = []
+    filter_time = 0.
+    parse_time = 0.
+    total_bytes = 0
+    for timestamp, kind, data in records:
+        if kind == capture.REQUEST:
+            requests[data.partition(b' ')[0]] = timestamp
+            continue
+        if kind == capture.RESPONSE:
+            start = requests.pop(data.partition(b' ')[0], None)
+            if start is not None:
+                side_latencies.append(timestamp - start)
+            continue
+        if kind == capture.FILTER:
+            filters.append(stream_filter.StreamFilter(re.compile(data)))
+            continue
+
+        start = time.perf_counter()
+        if kind == capture.TIMEOUT:
+            output = filters[-1].timeout()
+            if len(filters) > 1:
+                filters.pop()
+        elif kind == capture.OUTPUT:
+            total_bytes += len(data)
+            output, filtered = filters[-1].filter(data)
+            if filtered is not None:
+                filters.pop()
+        else:
+            continue
+        filtered_at = time.perf_counter()
+        filter_time += filtered_at - start
+        if not output:
+            latencies.append(filtered_at - start)
+            continue
+
+        # Split the lines like the terminal does for on_stdout
+        lines = output.decode('utf-8', errors='replace').split('\n')
+        parser.feed([_ANSI_ESCAPER.sub('', line) for line in lines])
+        # The parsing delayed by a timer elapses right away
+        while vim.commands:
+            match = _DELAY.search(vim.commands.pop(0))
+            if match:
+                parser.delay_elapsed(int(match.group(1)))
+        finish = time.perf_counter()
+        parse_time += finish - filtered_at
+        latencies.append(finish - start)
+
+    total_time = filter_time + parse_time
+    return {
+        "backend": backend,
+        "bytes": total_bytes,
+        "chunks": len(latencies),
+        "filter_seconds": filter_time,
+        "parse_seconds": parse_time,
+        "throughput_mb_s": total_bytes / total_time / 1e6
+                           if total_time else 0.,
+        "latency_ms": {
+            "p50": _percentile(latencies, .5) * 1e3,
+            "p95": _percentile(latencies, .95) * 1e3,
+            "max": max(latencies, default=0.) * 1e3,
+        },
+        "side_channel_ms": {
+            "count": len(side_latencies),
+            "p50": _percentile(side_latencies, .5) * 1e3,
+            "p95": _percentile(side_latencies, .95) * 1e3,
+        },
+        "events": handler.events,
+    }
+
+
+def main():
+    """Replay the captures given in the command line."""
+    parser = argparse.ArgumentParser(
+        description="Replay captured debugger sessions.")
+    parser.add_argument('captures', metavar='CAPTURE', nargs='+',
+                        help='capture file recorded by the proxy')
+    parser.add_argument('-b', '--backend', choices=sorted(_BACKENDS),
+                        default='', help='override the recorded backend')
+    parser.add_argument('-r', '--repeat', type=int, default=1,
+                        help='replay every capture several times')
+    parser.add_argument('--max-p95', type=float, metavar='MS',
+                        help='fail if the latency p95 exceeds the limit')
+    args = parser.parse_args()
+
+    failed = False
+    for path in args.captures:
+        for _ in range(args.repeat):
+            stats = replay(path, args.backend)
+            stats["capture"] = path
+            print(json.dumps(stats))
+            if args.max_p95 is not None and \
+                    stats["latency_ms"]["p95"] > args.max_p95:
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Keep the last log records in memory.
+
+Shared by the proxies and the plugin. The records are formatted only
+when dumped: on demand from the plugin or when an error is logged,
+so logging costs next to nothing in the hot path.
+"""
+
+import collections
+import logging
+import logging.handlers
+import time
+
+
+FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+
+class RingBuffer:
+    """The queue of the QueueHandler keeping the last records only."""
+
+    def __init__(self, capacity: int):
+        """ctor."""
+        self.records: collections.deque = collections.deque(maxlen=capacity)
+
+    def put_nowait(self, record: logging.LogRecord):
+        """Keep the record, the oldest one is dropped when full."""
+        self.records.append(record)
+
+
+class RingHandler(logging.handlers.QueueHandler):
+    """Keep the records in memory to dump them on demand or on errors.
+
+    A repeating error is dumped once in DUMP_INTERVAL seconds, the records
+    logged in between are in the next dump.
+    """
+
+    DUMP_INTERVAL = 60.
+
+    def __init__(self, capacity: int, dump_path: str):
+        """ctor."""
+        super().__init__(RingBuffer(capacity))
+        self.dump_path = dump_path
+        self.setFormatter(logging.Formatter(FORMAT))
+        self.last_dump = -self.DUMP_INTERVAL
+
+    def prepare(self, record: logging.LogRecord):
+        """Don't format the message until dumped."""
+        if record.exc_info:
+            record.exc_text = self.formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record: logging.LogRecord):
+        """Keep the record, dump the buffer on errors."""
+        super().emit(record)
+        now = time.monotonic()
+        if record.levelno >= logging.ERROR \
+                and now - self.last_dump >= self.DUMP_INTERVAL:
+            self.last_dump = now
+            try:
+                self.dump(self.dump_path)
+            except OSError:
+                self.handleError(record)
+
+    def dump(self, path: str) -> int:
+        """Write the records kept to the file, return their number."""
+        records = list(self.queue.records)
+        with open(path, 'w', encoding='utf-8') as dump:
+            for record in records:
+                dump.write(self.format(record) + "\n")
+        return len(records)
@@ -1,6 +1,7 @@
 """Filter the stream from within given pair of tokens."""
 
 import re
+import time
 
 class Filter:
     """Pass-through filter."""
@@ -14,6 +15,11 @@ class Filter:
         self._calm_the_linter()
         return b''
 
+    def is_expired(self):
+        """Check whether it's time to give up waiting for the output."""
+        self._calm_the_linter()
+        return True
+
     @staticmethod
     def _calm_the_linter():
         pass
@@ -25,10 +31,19 @@ class StreamFilter(Filter):
     CSEQ_STR = rb'\[[^a-zA-Z]*[a-zA-Z]'
     CSEQ = re.compile(CSEQ_STR)
 
-    def __init__(self, finish_re):
-        """Initialize the filter with start and finish tokens."""
+    def __init__(self, finish_re, patience=0.):
+        """Initialize the filter with start and finish tokens.
+
+        The filter may be kept waiting for the output up to patience
+        seconds even if the stream is silent.
+        """
         self.buffer = bytearray()
         self.matcher = finish_re
+        self.deadline = time.monotonic() + patience
+
+    def is_expired(self):
+        """Check whether it's time to give up waiting for the output."""
+        return time.monotonic() >= self.deadline
 
     def update_finish_matcher(self, finish_re):
         '''Allow changing the termination sequence on the fly.'''
@@ -0,0 +1,28 @@
+'''Test the breakpoint parsers on the generated tables.'''
+import os
+import pytest
+import bench_breakpoint
+
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'bench_breakpoint.json')
+
+# The suite runs on shared machines, only a gross slowdown is reported
+TOLERANCE = 1.
+
+
+@pytest.mark.parametrize("backend", sorted(bench_breakpoint.BACKENDS))
+def test_parse(backend):
+    '''The parsed breakpoints match the generated ones.'''
+    timings = bench_breakpoint.run(backend, 1000, repeat=1)
+    assert set(timings) == {"parse", "query"}
+
+
+@pytest.mark.parametrize("backend", sorted(bench_breakpoint.BACKENDS))
+def test_baseline(backend):
+    '''The parsing isn't slower than the saved baseline.'''
+    baseline = bench_breakpoint.load(BASELINE)
+    results = bench_breakpoint.measure(backend, 1000, repeat=3)
+    assert set(results) <= set(baseline)
+    assert not bench_breakpoint.regressions(results, baseline, TOLERANCE,
+                                            retries=2, repeat=3)
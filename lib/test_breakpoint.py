@@ -0,0 +1,67 @@
+'''Test the breakpoints kept for the next session.'''
+
+# pylint: disable=redefined-outer-name
+
+import pytest
+from gdb.breakpoint import Breakpoint
+from gdb.pathmgr import PathMgr
+from gdb.profiler import Profiler
+from gdb.backend.gdb import Gdb
+from fakes import FakeProxy, FakeWorker
+
+
+TABLE = """Num     Type           Disp Enb Address            What
+1       breakpoint     keep y   0x0000000000001139 in main at {0}:5
+2       breakpoint     keep y   0x0000000000001149 in Foo at {0}:10
+3       breakpoint     keep n   0x0000000000001159 in Bar at {0}:12
+"""
+
+
+class _Store:
+    '''Remember the breakpoints saved.'''
+
+    def __init__(self):
+        self.saved = None
+        self.index = None
+        self.restore_command = None
+
+    def save(self, locations):
+        '''Remember the locations.'''
+        self.saved = locations
+
+
+@pytest.fixture(scope='function')
+def breakpoint(common, tmp_path):
+    '''The breakpoints of a GDB session with the store.'''
+    src = str(tmp_path / "test.c")
+    common.vim.handlers.update(expand=lambda _: src,
+                               sign_place=lambda *_: 0,
+                               sign_unplace=lambda *_: 0)
+    pathmgr = PathMgr(common)
+    proxy = FakeProxy(TABLE.format(src))
+    impl = Gdb().create_breakpoint_impl(proxy, None, pathmgr)
+    brk = Breakpoint(common, proxy, impl, pathmgr, FakeWorker(),
+                     Profiler(common))
+    brk.store = _Store()
+    return brk
+
+
+def test_one_listing(breakpoint, tmp_path):
+    '''The signs and the breakpoints to save come from one listing.'''
+    src = str(tmp_path / "test.c")
+    breakpoint.query(1, src)
+    assert breakpoint.proxy.requests == ["handle-command info breakpoints"]
+    assert breakpoint.breaks[src] == {"5": ["1"], "10": ["2"]}
+    breakpoint.save()
+    assert breakpoint.store.saved == {src: [5, 10]}
+
+
+def test_apply(breakpoint, tmp_path):
+    '''The changes from the editor are saved without listing again.'''
+    src = str(tmp_path / "test.c")
+    breakpoint.query(1, src)
+    breakpoint.apply(1, src, {"2": [], "4": [[src, 7]]})
+    assert len(breakpoint.proxy.requests) == 1
+    assert breakpoint.breaks[src] == {"5": ["1"], "7": ["4"]}
+    breakpoint.save()
+    assert breakpoint.store.saved == {src: [5, 7]}
@@ -0,0 +1,45 @@
+'''Test the configuration resolved from the variables.'''
+
+from gdb.config import Config
+
+
+def _config(common, variables):
+    signs = []
+    common.vim.handlers.update(sign_define=signs.extend)
+    return Config(common, variables), signs
+
+
+def test_defaults(common):
+    '''The defaults are taken without the variables.'''
+    config, signs = _config(common, {})
+    assert config.get('key_next') == '<f10>'
+    assert config.get_or('key_quit', 'none') == 'none'
+    assert [s['name'] for s in signs] == \
+        ['GdbCurrentLine'] + [f'GdbBreakpoint{i}' for i in range(1, 11)]
+
+
+def test_priority(common):
+    '''The specific variables override the config and its override.'''
+    variables = {
+        'nvimgdb_config': {'key_next': '<f2>', 'sign_breakpoint': ['x']},
+        'nvimgdb_config_override': {'key_step': '<f3>'},
+        'nvimgdb_key_next': '<f4>',
+        'nvimgdb_backtrace_page_size': 0,
+    }
+    config, signs = _config(common, variables)
+    assert config.get('key_next') == '<f4>'
+    assert config.get('key_step') == '<f3>'
+    # The keys missing from the user config aren't defaulted
+    assert config.get_or('key_continue', None) is None
+    assert config.get_or('backtrace_page_size', 7) == 7
+    assert [s['text'] for s in signs] == ['▶', 'x']
+    # The snapshot isn't touched by the resolution
+    assert variables['nvimgdb_config'] == {'key_next': '<f2>',
+                                           'sign_breakpoint': ['x']}
+
+
+def test_conflict(common):
+    '''The conflicting keymaps are rejected.'''
+    config, _ = _config(common, {'nvimgdb_key_step': '<f10>'})
+    assert config.get('key_step') == '<f10>'
+    assert config.get_or('key_next', None) is None
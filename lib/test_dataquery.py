@@ -0,0 +1,15 @@
+'''Test the structured responses of the debuggers.'''
+
+from gdb.dataquery import DataQuery
+
+
+def test_chatter():
+    '''The JSON line is found among the chatter of the debugger.'''
+    find = DataQuery._find_payload   # pylint: disable=protected-access
+    assert find('[Thread 0x7ffff7d8a740 (LWP 1) exited]\n'
+                '{"frames": []}\n') == {"frames": []}
+    assert find('{"selected": 0}\n'
+                '[Inferior 1 (process 42) exited normally]\n') == \
+        {"selected": 0}
+    assert find('\x1a\x1a[1, 2]') == [1, 2]
+    assert find('[New Thread 0x7ffff7d89700 (LWP 2)]\n') is None
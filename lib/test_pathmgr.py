@@ -0,0 +1,71 @@
+'''Test the memoized path resolution.'''
+
+import os
+import threading
+from gdb.pathmgr import PathMgr
+from gdb.srcmap import SourceMap
+
+
+def test_resolve(common, tmp_path):
+    '''The paths are resolved once until the directory changes.'''
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "main.c").write_text("")
+    (tmp_path / "link.c").symlink_to(tmp_path / "src" / "main.c")
+    pathmgr = PathMgr(common)
+    real = os.path.realpath(tmp_path / "src" / "main.c")
+    assert pathmgr.resolve("src/main.c") == real
+    assert pathmgr.resolve("link.c") == real
+    assert pathmgr.locate("src/main.c") == "src/main.c"
+    assert set(pathmgr.resolved) == {"src/main.c", "link.c"}
+
+    pathmgr.on_dir_changed(str(tmp_path / "src"))
+    assert not pathmgr.resolved
+    assert pathmgr.resolve("main.c") == real
+
+
+def test_buffers(common, tmp_path):
+    '''The buffers are looked up once until wiped out.'''
+    calls = []
+
+    def _bufnr(path, _create):
+        calls.append(path)
+        return len(calls)
+    common.vim.handlers.update(bufnr=_bufnr,
+                               expand=lambda expr: f"/path{expr}")
+    (tmp_path / "main.c").write_text("")
+    pathmgr = PathMgr(common)
+    assert pathmgr.get_buffer("main.c") == 1
+    assert pathmgr.get_buffer(str(tmp_path / "main.c")) == 1
+    assert calls == ["main.c"]
+    assert pathmgr.get_path(1) == "/path#1:p"
+
+    pathmgr.on_buf_changed(1)
+    assert not pathmgr.buf_path
+    assert pathmgr.get_buffer("main.c") == 2
+    pathmgr.set_buffer("main.c", 5)
+    assert pathmgr.get_buffer("main.c") == 5
+
+
+def test_workspace(common, tmp_path, monkeypatch):
+    '''The missing paths are mapped once the workspace is indexed.'''
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "main.c").write_text("")
+    # Hold the index until the path is resolved without it
+    indexed = threading.Event()
+    index = SourceMap._index   # pylint: disable=protected-access
+
+    def _index(srcmap):
+        indexed.wait(2)
+        return index(srcmap)
+    monkeypatch.setattr(SourceMap, "_index", _index)
+    pathmgr = PathMgr(common)
+    build = "/build/project/src/main.c"
+    assert pathmgr.resolve(build) == build
+    assert build not in pathmgr.resolved
+    indexed.set()
+    pathmgr.srcmap.builder.join(2)
+    assert pathmgr.srcmap.is_ready()
+    real = os.path.realpath(tmp_path / "src" / "main.c")
+    assert pathmgr.resolve(build) == real
+    assert pathmgr.locate(build) == real
+    assert pathmgr.resolved[build] == real
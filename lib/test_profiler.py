@@ -0,0 +1,25 @@
+'''Test the step latency instrumentation.'''
+
+import threading
+from gdb.common import BaseCommon
+from gdb.profiler import CountedVim, Profiler
+
+
+def test_rpcs(common):
+    '''The requests are counted into the innermost span of the thread.'''
+    vim = CountedVim(common.vim)
+    profiler = Profiler(BaseCommon(vim, common.config))
+    profiler.begin_step("next")
+    vim.call("getcwd")
+    with profiler.span("jump"):
+        vim.call("getcwd")
+        vim.command("redraw")
+        with profiler.span("breakpoint_signs"):
+            vim.command("redraw")
+            # The other threads don't count into the span
+            thread = threading.Thread(target=vim.command, args=("redraw",))
+            thread.start()
+            thread.join()
+    assert [(s["stage"], s["rpcs"]) for s in profiler.step["spans"]] == \
+        [("breakpoint_signs", 1), ("jump", 2)]
+    assert profiler.stats()["total"]["rpcs"] == 3
@@ -0,0 +1,108 @@
+'''Test the side channel requests tagged with ids.'''
+
+# pylint: disable=redefined-outer-name
+
+import concurrent.futures
+import socket
+import threading
+import pytest
+from gdb.proxy import Proxy
+
+
+class _Client:
+    '''The session directory of the side channel.'''
+
+    def __init__(self, sock_dir):
+        self.sock_dir = sock_dir
+
+    def get_proxy_addr(self):
+        '''The address served by the proxy.'''
+        return str(self.sock_dir / "proxy")
+
+    def get_sock_dir(self):
+        '''The session directory.'''
+        return str(self.sock_dir)
+
+
+@pytest.fixture(scope='function')
+def server(tmp_path):
+    '''Collect the requests sent to the proxy address.'''
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sock.bind(str(tmp_path / "proxy"))
+    yield sock
+    sock.close()
+
+
+@pytest.fixture(scope='function')
+def proxy(common, tmp_path):
+    '''The proxy connecting to the server.'''
+    prx = Proxy(common, _Client(tmp_path))
+    yield prx
+    prx.cleanup()
+
+
+def _receive(server, count):
+    requests = []
+    for _ in range(count):
+        data, addr = server.recvfrom(65536)
+        req_id, _, request = data.partition(b' ')
+        requests.append((req_id, request, addr))
+    return requests
+
+
+def test_out_of_order(server, proxy):
+    '''The responses resolve the futures by the id, not by the order.'''
+    first = proxy.query_async("info-breakpoints a.c")
+    second = proxy.query_async("info-breakpoints b.c")
+    requests = _receive(server, 2)
+    assert [r[1] for r in requests] == [b"info-breakpoints a.c",
+                                        b"info-breakpoints b.c"]
+    for req_id, request, addr in reversed(requests):
+        server.sendto(req_id + b' ' + request[-3:], addr)
+    assert second.result(1) == "b.c"
+    assert first.result(1) == "a.c"
+    assert not proxy.pending
+
+
+def test_reader_thread(server, proxy):
+    '''The blocking query is answered by the reader thread.'''
+    def _answer():
+        (req_id, _, addr), = _receive(server, 1)
+        server.sendto(req_id + b' {}', addr)
+    thread = threading.Thread(target=_answer)
+    thread.start()
+    assert proxy.query("stack") == "{}"
+    thread.join()
+
+
+def test_expired(server, proxy):
+    '''A late response to an expired request is dropped.'''
+    fut = proxy.query_async("stack", 0.2)
+    with pytest.raises(concurrent.futures.TimeoutError):
+        fut.result(2)
+    assert not proxy.pending
+    (req_id, _, addr), = _receive(server, 1)
+    server.sendto(req_id + b' late', addr)
+
+    def _answer():
+        (req_id, _, addr), = _receive(server, 1)
+        server.sendto(req_id + b' fresh', addr)
+    thread = threading.Thread(target=_answer)
+    thread.start()
+    assert proxy.query("stack") == "fresh"
+    thread.join()
+
+
+def test_cancelled(server, proxy):
+    '''A cancelled request is forgotten immediately.'''
+    fut = proxy.query_async("stack")
+    assert proxy.pending
+    fut.cancel()
+    assert not proxy.pending
+    assert _receive(server, 1)[0][1] == b"stack"
+
+
+def test_not_connected(common, proxy):
+    '''The query is answered empty without the proxy.'''
+    assert proxy.query_async("stack").result(0) == ''
+    assert "not connected" in common.vim.commands[0]
@@ -0,0 +1,27 @@
+'''Test the capture replay.'''
+import capture
+import replay
+
+
+def test_replay(tmp_path):
+    '''Smoke.'''
+    path = str(tmp_path / "capture")
+    writer = capture.Writer(path, "GDB")
+    writer.write(capture.OUTPUT, b"\x1a\x1a\x1a")
+    writer.write(capture.OUTPUT, b"c\r\nContinuing.\r\n")
+    writer.write(capture.OUTPUT, b"\r\n\x1a\x1a/tmp/test.c:5:40:beg:0x1\r\n")
+    writer.write(capture.OUTPUT, b"\x1a\x1a\x1a")
+    writer.write(capture.REQUEST, b"1 handle-command info breakpoints")
+    writer.write(capture.FILTER, b"\x1a\x1a\x1a")
+    writer.write(capture.OUTPUT, b"server info breakpoints\r\n"
+                                 b"No breakpoints.\r\n\x1a\x1a\x1a")
+    writer.write(capture.RESPONSE, b"1 No breakpoints.")
+    writer.close()
+
+    stats = replay.replay(path)
+    assert stats["backend"] == "gdb"
+    assert stats["chunks"] == 5
+    assert stats["side_channel_ms"]["count"] == 1
+    # The concealed output doesn't reach the parser
+    assert stats["events"] == {"continue_program": 1, "jump_to_source": 1,
+                               "query_breakpoints": 2}
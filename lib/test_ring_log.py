@@ -0,0 +1,27 @@
+'''Test the in-memory log.'''
+import logging
+from ring_log import RingHandler
+
+
+def test_ring(tmp_path):
+    '''Only the last records are kept, errors are dumped once a while.'''
+    crash = tmp_path / "crash.log"
+    handler = RingHandler(3, str(crash))
+    logger = logging.getLogger("test_ring")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    try:
+        for i in range(5):
+            logger.debug("record %d", i)
+        assert not crash.exists()
+        logger.error("failure")
+        lines = crash.read_text().splitlines()
+        assert [line.split(": ")[-1] for line in lines] == \
+            ["record 3", "record 4", "failure"]
+        # The repeating errors don't flood the disk
+        logger.error("another failure")
+        assert crash.read_text().splitlines() == lines
+        assert handler.dump(str(tmp_path / "dump.log")) == 3
+    finally:
+        logger.removeHandler(handler)
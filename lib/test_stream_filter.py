@@ -28,3 +28,12 @@ def test_update_finish():
     filt.update_finish_matcher(re.compile(rb"\n\(gdb\) "))
     assert (b"", b'  server nvim-gdb-breakpointfoo-bar\n(gdb) ') \
         == filt.filter(b"\n(gdb) ")
+
+
+def test_patience():
+    '''A batch filter outlives the silence.'''
+    assert StreamFilter(re.compile(b"qwer")).is_expired()
+    filt = StreamFilter(re.compile(b"qwer"), 60.)
+    assert not filt.is_expired()
+    filt.deadline = 0.
+    assert filt.is_expired()
@@ -0,0 +1,71 @@
+'''Test the background thread of a session.'''
+
+import threading
+from gdb.parser import UiHandler
+from gdb.worker import Worker
+
+
+def test_order(common):
+    '''The jobs are executed in the order of submission off the caller.'''
+    worker = Worker(common, "test-order")
+    done = []
+    for i in range(100):
+        worker.submit(lambda i: done.append((i, threading.get_ident())), i)
+    worker.cleanup()
+    worker.thread.join(2)
+    assert not worker.thread.is_alive()
+    assert [i for i, _ in done] == list(range(100))
+    assert {ident for _, ident in done} == {worker.thread.ident}
+
+
+def test_failure(common):
+    '''A failing job doesn't stop the worker.'''
+    worker = Worker(common, "test-failure")
+    done = []
+    worker.submit(lambda: 1 / 0)
+    worker.submit(done.append, 1)
+    worker.cleanup()
+    worker.thread.join(2)
+    assert done == [1]
+
+
+def test_shutdown(common):
+    '''The pending jobs are finished before the worker stops.'''
+    worker = Worker(common, "test-shutdown")
+    release = threading.Event()
+    done = []
+    worker.submit(release.wait, 2)
+    worker.submit(done.append, 1)
+    worker.cleanup()
+    worker.submit(done.append, 2)
+    assert worker.thread.is_alive()
+    release.set()
+    worker.thread.join(2)
+    assert not worker.thread.is_alive()
+    assert done == [1]
+
+
+def test_ui_events():
+    '''The events still queued for the editor are dropped after cleanup.'''
+    queued = []
+    delivered = []
+
+    class _Vim:
+        @staticmethod
+        def async_call(func, *args):
+            queued.append((func, args))
+
+    class _Handler:
+        @staticmethod
+        def jump_to_source(fname, line):
+            delivered.append((fname, line))
+
+    handler = UiHandler(_Vim(), _Handler())
+    handler.jump_to_source("a.c", 1)
+    func, args = queued.pop()
+    func(*args)
+    handler.jump_to_source("a.c", 2)
+    handler.cleanup()
+    func, args = queued.pop()
+    func(*args)
+    assert delivered == [("a.c", 1)]
@@ -14,6 +14,9 @@ command! -nargs=1 -complete=shellcmd GdbStartLLDB call s:Spawn('lldb', 'lldb_wra
 command! -nargs=1 -complete=shellcmd GdbStartPDB call s:Spawn('pdb', 'pdb_proxy.py', <q-args>)
 command! -nargs=1 -complete=shellcmd GdbStartBashDB call s:Spawn('bashdb', 'bashdb_proxy.py', <q-args>)
 
+command! -nargs=? -complete=file GdbDumpLog call GdbDumpLog(<q-args>)
+command! -nargs=+ GdbLogLevel call GdbLogLevel(<f-args>)
+
 if !exists('g:nvimgdb_disable_start_keymaps') || !g:nvimgdb_disable_start_keymaps
   nnoremap <leader>dd :GdbStart gdb -q a.out
   nnoremap <leader>dl :GdbStartLLDB lldb a.out
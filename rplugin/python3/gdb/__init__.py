@@ -1,7 +1,6 @@
 """Plugin entry point."""
 
 # pylint: disable=broad-except
-import re
 from contextlib import contextmanager
 import logging
 import logging.config
@@ -10,8 +9,10 @@ import pynvim   # type: ignore
 from gdb.common import BaseCommon, Common
 from gdb.app import App
 from gdb.config import Config
-from gdb.logger import LOGGING_CONFIG
+from gdb.logger import LOGGING_CONFIG, DUMP_PATH, get_ring_handler
 from gdb.efmmgr import EfmMgr
+from gdb.pathmgr import PathMgr
+from gdb.profiler import CountedVim
 
 
 @pynvim.plugin
@@ -21,11 +22,14 @@ class Gdb(Common):
     def __init__(self, vim):
         """ctor."""
         logging.config.dictConfig(LOGGING_CONFIG)
-        common = BaseCommon(vim, None)
+        # Count the requests to the editor in the profiled stages
+        common = BaseCommon(CountedVim(vim), None)
         super().__init__(common)
         self.apps: Dict[int, App] = {}
-        self.ansi_escaper = re.compile(r'\x1B[@-_][0-?]*[ -/]*[@-~]')
         self.efmmgr = None
+        self.pathmgr = None
+        # The configuration is reused by the sessions until changed
+        self.config = None
 
     def _get_app(self) -> int:
         return self.apps.get(self.vim.current.tabpage.handle, None)
@@ -34,10 +38,14 @@ class Gdb(Common):
     def gdb_init(self, args):
         """Handle the command GdbInit."""
         # Prepare configuration: keymaps, hooks, parameters etc.
-        common = BaseCommon(self.vim, Config(self))
+        variables = Config.read_variables(self.vim)
+        if self.config is None or self.config.variables != variables:
+            self.config = Config(self, variables)
+        common = BaseCommon(self.vim, self.config)
         if not self.apps:
             self.efmmgr = EfmMgr(common)
-        app = App(common, self.efmmgr, *args)
+            self.pathmgr = PathMgr(common)
+        app = App(common, self.efmmgr, self.pathmgr, *args)
         self.apps[self.vim.current.tabpage.handle] = app
         app.start()
         if len(self.apps) == 1:
@@ -70,6 +78,7 @@ class Gdb(Common):
                         self.vim.call("nvimgdb#GlobalCleanup")
                         self.efmmgr.cleanup()
                         self.efmmgr = None
+                        self.pathmgr = None
                     app.cleanup(tab)
                 # TabEnter isn't fired automatically when a tab is closed
                 self.gdb_handle_event(["on_tab_enter"])
@@ -88,6 +97,16 @@ class Gdb(Common):
         except Exception:
             self.logger.exception("GdbHandleEvent Exception")
 
+    @pynvim.function('GdbHandlePathEvent')
+    def gdb_handle_path_event(self, args):
+        """Handle the function GdbHandlePathEvent."""
+        try:
+            if self.pathmgr:
+                handler = getattr(self.pathmgr, args[0])
+                handler(*args[1:])
+        except Exception:
+            self.logger.exception("GdbHandlePathEvent Exception")
+
     @pynvim.function('GdbHandleTabClosed', sync=True)
     def gdb_handle_tab_closed(self, _):
         """Handle the function GdbHandleTabClosed."""
@@ -106,6 +125,35 @@ class Gdb(Common):
         for tab in [t for t, _ in self.apps.items()]:
             self.gdb_cleanup([tab])
 
+    @pynvim.function('GdbDumpLog', sync=True)
+    def gdb_dump_log(self, args):
+        """Handle command GdbDumpLog."""
+        path = args[0] if args and args[0] else DUMP_PATH
+        try:
+            handler = get_ring_handler()
+            count = handler.dump(path) if handler else 0
+            self.vim.out_write(f"{count} log records are written to {path}\n")
+            # The proxies keep their own logs
+            for tab, app in self.apps.items():
+                proxy_path = f"{path}.proxy{tab}"
+                if app.proxy.query(f"nvim-gdb-log-dump {proxy_path}"):
+                    self.vim.out_write(f"The proxy log is written to"
+                                       f" {proxy_path}\n")
+        except Exception:
+            self.logger.exception("GdbDumpLog Exception")
+
+    @pynvim.function('GdbLogLevel', sync=True)
+    def gdb_log_level(self, args):
+        """Handle command GdbLogLevel."""
+        level = args[0].upper()
+        name = args[1] if len(args) > 1 else ''
+        try:
+            logging.getLogger(name).setLevel(level)
+            for app in self.apps.values():
+                app.proxy.query(f"nvim-gdb-log-level {level} {name}")
+        except Exception:
+            self.logger.exception("GdbLogLevel Exception")
+
     @pynvim.function('GdbSend', sync=True)
     def gdb_send(self, args):
         """Handle command GdbSend."""
@@ -117,12 +165,12 @@ class Gdb(Common):
             self.logger.exception("GdbSend Exception")
 
     @pynvim.function('GdbBreakpointToggle', sync=True)
-    def gdb_breakpoint_toggle(self, _):
+    def gdb_breakpoint_toggle(self, args):
         """Handle command GdbBreakpointToggle."""
         try:
             app = self._get_app()
             if app:
-                app.breakpoint_toggle()
+                app.breakpoint_toggle(*args)
         except Exception:
             self.logger.exception('GdbBreakpointToggle Exception')
 
@@ -143,10 +191,7 @@ class Gdb(Common):
             tab = args[0]
             app = self.apps.get(tab, None)
             if app:
-                content = args[1]
-                for i, ele in enumerate(content):
-                    content[i] = self.ansi_escaper.sub('', ele)
-                app.parser.feed(content)
+                app.parser_feed(args[1])
         except Exception:
             self.logger.exception('GdbParserFeed Exception')
 
@@ -157,7 +202,7 @@ class Gdb(Common):
             tab = args[0]
             app = self.apps.get(tab, None)
             if app:
-                app.parser.delay_elapsed(args[1])
+                app.parser_delay_elapsed(args[1])
         except Exception:
             self.logger.exception('GdbParserDelayElapsed Exception')
 
@@ -1,7 +1,10 @@
 """."""
 
+import os
 import re
-from typing import Union, Dict, Type
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Type, Union
 
 from gdb.common import Common
 from gdb.cursor import Cursor
@@ -9,8 +12,14 @@ from gdb.client import Client
 from gdb.win import Win
 from gdb.keymaps import Keymaps
 from gdb.proxy import Proxy
+from gdb.listener import StopListener
 from gdb.breakpoint import Breakpoint
-from gdb.parser import ParserAdapter
+from gdb.bpstore import BreakpointStore
+from gdb.dataquery import DataQuery
+from gdb.views import Views
+from gdb.parser import ParserAdapter, UiHandler
+from gdb.worker import Worker
+from gdb.profiler import Profiler
 
 from gdb.backend import base
 from gdb.backend.gdb import Gdb
@@ -22,11 +31,14 @@ from gdb.backend.bashdb import BashDB
 class App(Common):
     """Main application class."""
 
-    def __init__(self, common, efmmgr, backendStr: str, proxyCmd: str,
-                 clientCmd: str):
+    ansi_escaper = re.compile(r'\x1B[@-_][0-?]*[ -/]*[@-~]')
+
+    def __init__(self, common, efmmgr, pathmgr, backendStr: str,
+                 proxyCmd: str, clientCmd: str):
         """ctor."""
         super().__init__(common)
         self.efmmgr = efmmgr
+        self.pathmgr = pathmgr
         self._last_command: Union[str, None] = None
 
         # Create new tab for the debugging view and split horizontally
@@ -48,23 +60,54 @@ class App(Common):
         # Go to the other window and spawn gdb client
         self.client = Client(common, proxyCmd, clientCmd)
 
+        # The blocking work of the session is done in its own thread.
+        self.worker = Worker(common, f"NvimGdb-{backendStr}")
+
+        # Time the stages of every step
+        self.profiler = Profiler(common)
+
         # Initialize connection to the side channel
         self.proxy = Proxy(common, self.client)
+        # And to the service inside the debugger if there is one
+        self.service = None
+        if self.backend.service_channel:
+            self.service = Proxy(common, self.client,
+                                 self.backend.service_channel)
 
         # Initialize breakpoint tracking
-        breakpoint_impl = self.backend.create_breakpoint_impl(self.proxy)
-        self.breakpoint = Breakpoint(common, self.proxy, breakpoint_impl)
+        breakpoint_impl = self.backend.create_breakpoint_impl(
+            self.proxy, self.service, pathmgr)
+        self.breakpoint = Breakpoint(common, self.proxy, breakpoint_impl,
+                                     pathmgr, self.worker, self.profiler)
+        if self.config.get_or('persist_breakpoints', False):
+            self.breakpoint.load(
+                BreakpointStore(common, backendStr, clientCmd), self.backend,
+                os.path.join(self.client.get_sock_dir(), "breakpoints"))
 
         # Initialize the keymaps subsystem
         self.keymaps = Keymaps(common)
 
         # Initialize the windowing subsystem
         self.win = Win(common, self.cursor, self.client,
-                       self.breakpoint, self.keymaps)
+                       self.breakpoint, self.keymaps, pathmgr)
+
+        # Initialize the structured requests to the debugger and the views
+        # of the program state filled by them
+        self.views = Views(common, self.backend,
+                           DataQuery(common, self.backend, self.proxy,
+                                     self.service),
+                           self.client, self.win, self.keymaps)
 
         # Initialize the parser
-        parser_adapter = ParserAdapter(common, self.cursor, self.win)
-        self.parser = self.backend.create_parser_impl(common, parser_adapter)
+        parser_adapter = ParserAdapter(common, self.cursor, self.win,
+                                       self.breakpoint, self.views.frames,
+                                       self.profiler)
+        self.ui_handler = UiHandler(self.vim, parser_adapter)
+        self.parser = self.backend.create_parser_impl(common,
+                                                      self.ui_handler)
+
+        # Receive the stop events pushed by the debugger
+        self.stop_listener = StopListener(common, self.client, parser_adapter)
 
         # Set initial keymaps in the terminal window.
         self.keymaps.dispatch_set_t()
@@ -86,29 +129,64 @@ class App(Common):
         """Finish up the debugging session."""
         self.vim.command("doautocmd User NvimGdbCleanup")
 
+        # The events parsed in the worker may still be on the way
+        self.ui_handler.cleanup()
+
         # Remove from 'errorformat' for the given backend.
         self.efmmgr.teardown(self.backend.get_error_formats())
 
+        # Remember the breakpoints for the next session
+        self.breakpoint.save()
+
         # Clean up the breakpoint signs
         self.breakpoint.reset_signs()
 
         # Clean up the current line sign
         self.cursor.hide()
 
+        # Clean up the keymaps of the source buffers
+        self.keymaps.cleanup()
+
         # Clean up the windows and buffers
         self.win.cleanup()
 
         # Close connection to the side channel
         self.proxy.cleanup()
+        if self.service:
+            self.service.cleanup()
+        self.stop_listener.cleanup()
 
         # Close the debugger backend
         self.client.cleanup()
+        self.worker.cleanup()
 
         # Close the windows and the tab
         for tabpage in self.vim.tabpages:
             if tabpage.handle == tab:
                 self.vim.command(f"tabclose! {tabpage.number}")
 
+    def parser_feed(self, content):
+        """Parse the debugger output in the worker."""
+        self.worker.submit(self._parser_feed, content)
+
+    def _parser_feed(self, content):
+        with self.profiler.span("feed"):
+            for i, ele in enumerate(content):
+                content[i] = self.ansi_escaper.sub('', ele)
+            self.parser.feed(content)
+        # Until the delayed parsing is continued
+        self.profiler.mark("delay", self.parser.byte_count)
+
+    def parser_delay_elapsed(self, byte_count):
+        """Continue parsing in the worker."""
+        self.worker.submit(self._parser_delay_elapsed, byte_count,
+                           time.perf_counter())
+
+    def _parser_delay_elapsed(self, byte_count, elapsed_at):
+        self.profiler.record_since("delay", byte_count, elapsed_at)
+        with self.profiler.span("search"):
+            self.parser.delay_elapsed(byte_count)
+
     def _get_command(self, cmd):
         return self.backend.translate_command(cmd)
 
@@ -116,10 +194,14 @@ class App(Common):
         """Send a command to the debugger."""
         if args:
             command = self._get_command(args[0]).format(*args[1:])
-            self.client.send_line(command)
+            self.profiler.begin_step(command)
+            with self.profiler.span("send"):
+                self.client.send_line(command)
             self._last_command = command  # Remember the command for testing
         else:
-            self.client.interrupt()
+            self.profiler.begin_step("interrupt")
+            with self.profiler.span("send"):
+                self.client.interrupt()
 
     def custom_command(self, cmd):
         """Execute a custom debugger command and return its output."""
@@ -155,31 +237,150 @@ class App(Common):
         # Return the cursor to the previous window
         self.vim.command("wincmd l")
 
-    def breakpoint_toggle(self):
-        """Toggle breakpoint in the cursor line."""
+    def breakpoint_toggle(self, first: int = 0, last: int = 0):
+        """Toggle breakpoint in the cursor line or in the range of lines."""
+        buf = self.vim.current.buffer
+        file_name = self.pathmgr.get_path(buf.handle)
+        if first != last:
+            # Clear the lines with breakpoints, set them in the others
+            to_set, to_delete = [], []
+            for line_nr in range(first, last + 1):
+                breaks = self.breakpoint.get_for_file(file_name, line_nr)
+                if breaks:
+                    to_delete.extend(breaks)
+                else:
+                    to_set.append(line_nr)
+            self._breakpoint_batch(buf.handle, file_name, to_set, to_delete)
+            return
+
         if self.parser.is_running():
             # pause first
             self.client.interrupt()
-        buf = self.vim.current.buffer
-        file_name = self.vim.call("expand", '#%d:p' % buf.handle)
-        line_nr = self.vim.call("line", ".")
+        line_nr = first or self.vim.call("line", ".")
         breaks = self.breakpoint.get_for_file(file_name, line_nr)
 
         if breaks:
             # There already is a breakpoint on this line: remove
+            bid = breaks[-1]
+            self.breakpoint.unmark(buf.handle, file_name, line_nr, bid)
             del_br = self._get_command('delete_breakpoints')
-            self.client.send_line(f"{del_br} {breaks[-1]}")
+            self._breakpoint_change(
+                buf.handle, file_name, f"breakpoint-delete {bid}",
+                lambda: self.client.send_line(f"{del_br} {bid}"))
         else:
+            marker = self.breakpoint.mark(buf.handle, file_name, line_nr)
             set_br = self._get_command('breakpoint')
-            self.client.send_line(f"{set_br} {file_name}:{line_nr}")
+            self._breakpoint_change(
+                buf.handle, file_name, f"breakpoint-set {file_name}:{line_nr}",
+                lambda: self.client.send_line(
+                    f"{set_br} {file_name}:{line_nr}"),
+                marker)
+
+    def breakpoint_enable(self, enabled: bool, *ids: str):
+        """Enable or disable the breakpoints.
+
+        The breakpoints of the cursor line are disabled if no ids given.
+        """
+        buf = self.vim.current.buffer
+        file_name = self.pathmgr.get_path(buf.handle)
+        if not ids and not enabled:
+            ids = tuple(self.breakpoint.get_for_file(
+                file_name, self.vim.call("line", ".")))
+        if not ids:
+            return
+        if self.parser.is_running():
+            # pause first
+            self.client.interrupt()
+        request = "breakpoint-enable" if enabled else "breakpoint-disable"
+        command = self._get_command("enable_breakpoints" if enabled
+                                    else "disable_breakpoints")
+        self._breakpoint_change(
+            buf.handle, file_name, f"{request} {' '.join(ids)}",
+            lambda: self.client.send_line(f"{command} {' '.join(ids)}"))
+
+    def _breakpoint_change(self, buf: int, file_name: str, request: str,
+                           fallback: Callable[[], None],
+                           marker: Optional[str] = None):
+        """Change the breakpoints silently via the side channel.
+
+        The debugger reports the changed breakpoints with their locations,
+        so the signs are reconciled without querying all the breakpoints.
+        The fallback types the change into the terminal instead: when
+        the program is running, or the backend can't do it. The signs
+        are reconciled at the following prompt then.
+        """
+        if not self.parser.is_paused() or \
+                not self.views.data_query.is_supported():
+            fallback()
+            return
+
+        def _on_result(result):
+            if result is None:
+                fallback()
+                return
+            self.breakpoint.apply(buf, file_name, result["breakpoints"],
+                                  marker)
+        self.views.data_query.query_async(request, _on_result)
+
+    def breakpoint_pattern(self, pattern: str, bang: str = ''):
+        """Set breakpoints in the lines matching the pattern.
+
+        The pattern may be delimited like /regex/. With the bang,
+        the breakpoints of the matching lines are cleared instead.
+        """
+        if len(pattern) > 1 and pattern[0] == pattern[-1] \
+                and not pattern[0].isalnum():
+            pattern = pattern[1:-1]
+        buf = self.vim.current.buffer
+        file_name = self.pathmgr.get_path(buf.handle)
+        to_set, to_delete = [], []
+        for line_nr in self.vim.call("nvimgdb#MatchLines", pattern):
+            breaks = self.breakpoint.get_for_file(file_name, line_nr)
+            if bang:
+                to_delete.extend(breaks)
+            elif not breaks:
+                to_set.append(line_nr)
+        self._breakpoint_batch(buf.handle, file_name, to_set, to_delete)
+
+    def _breakpoint_batch(self, buf: int, file_name: str,
+                          to_set: List[int], to_delete: List[str]):
+        """Send the breakpoint changes in one request via the side channel.
+
+        The signs are updated once when the debugger is done.
+        """
+        commands = []
+        if to_delete:
+            del_br = self._get_command('delete_breakpoints')
+            commands.append(f"{del_br} {' '.join(to_delete)}")
+        if to_set:
+            commands.extend(self.backend.format_breakpoints(
+                {file_name: to_set}))
+        if not commands:
+            return
+        if self.parser.is_running():
+            # pause first
+            self.client.interrupt()
+        command = self.backend.chain_commands(commands)
+        if command is None:
+            fd, path = tempfile.mkstemp(prefix="batch",
+                                        dir=self.client.get_sock_dir())
+            with os.fdopen(fd, 'w', encoding='utf-8') as script:
+                script.write("\n".join(commands) + "\n")
+            command = self.backend.source_command(path)
+        self.breakpoint.batch(command, buf, file_name)
 
     def breakpoint_clear_all(self):
         """Clear all breakpoints."""
         if self.parser.is_running():
             # pause first
             self.client.interrupt()
+        buf = self.vim.current.buffer
         # The breakpoint signs will be requeried later automatically
-        self.send('delete_breakpoints')
+        # if the command is typed into the terminal.
+        self._breakpoint_change(buf.handle,
+                                self.pathmgr.get_path(buf.handle),
+                                "breakpoint-delete",
+                                lambda: self.send('delete_breakpoints'))
 
     def on_tab_enter(self):
         """Actions to execute when a tabpage is entered."""
@@ -194,6 +395,8 @@ class App(Common):
         # Hide the signs
         self.cursor.hide()
         self.breakpoint.clear_signs()
+        # The buffer may be shown in the other tab, drop its keymaps
+        self.keymaps.release_left()
 
     def on_buf_enter(self):
         """Actions to execute when a buffer is entered."""
@@ -207,6 +410,8 @@ class App(Common):
                 self.vim.command("if !&scrolloff"
                                  f" | setlocal scrolloff={str(scroll_off)}"
                                  " | endif")
+            # Unmap the buffer replaced in the jump window if any
+            self.keymaps.release_left(self.vim.current.buffer.handle)
             self.keymaps.dispatch_set()
             # Ensure breakpoints are shown if are queried dynamically
             self.win.query_breakpoints()
@@ -224,8 +429,9 @@ class App(Common):
         """Load backtrace or breakpoints into the location list."""
         cmd = ''
         if kind == "backtrace":
-            cmd = self.backend.translate_command('bt')
-        elif kind == "breakpoints":
+            self.views.backtrace.open(mods)
+            return
+        if kind == "breakpoints":
             cmd = self.backend.translate_command('info breakpoints')
         else:
             self.logger.warning("Unknown lopen kind %s", kind)
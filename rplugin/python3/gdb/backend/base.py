@@ -1,7 +1,11 @@
 """Base class for backends."""
 
 import abc
-from typing import List
+import logging
+from typing import Dict, List, Optional, Pattern, Tuple
+
+# The breakpoint table indexed: {file -> {line -> [id]}}
+Index = Dict[str, Dict[str, List[str]]]
 
 
 class ParserHandler(abc.ABC):
@@ -43,30 +47,170 @@ class BaseBreakpoint(abc.ABC):
     def query(self, fname: str):
         """Query actual breakpoints for the given file."""
 
+    def query_all(self) -> Optional[Index]:
+        """Query all enabled breakpoints: {file -> {line -> [id]}}.
+
+        None means the breakpoints couldn't be queried.
+        """
+        return None
+
+    def query_with_all(self, fname: str
+                       ) -> Tuple[Dict[str, List[str]], Optional[Index]]:
+        """Query the breakpoints for the given file and all of them."""
+        return self.query(fname), self.query_all()
+
     def dummy(self):
         """Treat the linter."""
 
+    @staticmethod
+    def index_table(pattern, response: str) -> Index:
+        """Index the breakpoint table: {file -> {line -> [id]}}.
+
+        The pattern matches the rows of the enabled breakpoints in one pass
+        over the whole response, the groups are: id, file, line. The rows
+        are matched from the preceding new line, which is faster than ^.
+        """
+        index: Index = {}
+        for match in pattern.finditer('\n' + response):
+            br_id, fname, line = match.groups()
+            lines = index.get(fname)
+            if lines is None:
+                lines = index[fname] = {}
+            ids = lines.get(line)
+            if ids is None:
+                lines[line] = [br_id]
+            else:
+                ids.append(br_id)
+        return index
+
+    @staticmethod
+    def merge_index(index: Index, matches) -> Dict[str, List[str]]:
+        """Collect the breakpoints of the files accepted by matches(file)."""
+        breaks: Dict[str, List[str]] = {}
+        for fname, lines in index.items():
+            if not matches(fname):
+                continue
+            if not breaks:
+                breaks = {line: list(ids) for line, ids in lines.items()}
+                continue
+            for line, ids in lines.items():
+                breaks.setdefault(line, []).extend(ids)
+        return breaks
+
+
+class TableBreakpoint(BaseBreakpoint):
+    """Breakpoints parsed from the table listed by the debugger.
+
+    The whole table is listed anyway, so the breakpoints for the file
+    and all of them are parsed from one response.
+    """
+
+    # The command listing the table
+    listing = "info breakpoints"
+    # The rows of the enabled breakpoints, see index_table()
+    _row: Pattern[str]
+
+    def __init__(self, proxy, name: str):
+        """ctor."""
+        self.proxy = proxy
+        self.logger = logging.getLogger(name)
+
+    def query_table(self) -> Optional[Index]:
+        """List and index the breakpoint table, None on failure."""
+        self.logger.info("Query breakpoints")
+        response = self.proxy.query(f"handle-command {self.listing}")
+        if not response:
+            return None
+        return self.index_table(self._row, response)
+
+    @abc.abstractmethod
+    def select(self, index: Index, fname: str) -> Dict[str, List[str]]:
+        """Select the breakpoints for the given file from the index."""
+
+    def query(self, fname: str):
+        """Query actual breakpoints for the given file."""
+        index = self.query_table()
+        return {} if index is None else self.select(index, fname)
+
+    def query_all(self):
+        """Query all enabled breakpoints."""
+        return self.query_table()
+
+    def query_with_all(self, fname: str):
+        """Query the breakpoints for the given file and all of them."""
+        index = self.query_table()
+        if index is None:
+            return {}, None
+        return self.select(index, fname), index
+
 
 class BaseBackend(abc.ABC):
     """Abstract base class for a debugger backend."""
 
+    # The name of the socket in the session directory served from within
+    # the debugger if the backend has one besides the proxy.
+    service_channel: Optional[str] = None
+
     @abc.abstractmethod
     def create_parser_impl(self, common, handler: ParserHandler) -> BaseParser:
         """Create a Parser implementation instance."""
 
     @abc.abstractmethod
-    def create_breakpoint_impl(self, proxy) -> BaseBreakpoint:
-        """Create a BaseBreakpoint implementation instance."""
+    def create_breakpoint_impl(self, proxy, service,
+                               pathmgr) -> BaseBreakpoint:
+        """Create a BaseBreakpoint implementation instance.
+
+        The service is the connection to the service_channel if any.
+        """
+
+    # The commands of the debugger, GDB's by default
+    command_map: Dict[str, str] = {
+        'delete_breakpoints': 'delete',
+        'enable_breakpoints': 'enable',
+        'disable_breakpoints': 'disable',
+        'breakpoint': 'break',
+        'info breakpoints': 'info breakpoints',
+    }
 
-    @abc.abstractmethod
     def translate_command(self, command: str) -> str:
         """Adapt command for the debugger if necessary."""
+        return self.command_map.get(command, command)
 
     @abc.abstractmethod
     def get_error_formats(self):
         """Return the list of errorformats for backtrace, breakpoints."""
 
+    @staticmethod
+    def format_breakpoints(locations: Dict[str, List[int]]) -> List[str]:
+        """Make a script of the debugger commands to set the breakpoints."""
+        return [f"break {fname}:{line}"
+                for fname, lines in locations.items() for line in lines]
+
+    @staticmethod
+    @abc.abstractmethod
+    def chain_commands(commands: List[str]) -> Optional[str]:
+        """Join the commands to be executed at once if possible.
+
+        None means they should be sourced from a script instead.
+        """
+
+    @staticmethod
+    def source_command(path: str) -> Optional[str]:
+        """Get the debugger command executing the script.
+
+        None means the script is picked up by the debugger on its own.
+        """
+        return f"source {path}"
+
     @staticmethod
     def llist_filter_breakpoints(locations):
         """Filter out service lines in the breakpoint list capture."""
         return locations
+
+    @abc.abstractmethod
+    def format_data_request(self, request: str) -> Optional[str]:
+        """Prepare a structured data request for the side channel.
+
+        The request is sent to the service_channel if any, otherwise
+        to the proxy. None means the backend answers no such requests.
+        """
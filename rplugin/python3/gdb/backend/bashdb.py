@@ -1,9 +1,6 @@
 """BashDB specifics."""
 
-import logging
-import os
 import re
-from typing import Dict, List
 from gdb.backend import parser_impl
 from gdb.backend import base
 
@@ -28,52 +25,28 @@ class _ParserImpl(parser_impl.ParserImpl):
         self.add_trans(self.running, re_prompt, self._query_b)
         self.state = self.running
 
-    def _running_jump(self, match):
-        fname = match.group(1)
-        line = match.group(2)
-        self.logger.info("_running_jump %s:%s", fname, line)
-        self.handler.jump_to_source(fname, int(line))
-        return self.running
-
     def _handle_terminated(self, _):
         self.handler.continue_program()
         return self.paused
 
 
-class _BreakpointImpl(base.BaseBreakpoint):
-    def __init__(self, proxy):
-        self.proxy = proxy
-        self.logger = logging.getLogger("BashDB.Breakpoint")
+class _BreakpointImpl(base.TableBreakpoint):
+    def __init__(self, proxy, pathmgr):
+        super().__init__(proxy, "BashDB.Breakpoint")
+        self.pathmgr = pathmgr
 
-    def query(self, fname: str):
-        self.logger.info("Query breakpoints for %s", fname)
-        response = self.proxy.query("handle-command info breakpoints")
-        if not response:
-            return {}
+    # Num Type       Disp Enb What
+    # 1   breakpoint keep y   /tmp/nvim-gdb/test/main.sh:22
+    _row = re.compile(r'\n(\d+)[ \t]+\S+[ \t]+\S+[ \t]+y[ \t]+'
+                      r'(.+):(\d+)\r?$', re.MULTILINE)
 
+    def select(self, index, fname):
         # Select lines in the current file with enabled breakpoints.
-        pattern = re.compile(r"([^:]+):(\d+)")
-        breaks: Dict[str, List[str]] = {}
-        for line in response.splitlines():
-            try:
-                fields = re.split(r"\s+", line)
-                if fields[3] == 'y':    # Is enabled?
-                    match = pattern.fullmatch(fields[-1])   # file.cpp:line
-                    if not match:
-                        continue
-                    bpfname = match.group(1)
-                    if (bpfname == fname or os.path.realpath(fname) ==
-                            os.path.realpath(bpfname)):
-                        line = match.group(2)
-                        br_id = fields[0]
-                        try:
-                            breaks[line].append(br_id)
-                        except KeyError:
-                            breaks[line] = [br_id]
-            except (ValueError, IndexError):
-                continue
-
-        return breaks
+        real_fname = self.pathmgr.resolve(fname)
+        return self.merge_index(
+            index,
+            lambda bpfname: (bpfname == fname or
+                             real_fname == self.pathmgr.resolve(bpfname)))
 
 
 class BashDB(base.BaseBackend):
@@ -83,19 +56,18 @@ class BashDB(base.BaseBackend):
         """Create parser implementation instance."""
         return _ParserImpl(common, handler)
 
-    def create_breakpoint_impl(self, proxy):
+    def create_breakpoint_impl(self, proxy, _service, pathmgr):
         """Create breakpoint impl instance."""
-        return _BreakpointImpl(proxy)
+        return _BreakpointImpl(proxy, pathmgr)
 
-    command_map = {
-        'delete_breakpoints': 'delete',
-        'breakpoint': 'break',
-        'info breakpoints': 'info breakpoints',
-    }
+    @staticmethod
+    def chain_commands(_commands):
+        """The commands are sourced from a script."""
+        return None
 
-    def translate_command(self, command):
-        """Adapt command if necessary."""
-        return self.command_map.get(command, command)
+    def format_data_request(self, _request):
+        """BashDB answers no structured data requests."""
+        return None
 
     def get_error_formats(self):
         """Return the list of errorformats for backtrace, breakpoints."""
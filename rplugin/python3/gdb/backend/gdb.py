@@ -1,12 +1,11 @@
 """GDB specifics."""
 
+import re
+from typing import Dict, List
 from gdb.proxy import Proxy
+from gdb.pathmgr import PathMgr
 from gdb.parser import ParserAdapter
 from gdb.common import Common
-import logging
-import os
-import re
-from typing import Dict, List
 from gdb.backend import parser_impl
 from gdb.backend import base
 
@@ -31,52 +30,28 @@ class _ParserImpl(parser_impl.ParserImpl):
         self.state = self.running
 
 
-class _BreakpointImpl(base.BaseBreakpoint):
-    def __init__(self, proxy: Proxy):
+class _BreakpointImpl(base.TableBreakpoint):
+    def __init__(self, proxy: Proxy, pathmgr: PathMgr):
         """ctor."""
-        self.proxy = proxy
-        self.logger = logging.getLogger("Gdb.Breakpoint")
-
-    def query(self, fname: str) -> Dict[str, List[str]]:
-        self.logger.info("Query breakpoints for %s", fname)
-        response = self.proxy.query("handle-command info breakpoints")
-        if not response:
-            return {}
-        return self._parse_response(response, fname)
-
-    def _parse_response(self, response: str, fname_sym: str) -> Dict[str, List[str]]:
+        super().__init__(proxy, "Gdb.Breakpoint")
+        self.pathmgr = pathmgr
+
+    # The enabled breakpoints and locations with an address:
+    #   1       breakpoint     keep y   0x0000000000001139 in main at test.c:5
+    #   2.1                         y   0x0000000000001149 in Foo at test.c:10
+    # If a breakpoint has multiple locations, GDB only allows to disable
+    # by the breakpoint number, not location number. For instance, 1.4 -> 1
+    _row = re.compile(r'\n(\d+)(?:\.\d+)?[ \t]+(?:\S+[ \t]+){0,3}?y[ \t]+'
+                      r'0x[0-9a-fA-F]+[ \t].*? at (\S+):(\d+)\r?$',
+                      re.MULTILINE)
+
+    def select(self, index: base.Index,
+               fname: str) -> Dict[str, List[str]]:
         # Select lines in the current file with enabled breakpoints.
-        pos_pattern = re.compile(r"([^:]+):(\d+)")
-        enb_pattern = re.compile(r"\sy\s+0x")
-        breaks: Dict[str, List[str]] = {}
-        for line in response.splitlines():
-            try:
-                if enb_pattern.search(line):    # Is enabled?
-                    fields = re.split(r"\s+", line)
-                    # file.cpp:line
-                    match = pos_pattern.fullmatch(fields[-1])
-                    if not match:
-                        continue
-                    is_end_match = fname_sym.endswith(match.group(1))
-                    is_end_match_full_path = fname_sym.endswith(
-                        os.path.realpath(match.group(1)))
-                    if (match and
-                            (is_end_match or is_end_match_full_path)):
-                        line = match.group(2)
-                        # If a breakpoint has multiple locations, GDB only
-                        # allows to disable by the breakpoint number, not
-                        # location number.  For instance, 1.4 -> 1
-                        br_id = fields[0].split('.')[0]
-                        try:
-                            breaks[line].append(br_id)
-                        except KeyError:
-                            breaks[line] = [br_id]
-            except IndexError:
-                continue
-            except ValueError:
-                self.logger.exception('Exception')
-
-        return breaks
+        return self.merge_index(
+            index, lambda bpfname: (fname.endswith(bpfname) or
+                                    fname.endswith(
+                                        self.pathmgr.resolve(bpfname))))
 
 
 class Gdb(base.BaseBackend):
@@ -86,25 +61,37 @@ class Gdb(base.BaseBackend):
         """Create parser implementation instance."""
         return _ParserImpl(common, handler)
 
-    def create_breakpoint_impl(self, proxy: Proxy):
+    def create_breakpoint_impl(self, proxy: Proxy, _service,
+                               pathmgr: PathMgr):
         """Create breakpoint implementation instance."""
-        return _BreakpointImpl(proxy)
-
-    command_map = {
-        'delete_breakpoints': 'delete',
-        'breakpoint': 'break',
-        'info breakpoints': 'info breakpoints',
-    }
-
-    def translate_command(self, command: str) -> str:
-        """Adapt command if necessary."""
-        return self.command_map.get(command, command)
+        return _BreakpointImpl(proxy, pathmgr)
 
     def get_error_formats(self):
         """Return the list of errorformats for backtrace, breakpoints."""
         return ["%m\ at\ %f:%l", "%m\ %f:%l"]
 
+    @staticmethod
+    def format_breakpoints(locations):
+        """Make a script of the debugger commands to set the breakpoints.
+
+        The breakpoints in the shared libraries not loaded yet are kept
+        pending, GDB would drop them quietly under `confirm off`.
+        """
+        return ["set breakpoint pending on",
+                *base.BaseBackend.format_breakpoints(locations),
+                "set breakpoint pending auto"]
+
     @staticmethod
     def llist_filter_breakpoints(locations):
         """Filter out service lines in the breakpoint list capture."""
         return [s for s  in locations if not s.startswith("Num")]
+
+    @staticmethod
+    def chain_commands(_commands):
+        """The commands are sourced from a script."""
+        return None
+
+    def format_data_request(self, request):
+        """Prepare a structured data request for the side channel."""
+        # Answered by the commands from lib/gdb_commands.py
+        return "handle-command nvim-gdb-" + request
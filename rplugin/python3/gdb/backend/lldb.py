@@ -54,6 +54,20 @@ class _BreakpointImpl(base.BaseBreakpoint):
             return {}
         return breaks
 
+    # The lines of nvim-gdb-info-breakpoints: path:line breakpoint id
+    _row = re.compile(r'\n(.+):(\d+) breakpoint (\d+)\r?$', re.MULTILINE)
+
+    def query_all(self):
+        resp = self.proxy.query("handle-command nvim-gdb-info-breakpoints")
+        if not resp:
+            return None
+        index: base.Index = {}
+        for fname, line, bid in self._row.findall('\n' + resp):
+            ids = index.setdefault(fname, {}).setdefault(line, [])
+            if bid not in ids:
+                ids.append(bid)
+        return index
+
 
 class Lldb(base.BaseBackend):
     """LLDB parser and FSM."""
@@ -62,23 +76,43 @@ class Lldb(base.BaseBackend):
         """Create parser implementation instance."""
         return _ParserImpl(common, handler)
 
-    def create_breakpoint_impl(self, proxy: Proxy) -> base.BaseBreakpoint:
+    def create_breakpoint_impl(self, proxy: Proxy, _service,
+                               _pathmgr) -> base.BaseBreakpoint:
         """Create breakpoint implementation instance."""
         return _BreakpointImpl(proxy)
 
     command_map = {
         'delete_breakpoints': 'breakpoint delete',
+        'enable_breakpoints': 'breakpoint enable',
+        'disable_breakpoints': 'breakpoint disable',
         'breakpoint': 'b',
         'until {}': 'thread until {}',
         'info breakpoints': 'nvim-gdb-info-breakpoints',
     }
 
-    def translate_command(self, command: str) -> str:
-        """Adapt command if necessary."""
-        return self.command_map.get(command, command)
-
     def get_error_formats(self):
         """Return the list of errorformats for backtrace, breakpoints."""
         # Breakpoint list is queried specifically with a custom command
         # nvim-gdb-info-breakpoints, which is only implemented in the proxy.
         return ["%m\ at\ %f:%l", "%f:%l\ %m"]
+
+    @staticmethod
+    def format_breakpoints(locations):
+        """Make a script of the debugger commands to set the breakpoints."""
+        return [f'breakpoint set --file "{fname}" --line {line}'
+                for fname, lines in locations.items() for line in lines]
+
+    @staticmethod
+    def chain_commands(_commands):
+        """The commands are sourced from a script."""
+        return None
+
+    @staticmethod
+    def source_command(path):
+        """Get the debugger command executing the script."""
+        return f"command source {path}"
+
+    def format_data_request(self, request):
+        """Prepare a structured data request for the side channel."""
+        # Answered by the server in lib/lldb_commands.py
+        return request
@@ -17,7 +17,11 @@ else:
 
 
 class ParserImpl(Common, BaseParser):
-    """Common FSM implementation for the integrated backends."""
+    """Common FSM implementation for the integrated backends.
+
+    The parser runs in the worker of the session, the handler is expected
+    to pass the events to the editor thread.
+    """
 
     # [(matcher, matchingFunc)]
     transition_type = Callable[[MatchType], None]
@@ -38,6 +42,8 @@ class ParserImpl(Common, BaseParser):
         self.byte_count = 1
         # Ordered byte counters to ensure parsing in the right order
         self.parsing_progress: List[int] = []
+        # The tabpage of the session to schedule the parsing in
+        self.tab = self.vim.current.tabpage.handle
 
     @staticmethod
     def add_trans(state: state_list_type, matcher: MatcherType,
@@ -72,6 +78,13 @@ class ParserImpl(Common, BaseParser):
         self.handler.jump_to_source(fname, int(line))
         return self.paused
 
+    def _running_jump(self, match: MatchType):
+        fname = match.group(1)
+        line = match.group(2)
+        self.logger.info("_running_jump %s:%s", fname, line)
+        self.handler.jump_to_source(fname, int(line))
+        return self.running
+
     def _paused(self, _):
         self.logger.info('_paused')
         return self.paused
@@ -102,9 +115,9 @@ class ParserImpl(Common, BaseParser):
         # Unfortunately, we can't just use self.vim.loop.call_later()
         # because nvim won't execute commands from that context.
         # So it's necessary to use nvim's timers.
-        cur_tab = self.vim.current.tabpage.handle
-        handler = f"GdbParserDelayElapsed({cur_tab}, {byte_count})"
-        self.vim.command(f"call timer_start(50, {{id -> {handler}}})")
+        handler = f"GdbParserDelayElapsed({self.tab}, {byte_count})"
+        self.vim.async_call(self.vim.command,
+                            f"call timer_start(50, {{id -> {handler}}})")
 
     def _search(self, ignore_tail_bytes):
         if len(self.buffer) <= ignore_tail_bytes:
@@ -1,11 +1,11 @@
 """PDB specifics."""
 
+import json
+import re
+from typing import Optional
 from gdb.common import Common
 from gdb.parser import ParserAdapter
 from gdb.proxy import Proxy
-import re
-import logging
-from typing import Dict, List
 from gdb.backend import parser_impl
 from gdb.backend import base
 
@@ -26,73 +26,88 @@ class _ParserImpl(parser_impl.ParserImpl):
         self.add_trans(self.running, re_prompt, self._query_b)
         self.state = self.running
 
-    def _running_jump(self, match):
-        fname = match.group(1)
-        line = match.group(2)
-        self.logger.info("_running_jump %s:%s", fname, line)
-        self.handler.jump_to_source(fname, int(line))
-        return self.running
-
 
-class _BreakpointImpl(base.BaseBreakpoint):
-    def __init__(self, proxy: Proxy):
+class _BreakpointImpl(base.TableBreakpoint):
+    def __init__(self, proxy: Proxy, service: Optional[Proxy]):
         """ctor."""
-        self.proxy = proxy
-        self.logger = logging.getLogger("Pdb.Breakpoint")
+        super().__init__(proxy, "Pdb.Breakpoint")
+        self.service = service
+
+    # PDB lists nothing when there are no breakpoints, so an empty
+    # response can't be told from a failure.
+    listing = "break"
+
+    # Num Type         Disp Enb   Where
+    # 1   breakpoint   keep yes   at /tmp/nvim-gdb/test/main.py:8
+    _row = re.compile(r'\n(\d+)[ \t]+breakpoint[ \t]+\S+[ \t]+yes[ \t]+'
+                      r'at (.+):(\d+)\r?$', re.MULTILINE)
+
+    def _ask_service(self, request: str) -> Optional[dict]:
+        """Ask the debugger directly if launched with the pdb shim."""
+        if not self.service:
+            return None
+        response = self.service.query(request)
+        if not response:
+            return None
+        try:
+            result = json.loads(response)
+        except ValueError:
+            self.logger.exception("Unexpected response %s", response)
+            return None
+        if '_error' in result:
+            self.logger.warning("Can't get breakpoints: %s",
+                                result['_error'])
+            return None
+        return result
 
     def query(self, fname: str):
         """Query actual breakpoints for the given file."""
         self.logger.info("Query breakpoints for %s", fname)
+        breaks = self._ask_service(f"info-breakpoints {fname}")
+        return super().query(fname) if breaks is None else breaks
 
-        response = self.proxy.query("handle-command break")
+    def query_all(self):
+        """Query all enabled breakpoints."""
+        index = self._ask_service("all-breakpoints")
+        return self.query_table() if index is None else index
 
-        # Num Type         Disp Enb   Where
-        # 1   breakpoint   keep yes   at /tmp/nvim-gdb/test/main.py:8
+    def query_with_all(self, fname: str):
+        """Query the breakpoints for the given file and all of them."""
+        if self.service:
+            # The shim answers without listing the table in the terminal
+            return self.query(fname), self.query_all()
+        return super().query_with_all(fname)
 
-        breaks: Dict[str, List[str]] = {}
-        for line in response.splitlines():
-            try:
-                tokens = re.split(r'\s+', line)
-                bid = tokens[0]
-                if tokens[1] != 'breakpoint':
-                    continue
-                if tokens[3] != 'yes':
-                    continue
-                src_line = re.split(r':', tokens[-1])
-                if fname == src_line[0]:
-                    try:
-                        breaks[src_line[1]].append(bid)
-                    except KeyError:
-                        breaks[src_line[1]] = [bid]
-            except (IndexError, ValueError):
-                continue
-
-        return breaks
+    def select(self, index, fname):
+        """Select the breakpoints for the given file."""
+        return index.get(fname, {})
 
 
 class Pdb(base.BaseBackend):
     """PDB parser and FSM."""
 
+    # Served by lib/pdb_shim.py
+    service_channel = "pdb"
+
     def create_parser_impl(self, common: Common, handler: ParserAdapter):
         """Create parser implementation instance."""
         return _ParserImpl(common, handler)
 
-    def create_breakpoint_impl(self, proxy: Proxy):
+    def create_breakpoint_impl(self, proxy: Proxy, service: Optional[Proxy],
+                               _pathmgr):
         """Create breakpoint implementation instance."""
-        return _BreakpointImpl(proxy)
+        return _BreakpointImpl(proxy, service)
 
     command_map = {
         'delete_breakpoints': 'clear',
+        'enable_breakpoints': 'enable',
+        'disable_breakpoints': 'disable',
         'breakpoint': 'break',
         'finish': 'return',
         'print {}': 'print({})',
         'info breakpoints': 'break',
     }
 
-    def translate_command(self, command):
-        """Adapt command if necessary."""
-        return self.command_map.get(command, command)
-
     def get_error_formats(self):
         """Return the list of errorformats for backtrace, breakpoints."""
         return ["%m\ at\ %f:%l", "%[>\ ]%#%f(%l)%m"]
@@ -117,3 +132,17 @@ class Pdb(base.BaseBackend):
     def llist_filter_breakpoints(locations):
         """Filter out service lines in the breakpoint list capture."""
         return [s for s  in locations if not s.startswith("Num")]
+
+    @staticmethod
+    def chain_commands(commands):
+        """Join the commands with ;; to be executed at once."""
+        return " ;; ".join(commands)
+
+    @staticmethod
+    def source_command(_path):
+        """PDB has no command to source, lib/pdb_shim.py loads the script."""
+        return None
+
+    def format_data_request(self, request):
+        """Prepare a structured data request for the side channel."""
+        return request
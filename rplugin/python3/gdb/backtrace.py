@@ -0,0 +1,92 @@
+"""Paged backtrace loading into the location list."""
+
+from gdb.common import Common
+from gdb.frames import Frames
+from gdb.win import Win
+from gdb.backend.base import BaseBackend
+
+
+class Backtrace(Common):
+    """Load the backtrace into the location list page by page.
+
+    The frames come from the frame cache of the current stop. The first
+    page is loaded when the location list is open, the next pages are
+    requested when the cursor in the location list window approaches
+    the end of the loaded frames.
+    """
+
+    def __init__(self, common: Common, backend: BaseBackend, frames: Frames,
+                 win: Win):
+        """ctor."""
+        super().__init__(common)
+        self.backend = backend
+        self.frames = frames
+        self.win = win
+        self.page_size = self.config.get_or('backtrace_page_size', 100)
+        # The stop the location list was open for
+        self.frames_generation = 0
+        # Every new location list gets a new id, which distinguishes
+        # the responses for the previous ones.
+        self.list_id = 0
+        # The number of frames loaded so far
+        self.loaded = 0
+        self.complete = True
+        self.loading = False
+
+    def open(self, mods):
+        """Open the location list and load the first page of frames."""
+        if not self.frames.is_supported():
+            # The backend can't describe the frames, parse the backtrace.
+            cmd = self.backend.translate_command('bt')
+            self.win.lopen(cmd, 'backtrace', mods)
+            return
+        self.frames_generation = self.frames.generation
+        self.loaded = 0
+        self.complete = False
+        self.loading = False
+        self.list_id = self.win.lopen_paged("Backtrace", mods,
+                                            "views.backtrace.on_cursor_moved")
+        self._load_next()
+
+    def on_cursor_moved(self, line: int, last_line: int):
+        """Load more frames when the cursor approaches the end."""
+        if last_line - line < max(1, self.page_size // 4):
+            self._load_next()
+
+    def _load_next(self):
+        if self.loading or self.complete:
+            return
+        if self.frames_generation != self.frames.generation:
+            # The program has moved on, the list is outdated.
+            self.complete = True
+            return
+        self.loading = True
+        self.logger.info("Load backtrace frames from %d", self.loaded)
+        list_id = self.list_id
+        self.frames.load(self.loaded + self.page_size,
+                         lambda success: self._on_page(list_id, success))
+
+    def _on_page(self, list_id: int, success: bool):
+        if list_id != self.list_id:
+            return
+        self.loading = False
+        if not success:
+            self.logger.warning("Backtrace page request failed")
+            self.complete = True
+            return
+        frames = self.frames.frames[self.loaded:self.loaded + self.page_size]
+        self.loaded += len(frames)
+        if len(frames) < self.page_size:
+            self.complete = True
+        if frames:
+            self.win.ladd(self.list_id, [self._to_item(f) for f in frames])
+
+    @staticmethod
+    def _to_item(frame):
+        item = {'text': Frames.format(frame)}
+        if 'file' in frame:
+            item['filename'] = frame['file']
+            item['lnum'] = frame['line']
+        else:
+            item['valid'] = 0
+        return item
@@ -0,0 +1,59 @@
+"""Keep the breakpoints between the sessions."""
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+from gdb.common import Common
+from gdb.backend.base import Index
+
+
+# {file -> [line]}
+Locations = Dict[str, List[int]]
+
+
+class BreakpointStore(Common):
+    """The breakpoints of a project and a binary on disk.
+
+    The store is identified by the working directory, the backend and
+    the debugger command line. Only the enabled breakpoints are kept,
+    as the lines of the files: {"file": [line, ...]}.
+    """
+
+    def __init__(self, common: Common, backend: str, command: str):
+        """ctor."""
+        super().__init__(common)
+        cwd = self.vim.call("getcwd")
+        key = hashlib.sha1(f"{backend}\0{cwd}\0{command}".encode('utf-8'))
+        self.path = os.path.join(self.vim.call("stdpath", "data"), "nvimgdb",
+                                 "breakpoints", f"{key.hexdigest()[:16]}.json")
+        self.header = {"backend": backend, "cwd": cwd, "command": command}
+        # All the breakpoints of the session as of the last refresh
+        self.index: Optional[Index] = None
+        # The debugger command to restore the saved ones at the first prompt
+        self.restore_command: Optional[str] = None
+
+    def load(self) -> Locations:
+        """Read the breakpoints saved by the last session if any."""
+        try:
+            with open(self.path, encoding='utf-8') as store:
+                return json.load(store).get("breakpoints", {})
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            self.logger.exception("Failed to load the breakpoints")
+            return {}
+
+    def save(self, locations: Locations):
+        """Write the breakpoints down."""
+        self.logger.info("Save %d files with breakpoints to %s",
+                         len(locations), self.path)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as store:
+                json.dump(dict(self.header, breakpoints=locations), store,
+                          separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            self.logger.exception("Failed to save the breakpoints")
@@ -1,23 +1,46 @@
 """."""
 
-from typing import Dict, List
+import itertools
+import time
+from typing import Callable, Dict, List, Optional, Set
 from gdb.common import Common
 from gdb.proxy import Proxy
-from gdb.backend.base import BaseBreakpoint
+from gdb.pathmgr import PathMgr
+from gdb.worker import Worker
+from gdb.profiler import Profiler
+from gdb.bpstore import BreakpointStore
+from gdb.backend.base import BaseBackend, BaseBreakpoint, Index
+
+
+# Setting hundreds of breakpoints in a big binary takes a while,
+# the proxy answers on its own if the debugger is silent for 30s.
+BATCH_TIMEOUT = 35.
+
+# The provisional breakpoints are shown until the debugger confirms them,
+# their ids are ?1, ?2 etc.
+_MARKERS = itertools.count(1)
 
 
 class Breakpoint(Common):
     """Handle breakpoint signs."""
 
-    def __init__(self, common: Common, proxy: Proxy, impl: BaseBreakpoint):
+    def __init__(self, common: Common, proxy: Proxy, impl: BaseBreakpoint,
+                 pathmgr: PathMgr, worker: Worker, profiler: Profiler):
         """ctor."""
         super().__init__(common)
         self.proxy = proxy
+        self.pathmgr = pathmgr
+        self.worker = worker
+        self.profiler = profiler
         # Backend class to query breakpoints
         self.impl = impl
         # Discovered breakpoints so far: {file -> {line -> [id]}}
         self.breaks: Dict[str, Dict[str, List[str]]] = {}
         self.max_sign_id = 0
+        # Incremented on reset to drop the results of the queries in flight
+        self.generation = 0
+        # The breakpoints kept between the sessions if enabled
+        self.store: Optional[BreakpointStore] = None
 
     def clear_signs(self):
         """Clear all breakpoint signs."""
@@ -29,7 +52,7 @@ class Breakpoint(Common):
         if buf != -1:
             sign_id = 5000 - 1
             # Breakpoints need full path to the buffer (at least in lldb)
-            bpath = self.vim.call("expand", f'#{buf}:p')
+            bpath = self.pathmgr.get_path(buf)
 
             def _get_sign_name(count):
                 max_count = len(self.config.get('sign_breakpoint'))
@@ -45,18 +68,193 @@ class Breakpoint(Common):
             self.max_sign_id = sign_id
 
     def query(self, buf_num: int, fname: str):
-        """Query actual breakpoints for the given file."""
+        """Query actual breakpoints for the given file.
+
+        The backend may wait for the side channel, so the query is done
+        in the worker, and the signs are updated when it's done.
+        """
         self.logger.info("Query breakpoints for %s", fname)
-        self.breaks[fname] = self.impl.query(fname)
+        self.worker.submit(self._query, self.generation, buf_num, fname,
+                           time.perf_counter())
+
+    def _query(self, generation: int, buf_num: int, fname: str,
+               start: Optional[float] = None):
+        with self.profiler.span("breakpoint_wait"):
+            if self.store is None:
+                breaks, index = self.impl.query(fname), None
+            else:
+                # The debugger may be gone by the end of the session,
+                # so the breakpoints to save are taken while it's alive.
+                breaks, index = self.impl.query_with_all(fname)
+        self.vim.async_call(self._on_query, generation, buf_num, fname,
+                            breaks, index, start)
+
+    def _on_query(self, generation: int, buf_num: int, fname: str,
+                  breaks: Dict[str, List[str]], index: Optional[Index],
+                  start: Optional[float]):
+        if generation != self.generation:
+            return
+        if index is not None and self.store is not None:
+            self.store.index = index
+        with self.profiler.span("breakpoint_signs"):
+            self.breaks[fname] = breaks
+            self._show(buf_num)
+        if start is not None:
+            # From the submission to the signs shown
+            self.profiler.record("query", start, time.perf_counter())
+
+    def _show(self, buf_num: int):
         self.clear_signs()
         self._set_signs(buf_num)
+        self.vim.command("redraw")
+
+    def mark(self, buf_num: int, fname: str, line: int) -> str:
+        """Show a provisional breakpoint until the debugger confirms it.
+
+        Returns the provisional id to pass to apply().
+        """
+        marker = f"?{next(_MARKERS)}"
+        self.breaks.setdefault(fname, {}).setdefault(str(line), []) \
+            .append(marker)
+        self._show(buf_num)
+        return marker
+
+    def unmark(self, buf_num: int, fname: str, line: int, bid: str):
+        """Hide the breakpoint being deleted until the debugger confirms."""
+        lines = self.breaks.get(fname, {})
+        ids = lines.get(str(line), [])
+        if bid in ids:
+            ids.remove(bid)
+            if not ids:
+                del lines[str(line)]
+        self._show(buf_num)
+
+    def apply(self, buf_num: int, fname: str,
+              breakpoints: Dict[str, List[List]],
+              marker: Optional[str] = None):
+        """Index the changed breakpoints and update the signs right away.
+
+        The breakpoints are {id -> [[file, line]]} as reported by the
+        debugger, the deleted and disabled ones have no locations.
+        The provisional breakpoint is replaced by the actual one, which
+        may have been resolved to another line.
+        """
+        with self.profiler.span("breakpoint_signs"):
+            changed = set(breakpoints)
+            if marker is not None:
+                changed.add(marker)
+            for lines in self.breaks.values():
+                self._drop(lines, changed)
+            self.breaks.setdefault(fname, {})
+            for bid, locations in breakpoints.items():
+                for bfile, line in locations:
+                    real_file = self.pathmgr.resolve(bfile)
+                    for known, lines in self.breaks.items():
+                        if known == bfile or \
+                                self.pathmgr.resolve(known) == real_file:
+                            lines.setdefault(str(line), []).append(bid)
+            self._show(buf_num)
+        index = self.store.index if self.store is not None else None
+        if index is not None:
+            # Keep the breakpoints to save up to date without a query
+            for lines in index.values():
+                self._drop(lines, changed)
+            for bid, locations in breakpoints.items():
+                for bfile, line in locations:
+                    index.setdefault(bfile, {}) \
+                        .setdefault(str(line), []).append(bid)
+
+    @staticmethod
+    def _drop(lines: Dict[str, List[str]], ids: Set[str]):
+        """Remove the breakpoints from the lines of a file."""
+        for line in list(lines):
+            kept = [bid for bid in lines[line] if bid not in ids]
+            if kept:
+                lines[line] = kept
+            else:
+                del lines[line]
 
     def reset_signs(self):
         """Reset all known breakpoints and their signs."""
+        self.generation += 1
         self.breaks = {}
         self.clear_signs()
 
+    def load(self, store: BreakpointStore, backend: BaseBackend,
+             script_path: str):
+        """Prepare the breakpoints of the last session to be restored.
+
+        The script setting them is written before the debugger is
+        launched, and it's sourced once the debugger is ready.
+        """
+        self.store = store
+        # Like in the queries, the files with spaces are skipped
+        locations = {fname: lines for fname, lines in store.load().items()
+                     if ' ' not in fname}
+        if not locations:
+            return
+        with open(script_path, 'w', encoding='utf-8') as script:
+            script.write("\n".join(backend.format_breakpoints(locations)))
+            script.write("\n")
+        store.restore_command = backend.source_command(script_path)
+
+    def restore(self, on_done: Callable[[], None]) -> bool:
+        """Set the breakpoints of the last session in bulk.
+
+        Returns whether there is anything to restore, on_done() is called
+        in the editor thread once the breakpoints are set.
+        """
+        if self.store is None or self.store.restore_command is None:
+            return False
+        command, self.store.restore_command = self.store.restore_command, None
+        self.logger.info("Restore breakpoints: %s", command)
+        self._run_batch("breakpoint_restore", command, on_done)
+        return True
+
+    def batch(self, command: str, buf_num: int, fname: str):
+        """Execute the breakpoint commands at once, then query the file."""
+        self.logger.info("Batch of breakpoints: %s", command)
+        generation = self.generation
+        self._run_batch(
+            "breakpoint_batch", command,
+            lambda: self.worker.submit(self._query, generation, buf_num,
+                                       fname))
+
+    def _run_batch(self, stage: str, command: str,
+                   on_done: Callable[[], None]):
+        # The batch may take long, so it's not waited for in the worker
+        # not to hold up the other queries.
+        start = time.perf_counter()
+
+        def _on_done():
+            self.profiler.record(stage, start, time.perf_counter())
+            on_done()
+        fut = self.proxy.query_async(f"handle-batch {command}",
+                                     BATCH_TIMEOUT)
+        fut.add_done_callback(lambda _: self.vim.async_call(_on_done))
+
+    def save(self):
+        """Save the breakpoints known as of the last refresh.
+
+        The files are resolved not to set a breakpoint twice if the
+        debugger reports a file by different paths.
+        """
+        if self.store is None or self.store.index is None:
+            return
+        locations: Dict[str, Set[int]] = {}
+        for fname, lines in self.store.index.items():
+            if lines:
+                locations.setdefault(self.pathmgr.resolve(fname), set()) \
+                    .update(int(line) for line in lines)
+        self.store.save({fname: sorted(lines)
+                         for fname, lines in locations.items()})
+
     def get_for_file(self, fname: str, line: int):
-        """Get breakpoints for the given position in a file."""
+        """Get breakpoints for the given position in a file.
+
+        The provisional breakpoints aren't known to the debugger yet.
+        """
         breaks = self.breaks.get(fname, {})
-        return breaks.get(f"{line}", {})   # make sure the line is a string
+        # make sure the line is a string
+        return [bid for bid in breaks.get(f"{line}", [])
+                if not bid.startswith("?")]
@@ -1,6 +1,7 @@
 """."""
 
 import os
+import shutil
 from gdb.common import Common
 from gdb.sockdir import SockDir
 
@@ -45,8 +46,25 @@ class Client(Common):
                 os.remove(self.proxy_addr)
             except FileNotFoundError:
                 pass
+        self._keep_capture()
         self.sock_dir.cleanup()
 
+    def _keep_capture(self):
+        """Move the session capture out of the temporary directory."""
+        capture_dir = os.environ.get('NVIMGDB_CAPTURE')
+        capture = os.path.join(self.sock_dir.get(), 'capture')
+        if not capture_dir or not os.path.exists(capture):
+            return
+        if not os.path.isdir(capture_dir):
+            self.logger.warning("NVIMGDB_CAPTURE isn't a directory: %s",
+                                capture_dir)
+            return
+        name = os.path.basename(self.sock_dir.get()) + '.capture'
+        try:
+            shutil.move(capture, os.path.join(capture_dir, name))
+        except OSError:
+            self.logger.exception("Failed to keep the capture")
+
     def start(self):
         """Open a terminal window with the debugger client command."""
         # Go to the yet-to-be terminal window
@@ -35,13 +35,26 @@ class Config(Common):
         'sign_breakpoint_priority': 10,
         'codewin_command': 'new',
         'set_scroll_off': 5,
+        'backtrace_page_size': 100,
+        'locals_page_size': 100,
+        'profile_steps': 100,
+        'persist_breakpoints': False,
+        'lazy_view_threshold': 32 << 20,
+        'source_substitutions': [],
+        'source_index_ignore': ['node_modules', '__pycache__'],
         "start_in_insert": 0
         }
 
-    def __init__(self, common: Common):
-        """Prepare actual configuration with overrides resolved."""
+    def __init__(self, common: Common, variables: Dict[str, Any]):
+        """Prepare actual configuration with overrides resolved.
+
+        The variables are the snapshot of g:nvimgdb_* given by
+        read_variables(). The configuration can be reused while they
+        don't change.
+        """
         super().__init__(common)
 
+        self.variables = variables
         self.key_to_func: Dict[str, str] = {}
 
         # Make a copy of the supplied configuration if defined
@@ -56,6 +69,11 @@ class Config(Common):
 
         self._define_signs()
 
+    @staticmethod
+    def read_variables(vim) -> Dict[str, Any]:
+        """Read all the variables g:nvimgdb_* at once."""
+        return vim.eval("filter(copy(g:), {k -> k =~# '^nvimgdb_'})")
+
     def _filter_funcref(self, def_conf: Dict[str, Any], key: str, val):
         """Turn a string into a funcref looking up a Vim function."""
         # Lookup the key in the default config.
@@ -69,8 +87,9 @@ class Config(Common):
     def _copy_user_config(self):
         # Make a copy of the supplied configuration if defined
         config = {}
-        if self.vim.call("exists", 'g:nvimgdb_config'):
-            config = self.vim.vars['nvimgdb_config']
+        if 'nvimgdb_config' in self.variables:
+            # Keep the snapshot intact to compare with later
+            config = copy.deepcopy(self.variables['nvimgdb_config'])
             for key, val in config.items():
                 filtered_val = self._filter_funcref(Config.default,
                                                     key, val)
@@ -86,8 +105,8 @@ class Config(Common):
 
     def _apply_overrides(self):
         # If there is config override defined, add it
-        if self.vim.call("exists", 'g:nvimgdb_config_override'):
-            override = self.vim.vars['nvimgdb_config_override']
+        if 'nvimgdb_config_override' in self.variables:
+            override = self.variables['nvimgdb_config_override']
             if override:
                 for key, val in override.items():
                     key_val = self._filter_funcref(Config.default, key, val)
@@ -100,8 +119,8 @@ class Config(Common):
         # key exists. If so, update the config.
         for key, _ in Config.default.items():
             vname = 'nvimgdb_' + key
-            if self.vim.call("exists", 'g:'+vname):
-                val = self.vim.vars[vname]
+            if vname in self.variables:
+                val = self.variables[vname]
                 if val:
                     key_val = self._filter_funcref(Config.default, key, val)
                     if key_val is None:
@@ -123,13 +142,14 @@ class Config(Common):
             self.key_to_func[key] = func
 
     def _define_signs(self):
-        # Define the sign for current line the debugged program is executing.
-        self.vim.call('sign_define', 'GdbCurrentLine',
-                      {'text': self.config["sign_current_line"]})
-        # Define signs for the breakpoints.
+        # Define the sign for current line the debugged program is executing
+        # and the signs for the breakpoints in one go.
+        signs = [{'name': 'GdbCurrentLine',
+                  'text': self.config["sign_current_line"]}]
         breaks = self.config["sign_breakpoint"]
         for i, brk in enumerate(breaks):
-            self.vim.call('sign_define', f'GdbBreakpoint{i+1}', {'text': brk})
+            signs.append({'name': f'GdbBreakpoint{i+1}', 'text': brk})
+        self.vim.call('sign_define', signs)
 
     def get(self, key: str):
         """Get the configuration value by key."""
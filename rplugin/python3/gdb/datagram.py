@@ -0,0 +1,59 @@
+"""Datagram sockets in the session directory."""
+
+import abc
+import os
+import socket
+import threading
+import time
+from gdb.common import Common
+
+
+class DatagramReader(Common, abc.ABC):
+    """A datagram socket bound in the session directory.
+
+    The datagrams are received by a background thread, which wakes up
+    periodically to let the subclass do its housekeeping.
+    """
+
+    def __init__(self, common: Common, sock_addr: str, timeout: float):
+        """ctor."""
+        super().__init__(common)
+        self.sock_addr = sock_addr
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(self.sock_addr)
+        self.sock.settimeout(timeout)
+        self.closed = False
+        self.reader = threading.Thread(target=self._read_loop, daemon=True)
+
+    def start_reading(self):
+        """Start the reader thread once the subclass is ready."""
+        self.reader.start()
+
+    def cleanup(self):
+        """destructor."""
+        self.closed = True
+        self.sock.close()
+        try:
+            os.remove(self.sock_addr)
+        except FileNotFoundError:
+            pass
+
+    def _read_loop(self):
+        while not self.closed:
+            try:
+                self._receive(self.sock.recv(65536))
+            except socket.timeout:
+                pass
+            except OSError:
+                if self.closed:
+                    break
+                self.logger.exception("Read error")
+                time.sleep(0.1)
+            self._tick()
+
+    @abc.abstractmethod
+    def _receive(self, data: bytes):
+        """Handle a datagram in the reader thread."""
+
+    def _tick(self):
+        """Do the housekeeping after every wakeup of the reader."""
@@ -0,0 +1,101 @@
+"""Structured requests to the debugger."""
+
+import concurrent.futures
+import json
+from typing import Any, Callable, Optional
+from gdb.common import Common
+from gdb.proxy import Proxy
+from gdb.backend.base import BaseBackend
+
+
+class DataQuery(Common):
+    """Requests answered by the debugger in JSON.
+
+    The requests have the same names in every backend, for instance,
+    "stack 0 100". The backend routes them to the side channel: GDB
+    through the commands from lib/gdb_commands.py, LLDB to the server
+    in lib/lldb_commands.py, PDB to the shim lib/pdb_shim.py. The errors
+    are reported by the debugger as {"_error": message}.
+    """
+
+    def __init__(self, common: Common, backend: BaseBackend, proxy: Proxy,
+                 service: Optional[Proxy]):
+        """ctor."""
+        super().__init__(common)
+        self.backend = backend
+        self.channel = service if backend.service_channel else proxy
+
+    def is_supported(self) -> bool:
+        """Check whether the backend answers structured requests."""
+        return self.channel is not None and \
+            self.backend.format_data_request("") is not None
+
+    def query(self, request: str, timeout: float = 0.5) -> Any:
+        """Send a request and wait for the decoded response.
+
+        None means the request failed.
+        """
+        channel_request = self.backend.format_data_request(request)
+        if channel_request is None or self.channel is None:
+            return None
+        return self._decode(request,
+                            self.channel.query(channel_request, timeout))
+
+    def query_async(self, request: str, callback: Callable[[Any], None],
+                    timeout: float = 5.):
+        """Send a request, the decoded response is passed to the callback.
+
+        The callback is invoked in the main loop, None means the request
+        failed.
+        """
+        channel_request = self.backend.format_data_request(request)
+        if channel_request is None or self.channel is None:
+            callback(None)
+            return
+        fut = self.channel.query_async(channel_request, timeout)
+        fut.add_done_callback(
+            lambda f: self.vim.async_call(self._on_response, request, f,
+                                          callback))
+
+    def _on_response(self, request: str, fut: concurrent.futures.Future,
+                     callback: Callable[[Any], None]):
+        try:
+            response = fut.result()
+        except (concurrent.futures.TimeoutError,
+                concurrent.futures.CancelledError):
+            self.logger.warning("No response to the request: %s", request)
+            callback(None)
+            return
+        callback(self._decode(request, response))
+
+    def _decode(self, request: str, response: str) -> Any:
+        if not response:
+            return None
+        result = self._find_payload(response)
+        if result is None:
+            self.logger.warning("Unexpected response to %s: %s",
+                                request, response[:256])
+            return None
+        if isinstance(result, dict) and '_error' in result:
+            self.logger.info("Request %s failed: %s",
+                             request, result['_error'])
+            return None
+        return result
+
+    @staticmethod
+    def _find_payload(response: str) -> Any:
+        """Find the JSON line printed last.
+
+        The debugger console may print some chatter like [Inferior 1 ...]
+        around it or leave some garbage in front of it.
+        """
+        for line in reversed(response.splitlines()):
+            starts = [i for i in (line.find('{'), line.find('['))
+                      if i != -1]
+            if not starts:
+                continue
+            try:
+                return json.loads(line[min(starts):])
+            except ValueError:
+                continue
+        return None
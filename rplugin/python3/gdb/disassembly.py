@@ -0,0 +1,134 @@
+"""Disassembly window."""
+
+import bisect
+import collections
+from typing import List, Optional, Tuple
+from gdb.common import Common
+from gdb.dataquery import DataQuery
+from gdb.frames import Frames
+from gdb.keymaps import Keymaps
+from gdb.panel import Panel
+
+
+class Disassembly(Panel):
+    """Disassembly of the function of the selected frame.
+
+    The window follows the program counter of the selected frame. The
+    instructions are fetched through the debugger API page by page
+    and cached by (module build-id, address range), so stepping inside
+    a function or returning to it later needs no disassembly.
+    """
+
+    name = "Disassembly"
+    path = "views.disassembly"
+
+    # The instructions fetched at once
+    PAGE = 256
+    # The number of functions to remember
+    CACHE_SIZE = 64
+
+    def __init__(self, common: Common, query: DataQuery, frames: Frames,
+                 keymaps: Keymaps):
+        """ctor."""
+        super().__init__(common, query, keymaps)
+        self.frames = frames
+        self.sign_id = 5500
+        # {(module, start, end) -> [(address, text)]}, the least recently
+        # used first
+        self.cache: collections.OrderedDict = collections.OrderedDict()
+        # The function shown in the window
+        self.shown: Optional[Tuple[str, int, int]] = None
+        self.addresses: List[int] = []
+
+    def open(self):
+        """Open the window next to the current one."""
+        if not self.is_supported():
+            return
+        if self.buf is None:
+            self._create_buffer(["autocmd User NvimGdbBreak"
+                                 f" call GdbCallAsync('{self.path}.refresh')"])
+            self.buf.options['filetype'] = 'asm'
+            # Return the cursor to the previous window
+            self.vim.command("wincmd p")
+        self.refresh()
+
+    def _forget(self):
+        self.shown = None
+
+    def refresh(self):
+        """Show the program counter of the selected frame."""
+        if self.buf is None:
+            return
+        self.generation += 1
+        generation = self.generation
+
+        def on_frames(success: bool):
+            if generation != self.generation or not success or \
+                    self.frames.selected is None:
+                return
+            frame = self.frames.frames[self.frames.selected]
+            if 'address' in frame:
+                self._show_pc(generation, int(frame['address'], 16))
+
+        self.frames.load(self.frames.page_size, on_frames)
+
+    def _show_pc(self, generation: int, pc: int):
+        self.query.query_async(
+            f"function-range {pc}",
+            lambda resp: self._on_range(generation, pc, resp))
+
+    def _on_range(self, generation: int, pc: int, resp):
+        if generation != self.generation or resp is None:
+            return
+        key = (resp['module'], resp['start'], resp['end'])
+        instructions = self.cache.get(key, None)
+        if instructions is not None:
+            self.cache.move_to_end(key)
+            self._render(key, pc)
+            return
+        self._fetch(generation, key, pc, key[1], [])
+
+    def _fetch(self, generation: int, key: Tuple[str, int, int], pc: int,
+               start: int, instructions: List[Tuple[int, str]]):
+        self.query.query_async(
+            f"disassemble {start} {key[2]} {self.PAGE}",
+            lambda resp: self._on_page(generation, key, pc, start,
+                                       instructions, resp))
+
+    def _on_page(self, generation: int, key: Tuple[str, int, int], pc: int,
+                 start: int, instructions: List[Tuple[int, str]], resp):
+        if generation != self.generation or resp is None:
+            return
+        instructions.extend((i['address'], i['text'])
+                            for i in resp['instructions'])
+        if start < resp['next'] < key[2]:
+            self._fetch(generation, key, pc, resp['next'], instructions)
+            return
+        self.cache[key] = instructions
+        while len(self.cache) > self.CACHE_SIZE:
+            self.cache.popitem(last=False)
+        self._render(key, pc)
+
+    def _render(self, key: Tuple[str, int, int], pc: int):
+        if self.buf is None:
+            return
+        if self.shown != key:
+            instructions = self.cache[key]
+            self.addresses = [address for address, _ in instructions]
+            lines = [f"0x{address:016x} <+{address - key[1]}>: {text}"
+                     for address, text in instructions]
+            self.vim.call("nvim_buf_set_lines", self.buf.handle, 0, -1,
+                          False, lines)
+            self.shown = key
+        line = bisect.bisect_right(self.addresses, pc)
+        if line == 0:
+            return
+        self.vim.call('sign_unplace', 'NvimGdbDisassembly',
+                      {'buffer': self.buf.handle})
+        priority = self.config.get('sign_breakpoint_priority') + 1
+        self.vim.call('sign_place', self.sign_id, 'NvimGdbDisassembly',
+                      'GdbCurrentLine', self.buf.handle,
+                      {'lnum': line, 'priority': priority})
+        for win in self.vim.current.tabpage.windows:
+            if win.buffer == self.buf:
+                win.cursor = (line, 0)
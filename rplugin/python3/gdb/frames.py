@@ -0,0 +1,151 @@
+"""Stack frames of the current stop."""
+
+from typing import Any, Callable, Dict, List, Optional
+from gdb.common import Common
+from gdb.client import Client
+from gdb.dataquery import DataQuery
+from gdb.win import Win
+from gdb.backend.base import BaseBackend
+
+
+class Frames(Common):
+    """Cache of the stack frames fetched as structured data.
+
+    The frames are {level, function, file, line, address}, the innermost
+    frame has level 0, file, line and address may be missing. The frames
+    are fetched page by page when needed and kept until the program
+    continues or the debugger reports a new location. The frame
+    navigation selects a cached frame silently in the debugger and jumps
+    to it without parsing the console.
+    """
+
+    def __init__(self, common: Common, backend: BaseBackend,
+                 query: DataQuery, client: Client, win: Win):
+        """ctor."""
+        super().__init__(common)
+        self.backend = backend
+        self.query = query
+        self.client = client
+        self.win = win
+        self.page_size = self.config.get_or('backtrace_page_size', 100)
+        # Every stop gets a new generation to distinguish the responses
+        # to the requests made before.
+        self.generation = 0
+        self.frames: List[Dict[str, Any]] = []
+        self.complete = False
+        # The level of the frame selected in the debugger if known
+        self.selected: Optional[int] = None
+
+    def is_supported(self) -> bool:
+        """Check whether the frames can be fetched as structured data."""
+        return self.query.is_supported()
+
+    def invalidate(self):
+        """Forget the frames, the program is no longer where it was."""
+        self.generation += 1
+        self.frames = []
+        self.complete = False
+        self.selected = None
+
+    def load(self, count: int, callback: Callable[[bool], None]):
+        """Ensure the first count frames are loaded.
+
+        The callback is invoked in the main loop with the success flag.
+        """
+        if len(self.frames) >= count or self.complete:
+            callback(True)
+            return
+        start = len(self.frames)
+        generation = self.generation
+        self.query.query_async(
+            f"stack {start} {count - start}",
+            lambda resp: self._on_stack(generation, start, count, resp,
+                                        callback))
+
+    def _on_stack(self, generation: int, start: int, count: int, resp,
+                  callback: Callable[[bool], None]):
+        if generation != self.generation or resp is None:
+            callback(False)
+            return
+        frames = resp['frames']
+        # Another request for the same frames may have been answered first.
+        self.frames[start:start + len(frames)] = frames
+        if len(frames) < count - start:
+            self.complete = True
+        self.selected = resp['selected']
+        callback(True)
+
+    def up(self):
+        """Select the caller of the selected frame."""
+        self._move(1, 'up')
+
+    def down(self):
+        """Select the frame called by the selected frame."""
+        self._move(-1, 'down')
+
+    def show(self):
+        """Show the selected frame."""
+        self._move(0, 'f')
+
+    def _move(self, delta: int, command: str):
+        if not self.is_supported():
+            self._fallback(command)
+            return
+
+        def on_loaded(success: bool):
+            if not success:
+                self._fallback(command)
+                return
+            level = self.selected + delta
+            if level < len(self.frames) or self.complete:
+                self._select(level)
+            else:
+                self.load(level + self.page_size, on_loaded)
+
+        if self.selected is None:
+            self.load(self.page_size, on_loaded)
+        else:
+            on_loaded(True)
+
+    def _fallback(self, command: str):
+        self.client.send_line(self.backend.translate_command(command))
+
+    def _select(self, level: int):
+        if level < 0:
+            self.vim.command("echo 'Bottom (innermost) frame selected;"
+                             " you cannot go down.'")
+            return
+        if level >= len(self.frames):
+            self.vim.command("echo 'Initial frame selected;"
+                             " you cannot go up.'")
+            return
+        generation = self.generation
+        self.query.query_async(
+            f"select-frame {level}",
+            lambda resp: self._on_selected(generation, level, resp))
+
+    def _on_selected(self, generation: int, level: int, resp):
+        if generation != self.generation:
+            return
+        if resp is None:
+            self.logger.warning("Failed to select frame %d", level)
+            return
+        self.selected = level
+        frame = self.frames[level]
+        self.vim.out_write(self.format(frame) + "\n")
+        if 'file' in frame:
+            self.win.jump(frame['file'], frame['line'])
+            self.vim.command("doautocmd User NvimGdbBreak")
+        # The watches may depend on the selected frame.
+        self.vim.command("doautocmd User NvimGdbQuery")
+
+    @staticmethod
+    def format(frame: Dict[str, Any]) -> str:
+        """Describe the frame like the debuggers do."""
+        text = f"#{frame['level']}"
+        if 'address' in frame:
+            text += f" {frame['address']} in"
+        text += f" {frame['function']}"
+        if 'file' in frame:
+            text += f" at {frame['file']}:{frame['line']}"
+        return text
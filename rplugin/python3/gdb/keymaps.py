@@ -2,16 +2,27 @@
 
 # pylint: disable=broad-except
 
+from typing import List, Optional, Set
 from gdb.common import Common
 
 
 class Keymaps(Common):
-    """Keymaps manager."""
+    """Keymaps manager.
+
+    The keymaps of a buffer are defined with a single atomic request,
+    and the buffers having them are remembered: entering a buffer
+    that is already mapped costs nothing.
+    """
 
     def __init__(self, common: Common):
         """ctor."""
         super().__init__(common)
         self.dispatch_active = True
+        # The buffers having the keymaps
+        self.mapped: Set[int] = set()
+        # The buffer left in the jump window, its keymaps are kept
+        # until it's replaced there
+        self.left: Optional[int] = None
 
     def set_dispatch_active(self, state: bool):
         """Turn on/off keymaps manipulation."""
@@ -24,6 +35,7 @@ class Keymaps(Common):
         ('n', 'key_step', ':GdbStep'),
         ('n', 'key_finish', ':GdbFinish'),
         ('n', 'key_breakpoint', ':GdbBreakpointToggle'),
+        ('v', 'key_breakpoint', ':GdbBreakpointToggle'),
         ('n', 'key_frameup', ':GdbFrameUp'),
         ('n', 'key_framedown', ':GdbFrameDown'),
         ('n', 'key_eval', ':GdbEvalWord'),
@@ -31,27 +43,41 @@ class Keymaps(Common):
         ('n', 'key_quit', ':GdbDebugStop'),
     }
 
+    def _atomic(self, calls: List[list]):
+        """Make the API calls in one request, skip the failing ones."""
+        while calls:
+            _, error = self.vim.api.call_atomic(calls)
+            if not error:
+                break
+            self.logger.warning("Keymap failed: %s", error)
+            calls = calls[error[0] + 1:]
+
+    def _keystrokes(self):
+        for mode, key, cmd in Keymaps.default:
+            keystroke = self.config.get_or(key, None)
+            if keystroke is not None:
+                yield mode, keystroke, cmd
+
     def set(self):
         """Set buffer-local keymaps."""
-        for mode, key, cmd in Keymaps.default:
-            try:
-                keystroke = self.config.get_or(key, None)
-                if keystroke is not None:
-                    self.vim.command(
-                        f'{mode}noremap <buffer> <silent> {keystroke}'
-                        f' {cmd}<cr>')
-            except Exception:
-                self.logger.exception('Exception')
-
-    def unset(self):
+        buf = self.vim.current.buffer.handle
+        if buf in self.mapped:
+            return
+        opts = {'noremap': True, 'silent': True}
+        self._atomic([['nvim_buf_set_keymap',
+                       [buf, mode, keystroke, f'{cmd}<cr>', opts]]
+                      for mode, keystroke, cmd in self._keystrokes()])
+        self.mapped.add(buf)
+
+    def unset(self, buf: Optional[int] = None):
         """Unset buffer-local keymaps."""
-        for mode, key, _ in Keymaps.default:
-            try:
-                keystroke = self.config.get_or(key, None)
-                if keystroke is not None:
-                    self.vim.command(f'{mode}unmap <buffer> {keystroke}')
-            except Exception:
-                self.logger.exception('Exception')
+        if buf is None:
+            buf = self.vim.current.buffer.handle
+        if buf not in self.mapped:
+            return
+        self.mapped.discard(buf)
+        self._atomic([['nvim_buf_del_keymap', [buf, mode, keystroke]]
+                      for mode, keystroke, _ in self._keystrokes()])
 
     default_t = {
         ('key_until', ':GdbUntil'),
@@ -64,15 +90,18 @@ class Keymaps(Common):
 
     def set_t(self):
         """Set term-local keymaps."""
+        buf = self.vim.current.buffer.handle
+        opts = {'noremap': True, 'silent': True}
+        calls = []
         for key, cmd in Keymaps.default_t:
-            try:
-                keystroke = self.config.get_or(key, None)
-                if keystroke is not None:
-                    self.vim.command(f'tnoremap <buffer> <silent> {keystroke}'
-                                     rf' <c-\><c-n>{cmd}<cr>i')
-            except Exception:
-                self.logger.exception('Exception')
-        self.vim.command(r'tnoremap <silent> <buffer> <esc> <c-\><c-n>G')
+            keystroke = self.config.get_or(key, None)
+            if keystroke is not None:
+                calls.append(['nvim_buf_set_keymap',
+                              [buf, 't', keystroke,
+                               rf'<c-\><c-n>{cmd}<cr>i', opts]])
+        calls.append(['nvim_buf_set_keymap',
+                      [buf, 't', '<esc>', r'<c-\><c-n>G', opts]])
+        self._atomic(calls)
 
     def _dispatch(self, key):
         try:
@@ -87,8 +116,28 @@ class Keymaps(Common):
 
     def dispatch_unset(self):
         """Call the hook to unset the keymaps."""
+        if self.dispatch_active \
+                and self.config.get_or('unset_keymaps', None) is Keymaps.unset:
+            # The buffer stays in the jump window when the cursor moves
+            # to another window, keep the keymaps until it's replaced.
+            self.left = self.vim.current.buffer.handle
+            return
         self._dispatch('unset_keymaps')
 
+    def release_left(self, buf: Optional[int] = None):
+        """Unset the keymaps of the left buffer unless it's buf again."""
+        if self.left is not None and self.left != buf:
+            self.unset(self.left)
+        self.left = None
+
+    def cleanup(self):
+        """Unset the keymaps of the buffers that outlive the session."""
+        for buf in list(self.mapped):
+            if self.vim.api.buf_is_valid(buf):
+                self.unset(buf)
+        self.mapped.clear()
+        self.left = None
+
     def dispatch_set_t(self):
         """Call the hook to set the terminal keymaps."""
         self._dispatch('set_tkeymaps')
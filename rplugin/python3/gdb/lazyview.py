@@ -0,0 +1,160 @@
+"""Lazy view of the large source files."""
+
+import bisect
+import mmap
+import os
+from typing import Dict, List, Set
+from gdb.common import Common
+
+
+class LineIndex:
+    """The lines of a file mapped into memory.
+
+    Only the number of the newlines before every CHUNK bytes is counted
+    upfront, a line is found by skipping the newlines from the chunk
+    it falls into.
+    """
+
+    CHUNK = 1 << 20
+
+    def __init__(self, path: str):
+        """ctor."""
+        with open(path, 'rb') as src:
+            self.size = os.fstat(src.fileno()).st_size
+            self.map = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ)
+        # The number of the newlines before the chunk
+        self.newlines: List[int] = []
+        count = 0
+        for offset in range(0, self.size, self.CHUNK):
+            self.newlines.append(count)
+            count += self.map[offset:offset + self.CHUNK].count(b'\n')
+        # The last line may lack the newline
+        if self.size and self.map[-1] != ord('\n'):
+            count += 1
+        self.count = count
+
+    def close(self):
+        """Unmap the file."""
+        self.map.close()
+
+    def offset(self, line: int) -> int:
+        """Get the offset of the line, the size of the file past the end."""
+        if line <= 1:
+            return 0
+        if line > self.count:
+            return self.size
+        # The chunk with fewer than line-1 newlines before it
+        chunk = bisect.bisect_left(self.newlines, line - 1) - 1
+        pos = chunk * self.CHUNK
+        for _ in range(line - 1 - self.newlines[chunk]):
+            pos = self.map.find(b'\n', pos) + 1
+        return pos
+
+    def lines(self, first: int, last: int) -> List[str]:
+        """Read the lines from first to last inclusive."""
+        data = self.map[self.offset(first):self.offset(last + 1)]
+        lines = data.decode('utf-8', 'replace').split('\n')
+        return [s[:-1] if s.endswith('\r') else s
+                for s in lines[:last - first + 1]]
+
+
+class LazyView(Common):
+    """Show the large files in the jump window without loading them.
+
+    A file of `lazy_view_threshold` bytes or more is shown in a scratch
+    buffer with the name of the file. The buffer has as many lines as
+    the file, so the line numbers and the signs are the same, but only
+    the pages of PAGE lines around the visible ones are read into it.
+    The rest of the lines stay empty until the window is scrolled to them.
+    The buffer is wiped out once hidden not to be mistaken for the file.
+    """
+
+    PAGE = 500
+
+    def __init__(self, common: Common):
+        """ctor."""
+        super().__init__(common)
+        self.threshold = self.config.get_or('lazy_view_threshold', 32 << 20)
+        # {buffer number -> index of the file shown}
+        self.files: Dict[int, LineIndex] = {}
+        # {buffer number -> the pages read}
+        self.pages: Dict[int, Set[int]] = {}
+
+    def cleanup(self):
+        """Wipe out the buffers, they're useless without the plugin."""
+        for buf in list(self.files):
+            self.vim.command(f"silent! bwipeout {buf}")
+            self.on_wipeout(buf)
+
+    def is_large(self, path: str) -> bool:
+        """Check whether the file should be shown lazily."""
+        if self.threshold < 0 or self.vim.call("bufloaded", path):
+            return False
+        try:
+            return os.path.getsize(path) >= self.threshold
+        except OSError:
+            return False
+
+    def open(self, path: str) -> int:
+        """Create the buffer for the file in the current window."""
+        index = LineIndex(path)
+        self.logger.info("Show %s lazily: %d bytes, %d lines", path,
+                         index.size, index.count)
+        # The buffer may have been created unloaded to look the file up
+        stub = self.vim.call("bufnr", path)
+        if stub != -1:
+            self.vim.command(f"silent bwipeout {stub}")
+        buf = self.vim.call("nvim_create_buf", True, True)
+        self.vim.call("nvim_buf_set_name", buf.handle, path)
+        self.vim.command(f"noswapfile buffer {buf.handle}")
+        self.vim.command("setlocal bufhidden=wipe undolevels=-1"
+                         " nomodifiable readonly")
+        self.files[buf.handle] = index
+        self.pages[buf.handle] = set()
+        self._fill(buf.handle, 0, -1, [''] * index.count)
+
+        augroup = f"NvimGdbLazy{buf.handle}"
+        self.vim.command(f"augroup {augroup}")
+        self.vim.command("autocmd!")
+        self.vim.command("autocmd CursorMoved,WinScrolled <buffer> call"
+                         " GdbCallAsync('win.lazy.on_scroll', bufnr(),"
+                         " line('w0'), line('w$'))")
+        self.vim.command("autocmd BufWipeout <buffer> call"
+                         " GdbCallAsync('win.lazy.on_wipeout',"
+                         " str2nr(expand('<abuf>')))")
+        self.vim.command("augroup END")
+        return buf.handle
+
+    def on_scroll(self, buf: int, top: int, bottom: int):
+        """Read the pages around the visible lines."""
+        index = self.files.get(buf, None)
+        if index is None:
+            return
+        pages = self.pages[buf]
+        first = max(0, (top - 1) // self.PAGE - 1)
+        last = min((index.count - 1) // self.PAGE,
+                   (bottom - 1) // self.PAGE + 1)
+        for page in range(first, last + 1):
+            if page in pages:
+                continue
+            pages.add(page)
+            start = page * self.PAGE
+            end = min(start + self.PAGE, index.count)
+            self._fill(buf, start, end, index.lines(start + 1, end))
+
+    def on_wipeout(self, buf: int):
+        """Forget the buffer wiped out."""
+        if buf in self.files:
+            self.vim.call("nvimgdb#ClearAugroup", f"NvimGdbLazy{buf}")
+            self._forget(buf)
+
+    def _forget(self, buf: int):
+        self.files.pop(buf).close()
+        del self.pages[buf]
+
+    def _fill(self, buf: int, start: int, end: int, lines: List[str]):
+        self.vim.api.call_atomic([
+            ["nvim_buf_set_option", [buf, "modifiable", True]],
+            ["nvim_buf_set_lines", [buf, start, end, True, lines]],
+            ["nvim_buf_set_option", [buf, "modifiable", False]],
+        ])
@@ -0,0 +1,41 @@
+"""Notifications pushed by the debugger."""
+
+import os
+import msgpack   # type: ignore
+from gdb.common import Common
+from gdb.client import Client
+from gdb.datagram import DatagramReader
+
+
+class StopListener(DatagramReader):
+    """Receive the stop events sent by the debugger to the session socket.
+
+    The events are lists packed in msgpack: [name, args...]. For instance,
+    LLDB reports ["did_stop", file, line, frame, thread] from its stop hook.
+    This allows jumping to the stop location without waiting for
+    the console output to be parsed.
+    """
+
+    def __init__(self, common: Common, client: Client, handler):
+        """ctor."""
+        super().__init__(common, os.path.join(client.get_sock_dir(), "stop"),
+                         0.5)
+        self.handler = handler
+        self.start_reading()
+
+    def _receive(self, data: bytes):
+        try:
+            event = msgpack.unpackb(data, raw=False)
+        except ValueError:
+            self.logger.exception("Malformed stop event")
+            return
+        self.vim.async_call(self._dispatch, event)
+
+    def _dispatch(self, event):
+        if self.closed:
+            return
+        name, *args = event
+        if name == "did_stop":
+            self.handler.did_stop(*args)
+        else:
+            self.logger.warning("Unknown event %s", name)
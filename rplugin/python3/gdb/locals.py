@@ -0,0 +1,168 @@
+"""Panel of the local variables."""
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+from gdb.common import Common
+from gdb.dataquery import DataQuery
+from gdb.keymaps import Keymaps
+from gdb.panel import Panel
+
+
+class _Node:   # pylint: disable=too-few-public-methods
+    """A variable or a child value in the panel."""
+
+    def __init__(self, info: Dict[str, Any], depth: int):
+        self.path: str = info['path']
+        self.name: str = info['name']
+        self.type: str = info['type']
+        self.value: str = info['value']
+        self.expandable: bool = info['expandable']
+        self.depth = depth
+        # The children are only known for the expanded nodes.
+        self.children: Optional[List['_Node']] = None
+        self.more = False
+        self.loading = False
+
+
+class Locals(Panel):
+    """Local variables of the selected frame.
+
+    Only the top-level values are fetched at every stop, the children
+    are fetched page by page when a node is expanded, the collapsed nodes
+    are never evaluated. The expanded nodes are refreshed too and stay
+    expanded while their paths exist.
+    """
+
+    name = "Locals"
+    path = "views.locals"
+
+    def __init__(self, common: Common, query: DataQuery, keymaps: Keymaps):
+        """ctor."""
+        super().__init__(common, query, keymaps)
+        self.page_size = self.config.get_or('locals_page_size', 100)
+        self.variables: List[_Node] = []
+        self.expanded: Set[str] = set()
+        # What is shown in every line of the panel: (node, is "more" line)
+        self.lines: List[Tuple[_Node, bool]] = []
+
+    def open(self):
+        """Open the panel next to the current window."""
+        if not self.is_supported():
+            return
+        if self.buf is not None:
+            self.refresh()
+            return
+        self._create_buffer(["autocmd User NvimGdbQuery"
+                             f" call GdbCallAsync('{self.path}.refresh')"])
+        self.vim.command("nnoremap <buffer> <silent> <cr>"
+                         f" :call GdbCallAsync('{self.path}.toggle',"
+                         " line('.'))<cr>")
+        # Return the cursor to the previous window
+        self.vim.command("wincmd p")
+        self.refresh()
+
+    def _forget(self):
+        self.variables = []
+        self.lines = []
+
+    def refresh(self):
+        """Fetch the top-level values."""
+        if self.buf is None:
+            return
+        self.generation += 1
+        generation = self.generation
+        self.query.query_async(
+            "locals", lambda resp: self._on_locals(generation, resp))
+
+    def _on_locals(self, generation: int, resp):
+        if generation != self.generation:
+            return
+        if resp is None:
+            self.variables = []
+        else:
+            self.variables = [_Node(v, 0) for v in resp['variables']]
+        self._render()
+        for node in self.variables:
+            self._restore(node)
+
+    def _restore(self, node: _Node):
+        """Load the children of the node expanded before."""
+        if node.path in self.expanded:
+            if node.expandable:
+                node.children = []
+                self._load(node)
+            else:
+                self.expanded.discard(node.path)
+
+    def toggle(self, line: int):
+        """Expand or collapse the node, load more children."""
+        if line > len(self.lines):
+            return
+        node, is_more = self.lines[line - 1]
+        if is_more:
+            self._load(node)
+        elif node.children is not None:
+            node.children = None
+            self.expanded.discard(node.path)
+            self._render()
+        elif node.expandable:
+            node.children = []
+            self.expanded.add(node.path)
+            self._load(node)
+            self._render()
+
+    def _load(self, node: _Node):
+        """Fetch the next page of the children."""
+        if node.loading or node.children is None:
+            return
+        node.loading = True
+        generation = self.generation
+        self.query.query_async(
+            f"children {node.path} {len(node.children)} {self.page_size}",
+            lambda resp: self._on_children(generation, node, resp))
+
+    def _on_children(self, generation: int, node: _Node, resp):
+        if generation != self.generation:
+            return
+        node.loading = False
+        if node.children is None:
+            # Collapsed meanwhile
+            return
+        if resp is None:
+            node.more = False
+        else:
+            children = [_Node(c, node.depth + 1) for c in resp['children']]
+            node.children.extend(children)
+            node.more = resp['more']
+            for child in children:
+                self._restore(child)
+        self._render()
+
+    def _render(self):
+        if self.buf is None:
+            return
+        self.lines = []
+        text: List[str] = []
+        for node in self.variables:
+            self._render_node(node, text)
+        self.vim.call("nvim_buf_set_lines", self.buf.handle, 0, -1, False,
+                      text)
+
+    def _render_node(self, node: _Node, text: List[str]):
+        indent = "  " * node.depth
+        if not node.expandable:
+            marker = " "
+        elif node.children is None:
+            marker = "+"
+        else:
+            marker = "-"
+        value = node.value.replace("\n", " ")
+        text.append(f"{indent}{marker} {node.name} = {value}")
+        self.lines.append((node, False))
+        if node.children is None:
+            return
+        for child in node.children:
+            self._render_node(child, text)
+        if node.more or node.loading:
+            text.append(f"{indent}    ..." if node.more else
+                        f"{indent}    (loading)")
+            self.lines.append((node, True))
@@ -1,6 +1,39 @@
 """."""
 
+import importlib.util
+import logging
 import os
+import tempfile
+
+
+def _load_ring_log():
+    """Share the in-memory log with the proxies in lib/."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        '..', '..', '..', 'lib', 'ring_log.py')
+    spec = importlib.util.spec_from_file_location('nvimgdb_ring_log', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+ring_log = _load_ring_log()
+
+# The number of the last records kept in memory
+RING_CAPACITY = 10000
+# Where the records are dumped by default and on errors
+DUMP_PATH = os.path.join(tempfile.gettempdir(), f"nvimgdb-{os.getpid()}.log")
+
+
+def _ring_handler():
+    return ring_log.RingHandler(RING_CAPACITY, DUMP_PATH)
+
+
+def get_ring_handler():
+    """Find the ring buffer handler of the root logger."""
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, ring_log.RingHandler):
+            return handler
+    return None
 
 
 LOGGING_CONFIG = {
@@ -8,25 +41,31 @@ LOGGING_CONFIG = {
     'disable_existing_loggers': True,
     'formatters': {
         'standard': {
-            'format': '%(asctime)s [%(levelname)s] %(name)s: %(message)s'
+            'format': ring_log.FORMAT
         },
     },
     'handlers': {
-        'null': {
-            'class': 'logging.NullHandler',
-        },
-        'file': {
-            'level': 'DEBUG',
-            'formatter': 'standard',
-            'class': 'logging.FileHandler',
-            'filename': 'nvimgdb.log',
+        'ring': {
+            '()': _ring_handler,
         },
     },
     'loggers': {
         '': {  # root logger
-            'handlers': ['file' if os.environ.get('CI') else 'null'],
-            'level': 'DEBUG',
+            'handlers': ['ring'],
+            # The debug records are enabled at runtime with :GdbLogLevel
+            'level': 'INFO',
             'propagate': False
         },
     }
 }
+
+# The whole log is kept in the file on CI
+if os.environ.get('CI'):
+    LOGGING_CONFIG['handlers']['file'] = {
+        'level': 'DEBUG',
+        'formatter': 'standard',
+        'class': 'logging.FileHandler',
+        'filename': 'nvimgdb.log',
+    }
+    LOGGING_CONFIG['loggers']['']['handlers'].append('file')
+    LOGGING_CONFIG['loggers']['']['level'] = 'DEBUG'
@@ -0,0 +1,131 @@
+"""Memory viewer."""
+
+from typing import Dict, Optional, Set
+from gdb.common import Common
+from gdb.dataquery import DataQuery
+from gdb.frames import Frames
+from gdb.keymaps import Keymaps
+from gdb.panel import Panel
+
+
+class Memory(Panel):
+    """Hex dump of the memory around an address.
+
+    The buffer spans SPAN bytes with a row of ROW bytes per line. Only
+    the pages visible in the window are read from the debugger, they're
+    cached until the program continues. The rows of the pages not read yet
+    show only the address.
+    """
+
+    name = "Memory"
+    path = "views.memory"
+
+    SPAN = 1 << 20
+    PAGE = 4096
+    ROW = 16
+
+    def __init__(self, common: Common, query: DataQuery, frames: Frames,
+                 keymaps: Keymaps):
+        """ctor."""
+        super().__init__(common, query, keymaps)
+        # The frame cache tells when the program has moved on.
+        self.frames = frames
+        self.base = 0
+        # The stop the cached pages were read at
+        self.stop = -1
+        # {page address -> bytes or None if unreadable}
+        self.pages: Dict[int, Optional[bytes]] = {}
+        self.loading: Set[int] = set()
+        # The visible lines
+        self.top = 1
+        self.bottom = 1
+
+    def open(self, expr: str):
+        """Show the memory at the address given by the expression."""
+        if not self.is_supported():
+            return
+        self.query.query_async(f"evaluate-address {expr}",
+                               lambda resp: self._on_address(expr, resp))
+
+    def _on_address(self, expr: str, resp):
+        if resp is None:
+            self.vim.out_write(f"Cannot evaluate {expr}\n")
+            return
+        address = resp['address']
+        self.base = max(0, address // self.PAGE * self.PAGE - self.SPAN // 2)
+        self._invalidate()
+        if self.buf is None:
+            self._create_buffer([
+                "autocmd User NvimGdbQuery"
+                f" call GdbCallAsync('{self.path}.refresh')",
+                "autocmd CursorMoved,BufWinEnter <buffer> call"
+                f" GdbCallAsync('{self.path}.on_scroll',"
+                " line('w0'), line('w$'))"])
+        rows = [f"{self.base + i * self.ROW:016x}:"
+                for i in range(self.SPAN // self.ROW)]
+        self.vim.call("nvim_buf_set_lines", self.buf.handle, 0, -1, False,
+                      rows)
+        line = (address - self.base) // self.ROW + 1
+        top, bottom = line, line
+        for win in self.vim.current.tabpage.windows:
+            if win.buffer == self.buf:
+                win.cursor = (line, 0)
+                self.vim.call("win_execute", win.handle, "normal! zz")
+                top = self.vim.call("line", "w0", win.handle)
+                bottom = self.vim.call("line", "w$", win.handle)
+                break
+        self.on_scroll(top, bottom)
+
+    def _forget(self):
+        self._invalidate()
+
+    def _invalidate(self):
+        self.stop = self.frames.generation
+        self.generation += 1
+        self.pages = {}
+        self.loading = set()
+
+    def refresh(self):
+        """Reread the visible pages if the program has moved on."""
+        if self.buf is not None and self.stop != self.frames.generation:
+            self.on_scroll(self.top, self.bottom)
+
+    def on_scroll(self, top: int, bottom: int):
+        """Read the pages visible in the window."""
+        if self.buf is None:
+            return
+        if self.stop != self.frames.generation:
+            self._invalidate()
+        self.top, self.bottom = top, bottom
+        rows_per_page = self.PAGE // self.ROW
+        first = (top - 1) // rows_per_page
+        last = (bottom - 1) // rows_per_page
+        for page in range(first, last + 1):
+            address = self.base + page * self.PAGE
+            if address in self.pages or address in self.loading:
+                continue
+            self.loading.add(address)
+            self.query.query_async(
+                f"read-memory {address} {self.PAGE}",
+                lambda resp, a=address, g=self.generation:
+                self._on_page(g, a, resp))
+
+    def _on_page(self, generation: int, address: int, resp):
+        if generation != self.generation or self.buf is None:
+            return
+        self.loading.discard(address)
+        data = bytes.fromhex(resp['data']) if resp is not None else None
+        self.pages[address] = data
+        rows = []
+        for offset in range(0, self.PAGE, self.ROW):
+            row_addr = address + offset
+            if data is None:
+                rows.append(f"{row_addr:016x}: "
+                            + " ".join(["??"] * self.ROW))
+                continue
+            chunk = data[offset:offset + self.ROW]
+            text = "".join(chr(b) if 0x20 <= b < 0x7f else "." for b in chunk)
+            rows.append(f"{row_addr:016x}: {chunk.hex(' ')}  {text}")
+        line = (address - self.base) // self.ROW
+        self.vim.call("nvim_buf_set_lines", self.buf.handle, line,
+                      line + len(rows), False, rows)
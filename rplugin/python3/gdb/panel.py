@@ -0,0 +1,74 @@
+"""Base of the windows showing the program state."""
+
+from typing import List
+from gdb.common import Common
+from gdb.dataquery import DataQuery
+from gdb.keymaps import Keymaps
+
+
+class Panel(Common):
+    """A scratch window filled by the structured requests to the debugger.
+
+    The window is created on demand and forgotten when it's closed.
+    The editor calls the panel by the path under the App,
+    for instance 'views.locals'.
+    """
+
+    # The buffer name prefix
+    name = ''
+    # The path of the panel under the App
+    path = ''
+
+    def __init__(self, common: Common, query: DataQuery, keymaps: Keymaps):
+        """ctor."""
+        super().__init__(common)
+        self.query = query
+        self.keymaps = keymaps
+        self.buf = None
+        self.augroup = ''
+        # Every refresh gets a new generation to distinguish the responses
+        # to the requests made before.
+        self.generation = 0
+
+    def is_supported(self) -> bool:
+        """Check whether the backend can fill the panel, tell if not."""
+        if self.query.is_supported():
+            return True
+        self.vim.command(f"echo '{self.name}: not supported by the backend'")
+        return False
+
+    def _create_buffer(self, autocmds: List[str]):
+        """Open the window next to the current one.
+
+        The autocommands are defined in the augroup of the panel.
+        """
+        self.vim.command("vnew | set readonly buftype=nowrite")
+        self.keymaps.dispatch_set()
+        self.buf = self.vim.current.buffer
+        cur_tabpage = self.vim.current.tabpage.number
+        self.buf.name = f"{self.name}{cur_tabpage}"
+
+        self.augroup = f"NvimGdbTab{cur_tabpage}_{self.buf.number}"
+        self.vim.command(f"augroup {self.augroup}")
+        self.vim.command("autocmd!")
+        for autocmd in autocmds:
+            self.vim.command(autocmd)
+        self.vim.command("augroup END")
+
+        # Destroy the window automatically when it's gone.
+        self.vim.command("autocmd BufWinLeave <buffer> call"
+                         f" GdbCallAsync('{self.path}.close')")
+        self.vim.command("autocmd BufWinLeave <buffer> call timer_start(100,"
+                         f" {{ -> execute('bwipeout! {self.buf.number}') }})")
+
+    def close(self):
+        """Forget the window, it has been closed."""
+        if self.buf is None:
+            return
+        self.vim.call("nvimgdb#ClearAugroup", self.augroup)
+        self.buf = None
+        self.generation += 1
+        self._forget()
+
+    def _forget(self):
+        """Drop the state of the closed window."""
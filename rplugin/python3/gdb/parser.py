@@ -7,24 +7,91 @@ from gdb.backend.base import ParserHandler
 class ParserAdapter(Common, ParserHandler):
     """Common FSM implementation for the integrated backends."""
 
-    def __init__(self, common, cursor, win):
+    def __init__(self, common, cursor, win, breakpoint, frames, profiler):
         """ctor."""
         Common.__init__(self, common)
         self.cursor = cursor
         self.win = win
+        self.breakpoint = breakpoint
+        self.frames = frames
+        self.profiler = profiler
+        # The stop location reported by the debugger ahead of the parser
+        self.notified_stop = None
 
     def continue_program(self):
         """Handle the program continued execution. Hide the cursor."""
+        self.notified_stop = None
+        self.frames.invalidate()
         self.cursor.hide()
         self.vim.command("doautocmd User NvimGdbContinue")
 
     def jump_to_source(self, fname: str, line: int):
         """Handle the program breaked. Show the source code."""
-        self.win.jump(fname, line)
+        if self.notified_stop == (fname, line):
+            # Already shown when the debugger notified about the stop.
+            self.notified_stop = None
+            return
+        # The location may have changed without continuing: step, up etc.
+        self.frames.invalidate()
+        with self.profiler.span("jump"):
+            self.win.jump(fname, line)
         self.vim.command("doautocmd User NvimGdbBreak")
 
+    def did_stop(self, fname: str, line: int, frame: int, thread: int):
+        """Handle the stop reported by the debugger via the side channel."""
+        self.logger.info("did_stop %s:%d frame %d thread %d",
+                         fname, line, frame, thread)
+        self.frames.invalidate()
+        with self.profiler.span("jump"):
+            self.win.jump(fname, line)
+        self.vim.command("doautocmd User NvimGdbBreak")
+        self.notified_stop = (fname, line)
+
     def query_breakpoints(self):
         """It's high time to query actual breakpoints."""
-        self.win.query_breakpoints()
+        # The debugger is ready to take the breakpoints of the last
+        # session, the signs are queried once they're set. The query
+        # is timed until the signs are shown.
+        if not self.breakpoint.restore(self.win.query_breakpoints):
+            self.win.query_breakpoints()
         # Execute the rest of custom commands
-        self.vim.command("doautocmd User NvimGdbQuery")
+        with self.profiler.span("query_autocmd"):
+            self.vim.command("doautocmd User NvimGdbQuery")
+
+
+class UiHandler(ParserHandler):
+    """Pass the events from the parser in the worker to the editor thread.
+
+    The events are delivered in the order they were produced. The events
+    still queued when the session ends are dropped not to touch the windows
+    of other tabs.
+    """
+
+    def __init__(self, vim, handler: ParserHandler):
+        """ctor."""
+        self.vim = vim
+        self.handler = handler
+        self.closed = False
+
+    def cleanup(self):
+        """Drop the events from now on."""
+        self.closed = True
+
+    def _deliver(self, func, *args):
+        self.vim.async_call(self._dispatch, func, *args)
+
+    def _dispatch(self, func, *args):
+        if not self.closed:
+            func(*args)
+
+    def continue_program(self):
+        """Handle the program continued execution. Hide the cursor."""
+        self._deliver(self.handler.continue_program)
+
+    def jump_to_source(self, fname: str, line: int):
+        """Handle the program breaked. Show the source code."""
+        self._deliver(self.handler.jump_to_source, fname, line)
+
+    def query_breakpoints(self):
+        """It's high time to query actual breakpoints."""
+        self._deliver(self.handler.query_breakpoints)
@@ -0,0 +1,93 @@
+"""Resolution of the source paths reported by the debuggers."""
+
+import functools
+import os
+from typing import Dict
+from gdb.common import Common
+from gdb.srcmap import SourceMap
+
+
+@functools.lru_cache(maxsize=4096)
+def _realpath(cwd: str, path: str) -> str:
+    return os.path.realpath(os.path.join(cwd, path))
+
+
+class PathMgr(Common):
+    """Memoized path normalization shared by the sessions.
+
+    The debuggers report the same few paths on every stop, so the resolved
+    paths and the buffers they're loaded into are cached. The caches are
+    invalidated by the editor events: directory change, buffer wipeout
+    or renaming. The paths that don't exist locally are mapped to the files
+    of the workspace if possible.
+    """
+
+    def __init__(self, common: Common):
+        """ctor."""
+        super().__init__(common)
+        # The source map is rebuilt with it when the directory changes
+        self.common = common
+        # The current directory of the editor, not of the plugin host
+        self.cwd = self.vim.call("getcwd")
+        self.srcmap = SourceMap(common, self.cwd)
+        # {path -> resolved path}
+        self.resolved: Dict[str, str] = {}
+        # {resolved path -> buffer number}
+        self.path_buf: Dict[str, int] = {}
+        # {buffer number -> full path}
+        self.buf_path: Dict[int, str] = {}
+
+    def resolve(self, path: str) -> str:
+        """Get the canonical absolute path of the local file."""
+        resolved = self.resolved.get(path, None)
+        if resolved is None:
+            resolved = _realpath(self.cwd, path)
+            if not os.path.exists(resolved):
+                mapped = self.srcmap.map(path)
+                if mapped is None and not self.srcmap.is_ready():
+                    # Try again once the workspace is indexed
+                    return resolved
+                resolved = mapped or resolved
+            self.resolved[path] = resolved
+        return resolved
+
+    def locate(self, path: str) -> str:
+        """Get the path to open the file reported by the debugger."""
+        resolved = self.resolve(path)
+        return path if resolved == _realpath(self.cwd, path) else resolved
+
+    def get_buffer(self, path: str) -> int:
+        """Get the buffer for the file, create a new one if necessary."""
+        key = self.resolve(path)
+        buf = self.path_buf.get(key, None)
+        if buf is None:
+            buf = self.vim.call("bufnr", path, 1)
+            self.path_buf[key] = buf
+        return buf
+
+    def set_buffer(self, path: str, buf: int):
+        """Remember the buffer the file was actually loaded into."""
+        self.path_buf[self.resolve(path)] = buf
+
+    def get_path(self, buf: int) -> str:
+        """Get the full path of the file loaded into the buffer."""
+        path = self.buf_path.get(buf, None)
+        if path is None:
+            path = self.vim.call("expand", f'#{buf}:p')
+            self.buf_path[buf] = path
+        return path
+
+    def on_dir_changed(self, cwd: str):
+        """Invalidate the paths, which could be relative."""
+        self.cwd = cwd
+        self.srcmap = SourceMap(self.common, cwd)
+        _realpath.cache_clear()
+        self.resolved.clear()
+        self.path_buf.clear()
+        self.buf_path.clear()
+
+    def on_buf_changed(self, buf: int):
+        """Forget the buffer wiped out or renamed."""
+        self.buf_path.pop(buf, None)
+        for path in [p for p, b in self.path_buf.items() if b == buf]:
+            del self.path_buf[path]
@@ -0,0 +1,186 @@
+"""Step latency instrumentation."""
+
+import collections
+import contextlib
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from gdb.common import Common
+
+
+# The innermost span of the thread to count the RPCs into
+_local = threading.local()
+
+
+def _count_request():
+    span = getattr(_local, 'span', None)
+    if span is not None:
+        span['rpcs'] += 1
+
+
+class _CountedApi:   # pylint: disable=too-few-public-methods
+    """The API functions of the editor counted as requests."""
+
+    def __init__(self, api):
+        self._api = api
+
+    def __getattr__(self, name: str):
+        func = getattr(self._api, name)
+
+        def counted(*args, **kwargs):
+            _count_request()
+            return func(*args, **kwargs)
+        return counted
+
+
+class CountedVim:
+    """The editor counting the requests into the span of the thread.
+
+    The plugin talks to the editor through this object: call(), command(),
+    eval(), api and current are counted as one request each, the rest
+    is passed through as is.
+    """
+
+    def __init__(self, vim):
+        """ctor."""
+        self._vim = vim
+
+    def call(self, *args, **kwargs):
+        """Call a function of the editor."""
+        _count_request()
+        return self._vim.call(*args, **kwargs)
+
+    def command(self, *args, **kwargs):
+        """Execute a command in the editor."""
+        _count_request()
+        return self._vim.command(*args, **kwargs)
+
+    def eval(self, *args, **kwargs):
+        """Evaluate an expression in the editor."""
+        _count_request()
+        return self._vim.eval(*args, **kwargs)
+
+    @property
+    def api(self):
+        """The API functions of the editor."""
+        return _CountedApi(self._vim.api)
+
+    @property
+    def current(self):
+        """The current buffer, window and tabpage."""
+        _count_request()
+        return self._vim.current
+
+    def __getattr__(self, name: str):
+        return getattr(self._vim, name)
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+class Profiler(Common):
+    """Time the stages of the debugger steps.
+
+    A step starts when a command is sent to the debugger, the spans
+    recorded after that are attributed to it: parsing, jumping to the
+    source code, querying the breakpoints etc. Only the last steps are
+    kept, see the config key `profile_steps`.
+    """
+
+    def __init__(self, common: Common):
+        """ctor."""
+        super().__init__(common)
+        self.steps: collections.deque = collections.deque(
+            maxlen=self.config.get_or('profile_steps', 100))
+        self.step: Optional[Dict[str, Any]] = None
+        # The start of the spans ending elsewhere: {(stage, key) -> time}
+        self.marks: Dict[Tuple[str, Any], float] = {}
+
+    def begin_step(self, command: str):
+        """Start a new step with the command."""
+        self.step = {"command": command, "start": time.perf_counter(),
+                     "spans": []}
+        self.steps.append(self.step)
+
+    def record(self, stage: str, start: float, end: float, rpcs: int = 0):
+        """Record the span measured elsewhere."""
+        if self.step is None:
+            return
+        self.step["spans"].append({"stage": stage, "start": start,
+                                   "duration": end - start, "rpcs": rpcs})
+
+    def mark(self, stage: str, key):
+        """Mark the start of the span of the stage identified by the key."""
+        self.marks[(stage, key)] = time.perf_counter()
+
+    def record_since(self, stage: str, key, end: float):
+        """Record the span from the mark with the key if any."""
+        start = self.marks.pop((stage, key), None)
+        if start is not None:
+            self.record(stage, start, end)
+
+    @contextlib.contextmanager
+    def span(self, stage: str):
+        """Time the stage of the current step."""
+        outer = getattr(_local, 'span', None)
+        span = {"rpcs": 0}
+        _local.span = span
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, start, time.perf_counter(), span['rpcs'])
+            _local.span = outer
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Percentiles of the stage durations per step in milliseconds."""
+        durations: Dict[str, List[float]] = collections.defaultdict(list)
+        rpcs: Dict[str, List[int]] = collections.defaultdict(list)
+        for step in list(self.steps):
+            spans = list(step["spans"])
+            if not spans:
+                continue
+            per_stage: Dict[str, float] = collections.defaultdict(float)
+            per_stage_rpcs: Dict[str, int] = collections.defaultdict(int)
+            for span in spans:
+                per_stage[span["stage"]] += span["duration"]
+                per_stage_rpcs[span["stage"]] += span["rpcs"]
+            per_stage["total"] = max(s["start"] + s["duration"]
+                                     for s in spans) - step["start"]
+            per_stage_rpcs["total"] = sum(per_stage_rpcs.values())
+            for stage, duration in per_stage.items():
+                durations[stage].append(duration)
+                rpcs[stage].append(per_stage_rpcs[stage])
+        return {stage: {"steps": len(samples),
+                        "p50": _percentile(samples, .5) * 1e3,
+                        "p95": _percentile(samples, .95) * 1e3,
+                        "p99": _percentile(samples, .99) * 1e3,
+                        "rpcs": sum(rpcs[stage]) / len(samples)}
+                for stage, samples in durations.items()}
+
+    def report(self) -> List[str]:
+        """Format the statistics as a table."""
+        lines = [f"{'stage':<18}{'steps':>6}{'p50 ms':>10}{'p95 ms':>10}"
+                 f"{'p99 ms':>10}{'rpcs':>8}"]
+        for stage, row in sorted(self.stats().items(),
+                                 key=lambda item: item[0] == "total"):
+            lines.append(f"{stage:<18}{row['steps']:>6}{row['p50']:>10.2f}"
+                         f"{row['p95']:>10.2f}{row['p99']:>10.2f}"
+                         f"{row['rpcs']:>8.1f}")
+        return lines
+
+    def show(self, path: str = ""):
+        """Show the report in a scratch window, dump the spans if asked."""
+        lines = self.report()
+        if path:
+            with open(path, 'w', encoding='utf-8') as dump:
+                json.dump(list(self.steps), dump, indent=1)
+            lines.append("")
+            lines.append(f"The spans of {len(self.steps)} steps"
+                         f" are written to {path}")
+        self.vim.command("new | setlocal buftype=nofile bufhidden=wipe"
+                         " noswapfile")
+        self.vim.current.buffer[:] = lines
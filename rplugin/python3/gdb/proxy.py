@@ -1,35 +1,60 @@
 """Connection to the side channel."""
 
+import concurrent.futures
 import os
-import socket
+import threading
+import time
+from typing import Dict, Optional, Tuple
 from gdb.common import Common
 from gdb.client import Client
+from gdb.datagram import DatagramReader
 
 
-class Proxy(Common):
-    """Proxy to the side channel."""
+class Proxy(DatagramReader):
+    """Proxy to the side channel.
 
-    def __init__(self, common: Common, client: Client):
-        """ctor."""
-        super().__init__(common)
-        self.proxy_addr = client.get_proxy_addr()
-        self.sock_addr = os.path.join(client.get_sock_dir(), "client")
+    Every request is tagged with a unique id, which the proxy echoes back
+    in the response: "<id> <payload>". The responses are received by
+    a background thread and matched to the pending futures, late replies
+    to the expired or cancelled requests are dropped.
+    """
 
-        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
-        self.sock.bind(self.sock_addr)
-        self.sock.settimeout(0.5)
+    def __init__(self, common: Common, client: Client,
+                 name: Optional[str] = None):
+        """ctor.
+
+        The default side channel is served by the proxy. A named one
+        is served from within the debugger by the socket with the name
+        in the session directory.
+        """
+        sock_dir = client.get_sock_dir()
+        if name is None:
+            proxy_addr = client.get_proxy_addr()
+            sock_addr = os.path.join(sock_dir, "client")
+        else:
+            proxy_addr = os.path.join(sock_dir, name)
+            sock_addr = os.path.join(sock_dir, f"client-{name}")
+        # The reader thread wakes up periodically to expire requests.
+        super().__init__(common, sock_addr, 0.1)
+        self.name = name
+        self.proxy_addr = proxy_addr
         # Will connect to the socket later, when the first query is needed
         # to be issued.
         self.connected = False
 
+        self.lock = threading.Lock()
+        self.last_id = 0
+        # Requests in flight: {id -> (future, deadline)}
+        self.pending: Dict[int, Tuple[concurrent.futures.Future, float]] = {}
+        self.start_reading()
+
     def cleanup(self):
         """destructor."""
-        if self.sock:
-            self.sock.close()
-        try:
-            os.remove(self.sock_addr)
-        except FileNotFoundError:
-            pass
+        super().cleanup()
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        for fut, _ in pending.values():
+            fut.cancel()
 
     def _ensure_connected(self) -> bool:
         if not self.connected:
@@ -37,16 +62,82 @@ class Proxy(Common):
                 self.sock.connect(self.proxy_addr)
                 self.connected = True
             except OSError as msg:
-                self.vim.command("echo 'Breakpoint: not connected"
-                                 f" to the proxy: {msg}'")
+                if self.name is None:
+                    # May be called from the worker or the reader thread
+                    self.vim.async_call(
+                        self.vim.command, "echo 'Breakpoint: not connected"
+                        f" to the proxy: {msg}'")
+                else:
+                    # The debugger may be launched without the service.
+                    self.logger.info("Not connected to %s: %s",
+                                     self.name, msg)
         return self.connected
 
-    def query(self, request) -> str:
-        """Send a request to the proxy and wait for the response."""
+    def _receive(self, data: bytes):
+        req_id, _, payload = data.partition(b' ')
+        try:
+            key = int(req_id)
+        except ValueError:
+            self.logger.warning("Malformed response dropped: %s", data[:64])
+            return
+        with self.lock:
+            fut, _ = self.pending.pop(key, (None, None))
+        if fut is None:
+            self.logger.info("Stale response %d dropped", key)
+            return
+        if fut.set_running_or_notify_cancel():
+            fut.set_result(payload.decode('utf-8'))
+
+    def _tick(self):
+        # The requests past their deadline time out
+        now = time.monotonic()
+        with self.lock:
+            expired = [key for key, (_, deadline) in self.pending.items()
+                       if deadline <= now]
+            futs = [self.pending.pop(key)[0] for key in expired]
+        for fut in futs:
+            if fut.set_running_or_notify_cancel():
+                fut.set_exception(concurrent.futures.TimeoutError())
+
+    def _forget(self, key: int):
+        with self.lock:
+            self.pending.pop(key, None)
+
+    def query_async(self, request: str,
+                    timeout: float = 5.) -> concurrent.futures.Future:
+        """Send a request to the proxy, return the future of the response.
+
+        The future is resolved in the reader thread, so the callbacks
+        shouldn't call the editor directly, use vim.async_call() instead.
+        The request is dropped after the timeout, a cancelled future
+        drops the request immediately.
+        """
+        fut: concurrent.futures.Future = concurrent.futures.Future()
         # It takes time for the proxy to open a side channel.
         # So we're connecting to the socket lazily during
         # the first query.
-        if self._ensure_connected():
-            self.sock.send(request.encode('utf-8'))
-            return self.sock.recv(65536).decode('utf-8')
-        return ''
+        if not self._ensure_connected():
+            fut.set_result('')
+            return fut
+        with self.lock:
+            self.last_id += 1
+            key = self.last_id
+            self.pending[key] = (fut, time.monotonic() + timeout)
+        fut.add_done_callback(lambda _: self._forget(key))
+        try:
+            self.sock.send(f"{key} {request}".encode('utf-8'))
+        except OSError as ex:
+            self.logger.warning("Failed to send request: %s", ex)
+            fut.cancel()
+        return fut
+
+    def query(self, request: str, timeout: float = 0.5) -> str:
+        """Send a request to the proxy and wait for the response."""
+        fut = self.query_async(request, timeout)
+        try:
+            return fut.result(timeout)
+        except (concurrent.futures.TimeoutError,
+                concurrent.futures.CancelledError):
+            fut.cancel()
+            self.logger.warning("No response to the request: %s", request)
+            return ''
@@ -0,0 +1,162 @@
+"""Map the source paths reported by the debuggers to the workspace."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from gdb.common import Common
+
+
+def _common_tail(path: str, other: str) -> int:
+    """Count the trailing components the paths have in common."""
+    count = 0
+    for one, two in zip(reversed(path.split('/')), reversed(other.split('/'))):
+        if one != two:
+            break
+        count += 1
+    return count
+
+
+class SourceMap(Common):
+    """Find the local files for the paths that don't exist here.
+
+    The binaries built in containers or on CI report the paths of the build
+    machine. Such a path is rewritten by the rules `source_substitutions`
+    [[from, to], ...] like `set substitute-path` in GDB, or it's looked up
+    by the basename in the index of the files under the working directory.
+    A file is taken if its name is unique in the workspace or if it shares
+    the parent directory with the reported path at least, not to jump to an
+    unrelated file. The index is built in the background the first time
+    it's needed. It's cached on disk with the modification time of every
+    directory, so only the directories changed since are listed again.
+    """
+
+    # Give up indexing a directory tree that is too large
+    MAX_DIRS = 100000
+
+    def __init__(self, common: Common, root: str):
+        """ctor."""
+        super().__init__(common)
+        self.root = root
+        self.rules = [(src.rstrip('/'), dst) for src, dst
+                      in self.config.get_or('source_substitutions', [])]
+        self.ignore = set(self.config.get_or('source_index_ignore', []))
+        key = hashlib.sha1(root.encode('utf-8'))
+        self.cache_path = os.path.join(self.vim.call("stdpath", "cache"),
+                                       "nvimgdb", "srcindex",
+                                       f"{key.hexdigest()[:16]}.json")
+        # {basename -> [path relative to the root]}, built when needed
+        self.index: Optional[Dict[str, List[str]]] = None
+        self.builder: Optional[threading.Thread] = None
+
+    def is_ready(self) -> bool:
+        """Check whether the index has been built."""
+        return self.index is not None
+
+    def map(self, path: str) -> Optional[str]:
+        """Get the canonical path of the local file if found."""
+        for src, dst in self.rules:
+            if path == src or path.startswith(src + '/'):
+                local = os.path.join(self.root, dst + path[len(src):])
+                if os.path.exists(local):
+                    return os.path.realpath(local)
+        index = self.index
+        if index is None:
+            if self.builder is None:
+                self.builder = threading.Thread(target=self._build,
+                                                daemon=True)
+                self.builder.start()
+            return None
+        candidates = index.get(os.path.basename(path))
+        if not candidates:
+            return None
+        best = max(candidates, key=lambda c: _common_tail(c, path))
+        if len(candidates) > 1 and _common_tail(best, path) < 2:
+            self.logger.info("Ambiguous %s: %d candidates", path,
+                             len(candidates))
+            return None
+        return os.path.realpath(os.path.join(self.root, best))
+
+    def _build(self):
+        try:
+            self.index = self._index()
+        except Exception:   # pylint: disable=broad-except
+            self.logger.exception("Failed to index %s", self.root)
+            self.index = {}
+
+    def _index(self) -> Dict[str, List[str]]:
+        start = time.perf_counter()
+        cached = self._load()
+        # {directory -> [mtime, [file], [subdirectory]]}
+        dirs: Dict[str, list] = {}
+        listed = 0
+        pending = ['']
+        while pending and len(dirs) < self.MAX_DIRS:
+            rel = pending.pop()
+            try:
+                mtime = os.stat(os.path.join(self.root, rel)).st_mtime_ns
+            except OSError:
+                continue
+            entry = cached.get(rel)
+            if entry is None or entry[0] != mtime:
+                entry = self._list(rel, mtime)
+                if entry is None:
+                    continue
+                listed += 1
+            dirs[rel] = entry
+            pending.extend(os.path.join(rel, name)
+                           for name in reversed(entry[2])
+                           if not name.startswith('.')
+                           and name not in self.ignore)
+        if pending:
+            self.logger.warning("Index only %d directories of %s",
+                                len(dirs), self.root)
+        if listed or len(dirs) != len(cached):
+            self._save(dirs)
+
+        index: Dict[str, List[str]] = {}
+        for rel, (_, files, _) in dirs.items():
+            for name in files:
+                index.setdefault(name, []).append(os.path.join(rel, name))
+        self.logger.info("Index %d directories of %s, %d listed in %.3fs",
+                         len(dirs), self.root, listed,
+                         time.perf_counter() - start)
+        return index
+
+    def _list(self, rel: str, mtime: int) -> Optional[list]:
+        files, subdirs = [], []
+        try:
+            with os.scandir(os.path.join(self.root, rel)) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                    else:
+                        files.append(entry.name)
+        except OSError:
+            return None
+        return [mtime, sorted(files), sorted(subdirs)]
+
+    def _load(self) -> Dict[str, list]:
+        try:
+            with open(self.cache_path, encoding='utf-8') as cache:
+                data = json.load(cache)
+            if data.get("root") == self.root:
+                return data.get("dirs", {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError):
+            self.logger.exception("Failed to load the source index")
+        return {}
+
+    def _save(self, dirs: Dict[str, list]):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as cache:
+                json.dump({"root": self.root, "dirs": dirs}, cache,
+                          separators=(',', ':'))
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            self.logger.exception("Failed to save the source index")
@@ -0,0 +1,43 @@
+"""The views of the program state."""
+
+from gdb.common import Common
+from gdb.client import Client
+from gdb.dataquery import DataQuery
+from gdb.frames import Frames
+from gdb.backtrace import Backtrace
+from gdb.locals import Locals
+from gdb.memory import Memory
+from gdb.disassembly import Disassembly
+from gdb.keymaps import Keymaps
+from gdb.win import Win
+from gdb.backend.base import BaseBackend
+
+
+class Views:   # pylint: disable=too-few-public-methods
+    """The views filled by the structured requests to the debugger.
+
+    The editor calls them by the path under the App,
+    for instance 'views.frames.up'.
+    """
+
+    def __init__(self, common: Common, backend: BaseBackend,
+                 data_query: DataQuery, client: Client, win: Win,
+                 keymaps: Keymaps):
+        """ctor."""
+        self.data_query = data_query
+
+        # Initialize the stack frame cache
+        self.frames = Frames(common, backend, data_query, client, win)
+
+        # Initialize the paged backtrace loader
+        self.backtrace = Backtrace(common, backend, self.frames, win)
+
+        # Initialize the local variables panel
+        self.locals = Locals(common, data_query, keymaps)
+
+        # Initialize the memory viewer
+        self.memory = Memory(common, data_query, self.frames, keymaps)
+
+        # Initialize the disassembly window
+        self.disassembly = Disassembly(common, data_query, self.frames,
+                                       keymaps)
@@ -8,13 +8,15 @@ from gdb.cursor import Cursor
 from gdb.client import Client
 from gdb.breakpoint import Breakpoint
 from gdb.keymaps import Keymaps
+from gdb.lazyview import LazyView
+from gdb.pathmgr import PathMgr
 
 
 class Win(Common):
     """Jump window management."""
 
     def __init__(self, common: Common, cursor: Cursor, client: Client,
-                 break_point: Breakpoint, keymaps: Keymaps):
+                 break_point: Breakpoint, keymaps: Keymaps, pathmgr: PathMgr):
         """ctor."""
         super().__init__(common)
         # window number that will be displaying the current file
@@ -23,13 +25,16 @@ class Win(Common):
         self.client = client
         self.breakpoint = break_point
         self.keymaps = keymaps
+        self.pathmgr = pathmgr
         self.buffers = set()
+        self.lazy = LazyView(common)
 
         # Create the default jump window
         self._ensure_jump_window()
 
     def cleanup(self):
         """Cleanup the windows and buffers."""
+        self.lazy.cleanup()
         for buf in self.buffers:
             try:
                 self.vim.command(f"silent bdelete {buf.handle}")
@@ -78,8 +83,10 @@ class Win(Common):
     def jump(self, file: str, line: int):
         """Show the file and the current line in the jump window."""
         self.logger.info("jump(%s:%d)", file, line)
+        # The path may be of the machine the program was built on
+        file = self.pathmgr.locate(file)
         # Check whether the file is already loaded or load it
-        target_buf = self.vim.call("bufnr", file, 1)
+        target_buf = self.pathmgr.get_buffer(file)
 
         # Ensure the jump window is available
         with self._saved_mode():
@@ -93,6 +100,7 @@ class Win(Common):
             with self._saved_win(True):
                 self.vim.current.window = self.jump_win
                 target_buf = self._open_file("noswapfile view " + file)
+                self.pathmgr.set_buffer(file, target_buf)
 
         if self.jump_win.buffer.handle != target_buf:
             with self._saved_mode(), self._saved_win(True):
@@ -100,9 +108,16 @@ class Win(Common):
                     self.vim.current.window = self.jump_win
                 # Hide the current line sign when navigating away.
                 self.cursor.hide()
-                target_buf = self._open_file(f"noswap e {file}")
+                if target_buf in self.lazy.files:
+                    self.vim.command(f"noswapfile buffer {target_buf}")
+                elif self.lazy.is_large(file):
+                    target_buf = self.lazy.open(file)
+                else:
+                    target_buf = self._open_file(f"noswap e {file}")
+                self.pathmgr.set_buffer(file, target_buf)
 
         # Goto the proper line and set the cursor on it
+        self.lazy.on_scroll(target_buf, line, line)
         self.jump_win.cursor = (line, 0)
         self.cursor.set(target_buf, line)
         self.cursor.show()
@@ -127,14 +142,13 @@ class Win(Common):
         buf_num = self.jump_win.buffer.handle
 
         # Get the source code file name
-        fname = self.vim.call("expand", f'#{buf_num}:p')
+        fname = self.pathmgr.get_path(buf_num)
 
         # If no file name or a weird name with spaces, ignore it (to avoid
         # misinterpretation)
         if fname and fname.find(' ') == -1:
             # Query the breakpoints for the shown file
             self.breakpoint.query(buf_num, fname)
-            self.vim.command("redraw")
 
     def lopen(self, cmd, kind, mods):
         """Populate the location list with the result of debugger cmd."""
@@ -145,3 +159,32 @@ class Win(Common):
             lgetexpr = f"lgetexpr GdbCall('get_for_llist', '{kind}', '{cmd}')"
             self.vim.command(lgetexpr)
             self.vim.command(f"exe 'normal <c-o>' | {mods} lopen")
+
+    def lopen_paged(self, title, mods, on_cursor_moved) -> int:
+        """Open an empty location list to be filled page by page.
+
+        The App method on_cursor_moved is notified whenever the cursor
+        moves in the location list window. Returns the list id.
+        """
+        with self._saved_mode(), self._saved_win(False):
+            self._ensure_jump_window()
+            win_id = self.jump_win.handle
+            self.vim.call('setloclist', win_id, [], ' ', {'title': title})
+            list_id = self.vim.call('getloclist', win_id, {'id': 0})['id']
+            if self.jump_win != self.vim.current.window:
+                self.vim.current.window = self.jump_win
+            self.vim.command(f"{mods} lopen")
+            self.vim.command("augroup NvimGdbLlist"
+                             " | autocmd! * <buffer>"
+                             " | autocmd CursorMoved <buffer> call"
+                             f" GdbCallAsync('{on_cursor_moved}',"
+                             " line('.'), line('$'))"
+                             " | augroup END")
+        return list_id
+
+    def ladd(self, list_id, items):
+        """Append items to the location list of the jump window."""
+        if not self._has_jump_win():
+            return
+        self.vim.call('setloclist', self.jump_win.handle, [], 'a',
+                      {'id': list_id, 'items': items})
@@ -0,0 +1,43 @@
+"""Background thread of a debugging session."""
+
+import queue
+import threading
+from gdb.common import Common
+
+
+class Worker(Common):
+    """Execute the blocking work of a session off the editor thread.
+
+    Every session has its own worker, so a slow side channel or a huge
+    chunk of the debugger output in one tabpage doesn't delay the other
+    sessions. The jobs are executed in the order of submission. They
+    mustn't call the editor directly, use vim.async_call() instead.
+    """
+
+    def __init__(self, common: Common, name: str):
+        """ctor."""
+        super().__init__(common)
+        self.queue: queue.Queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name=name,
+                                       daemon=True)
+        self.thread.start()
+
+    def cleanup(self):
+        """Stop the thread after the pending jobs."""
+        self.queue.put(None)
+
+    def submit(self, func, *args):
+        """Schedule func(*args) in the worker thread."""
+        self.queue.put((func, args))
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                break
+            func, args = job
+            # pylint: disable=broad-except
+            try:
+                func(*args)
+            except Exception:
+                self.logger.exception("Job %s failed", func)
@@ -1,5 +1,7 @@
 '''Test generic operation.'''
 
+import re
+
 
 def test_smoke(eng, backend):
     '''Smoke.'''
@@ -120,3 +122,134 @@ def test_navigate(eng, backend):
 
     eng.feed('<f10>')
     assert eng.wait_signs({'cur': 'lib.hpp:8'}) is None
+
+
+def test_memory(eng, backend):
+    '''Memory viewer reads the visible pages.'''
+    eng.feed(backend['launch'])
+    assert eng.wait_paused() is None
+    eng.feed(backend['tbreak_main'])
+    eng.feed('run\n')
+    eng.feed('<esc>')
+    assert eng.wait_signs({'cur': 'test.cpp:17'}) is None
+
+    eng.feed(':GdbMemory &argc\n')
+
+    def _row():
+        return eng.eval("getline('.')")
+
+    def _is_read(row):
+        return re.fullmatch(r'[0-9a-f]{16}: ([0-9a-f]{2} ){15}[0-9a-f]{2}'
+                            r'  .{16}', row) is not None
+    assert eng.wait_for(_row, _is_read) is None
+    assert eng.eval("bufname('%')").startswith('Memory')
+
+
+def test_disassembly(eng, backend):
+    '''Disassembly follows the pc reusing the cached functions.'''
+    eng.feed(backend['launch'])
+    assert eng.wait_paused() is None
+    eng.feed(backend['tbreak_main'])
+    eng.feed('run\n')
+    eng.feed('<esc>')
+    assert eng.wait_signs({'cur': 'test.cpp:17'}) is None
+
+    eng.feed(':GdbDisassembly\n')
+
+    def _cached():
+        return eng.eval("GdbTestPeek('views', 'disassembly', 'cache', '__len__')")
+    assert eng.wait_for(_cached, lambda r: r == 1) is None
+    assert eng.eval("getbufline(bufnr('Disassembly'), 1)[0]") \
+        .startswith('0x')
+
+    # Stepping inside main doesn't disassemble it again.
+    eng.feed('<f10>')
+    assert eng.wait_signs({'cur': 'test.cpp:19'}) is None
+    eng.feed('<f11>')
+    assert eng.wait_signs({'cur': 'test.cpp:10'}) is None
+    assert eng.wait_for(_cached, lambda r: r == 2) is None
+    eng.feed('<f12>')
+    eng.feed('<f10>')
+    assert eng.wait_for(eng.get_signs,
+                        lambda s: s.get('cur', '').startswith('test.cpp:1')) \
+        is None
+    assert _cached() == 2
+
+
+def test_profile(eng, backend):
+    '''The stages of the steps are timed.'''
+    eng.feed(backend['launch'])
+    assert eng.wait_paused() is None
+    eng.feed(backend['tbreak_main'])
+    eng.feed('run\n')
+    eng.feed('<esc>')
+    assert eng.wait_signs({'cur': 'test.cpp:17'}) is None
+
+    eng.feed('<f10>')
+    assert eng.wait_signs({'cur': 'test.cpp:19'}) is None
+    eng.feed('<f11>')
+    assert eng.wait_signs({'cur': 'test.cpp:10'}) is None
+
+    def _stats():
+        return eng.eval('GdbTestPeek("profiler", "stats")')
+
+    assert eng.wait_for(
+        _stats,
+        lambda stats: stats and stats['send']['steps'] == 2
+        and stats['jump']['steps'] == 2) is None
+    stats = _stats()
+    assert stats['total']['p50'] >= stats['jump']['p50']
+
+
+def test_lazy_view(eng, backend):
+    '''Verify that a large file is shown lazily with the real lines.'''
+    eng.exe("let g:nvimgdb_lazy_view_threshold = 1")
+    try:
+        eng.feed(backend['launch'])
+        assert eng.wait_paused() is None
+        eng.feed(backend['break_bar'])
+        eng.feed(backend['tbreak_main'])
+        eng.feed('run\n')
+        eng.feed('<esc>')
+        assert eng.wait_signs({'cur': 'test.cpp:17',
+                               'break': {1: [5]}}) is None
+        eng.feed('<c-w>w')
+        assert eng.eval("&buftype") == 'nofile'
+        assert eng.eval("line('$')") == len(eng.eval("readfile(@%)"))
+        assert eng.eval("getline(17)") == eng.eval("readfile(@%)[16]")
+    finally:
+        eng.exe("unlet g:nvimgdb_lazy_view_threshold")
+
+
+def test_source_map(eng, backend):
+    '''Verify that the paths of the build machine are found locally.'''
+    eng.feed(backend['launch'])
+    assert eng.wait_paused() is None
+    expected = eng.eval("resolve(fnamemodify('src/test.cpp', ':p'))")
+    # The workspace is indexed in the background
+    assert eng.wait_for(
+        lambda: eng.eval("GdbCall('pathmgr.resolve',"
+                         " '/build/nvim-gdb/test/src/test.cpp')"),
+        lambda res: res == expected) is None
+
+
+def test_source_map_ambiguous(eng, backend, tmp_path):
+    '''Verify that only the files sharing the directory are taken.'''
+    for path in ["a/util.c", "b/util.c", "lib/unique.c"]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("")
+    eng.feed(backend['launch'])
+    assert eng.wait_paused() is None
+    eng.exe(f"cd {tmp_path}")
+    try:
+        def _resolve(path):
+            return eng.eval(f"GdbCall('pathmgr.resolve', '{path}')")
+        workspace = str(tmp_path.resolve())
+        assert eng.wait_for(lambda: _resolve("/build/a/util.c"),
+                            lambda res: res == f"{workspace}/a/util.c") \
+            is None
+        assert _resolve("/build/z/unique.c") == f"{workspace}/lib/unique.c"
+        # The same name in another directory is left as is
+        assert _resolve("/build/c/util.c") == "/build/c/util.c"
+    finally:
+        eng.exe("cd -")
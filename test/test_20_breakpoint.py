@@ -3,6 +3,7 @@
 import os
 import tempfile
 import pytest
+import config
 
 
 def test_detect(eng, backend):
@@ -94,3 +95,133 @@ def test_duplicate(eng, backend):
     assert eng.wait_signs({'cur': 'test.cpp:17', 'break': {1: [17]}}) is None
     eng.feed("<f8>")
     assert eng.wait_signs({'cur': 'test.cpp:17'}) is None
+
+
+def test_persist(eng, backend):
+    '''Verify that breakpoints are restored in the next session.'''
+    eng.exe("let g:nvimgdb_persist_breakpoints = 1")
+    try:
+        eng.feed(backend['launch'])
+        assert eng.wait_paused() is None
+        eng.feed(backend['break_bar'])
+        eng.feed("<esc>:wincmd w<cr>")
+        eng.feed(":e src/test.cpp\n")
+        eng.feed(":10<cr>")
+        eng.feed("<f8>")
+        assert eng.wait_signs({'break': {1: [5, 10]}}) is None
+        eng.exe("GdbDebugStop")
+
+        eng.feed(backend['launch'])
+        assert eng.wait_paused() is None
+        eng.feed("<esc>:wincmd w<cr>")
+        eng.feed(":e src/test.cpp\n")
+        assert eng.wait_signs({'break': {1: [5, 10]}}) is None
+        # Leave nothing to restore for the following tests
+        eng.feed(":GdbBreakpointClearAll\n")
+        assert eng.wait_signs({}) is None
+    finally:
+        eng.exe("unlet g:nvimgdb_persist_breakpoints")
+
+
+def test_persist_quit(eng, backend):
+    '''Verify that breakpoints are saved when the debugger quits.'''
+    eng.exe("let g:nvimgdb_persist_breakpoints = 1")
+    try:
+        eng.feed(backend['launch'])
+        assert eng.wait_paused() is None
+        eng.feed("<esc>:wincmd w<cr>")
+        eng.feed(":e src/test.cpp\n")
+        eng.feed(":10<cr>")
+        eng.feed("<f8>")
+        assert eng.wait_signs({'break': {1: [10]}}) is None
+        # The session ends when the debugger terminal is closed
+        eng.feed("<c-w>w")
+        eng.feed("iquit\n")
+        assert eng.wait_for(lambda: eng.eval("tabpagenr('$')"),
+                            lambda res: res == 1) is None
+
+        eng.feed(backend['launch'])
+        assert eng.wait_paused() is None
+        eng.feed("<esc>:wincmd w<cr>")
+        eng.feed(":e src/test.cpp\n")
+        assert eng.wait_signs({'break': {1: [10]}}) is None
+        eng.feed(":GdbBreakpointClearAll\n")
+        assert eng.wait_signs({}) is None
+    finally:
+        eng.exe("unlet g:nvimgdb_persist_breakpoints")
+
+
+def test_toggle_range(eng, backend):
+    '''Verify that breakpoints are toggled in a range and by a pattern.'''
+    eng.feed(backend['launch'])
+    assert eng.wait_paused() is None
+    eng.feed(backend['break_bar'])
+    eng.feed("<esc>:wincmd w<cr>")
+    eng.feed(":e src/test.cpp\n")
+    assert eng.wait_signs({'break': {1: [5]}}) is None
+
+    eng.feed(":10,12GdbBreakpointToggle\n")
+    assert eng.wait_signs({'break': {1: [5, 10, 11, 12]}}) is None
+    eng.feed(":10,11GdbBreakpointToggle\n")
+    assert eng.wait_signs({'break': {1: [5, 12]}}) is None
+
+    eng.feed(":GdbBreakpointPattern! /return/\n")
+    assert eng.wait_signs({}) is None
+    eng.feed(":GdbBreakpointPattern /return/\n")
+    assert eng.wait_signs({'break': {1: [5, 11, 12, 23]}}) is None
+
+
+def test_disable(eng, backend):
+    '''Verify that breakpoints are disabled and enabled again.'''
+    eng.feed(backend['launch'])
+    assert eng.wait_paused() is None
+    eng.feed(backend['break_bar'])
+    eng.feed("<esc>:wincmd w<cr>")
+    eng.feed(":e src/test.cpp\n")
+    eng.feed(":10<cr>")
+    eng.feed("<f8>")
+    assert eng.wait_signs({'break': {1: [5, 10]}}) is None
+
+    eng.feed(":GdbBreakpointDisable\n")
+    assert eng.wait_signs({'break': {1: [5]}}) is None
+    eng.feed(":GdbBreakpointEnable 2\n")
+    assert eng.wait_signs({'break': {1: [5, 10]}}) is None
+    eng.feed(":GdbBreakpointDisable 1 2\n")
+    assert eng.wait_signs({}) is None
+
+
+def test_resolved_line(eng, backend):
+    '''Verify that the sign follows the line the debugger resolved.'''
+    eng.feed(backend['launch'])
+    assert eng.wait_paused() is None
+    eng.feed("<esc>:wincmd w<cr>")
+    eng.feed(":e src/test.cpp\n")
+    # There is no code in the empty line 14
+    eng.feed(":14<cr>")
+    eng.feed("<f8>")
+
+    def _resolved(signs):
+        lines = signs.get('break', {}).get(1, [])
+        return len(lines) == 1 and lines[0] > 14
+    assert eng.wait_for(eng.get_signs, _resolved) is None
+
+
+@pytest.mark.skipif("lldb" not in config.BACKEND_NAMES,
+                    reason="requires lldb")
+def test_lldb_events(eng, post):
+    '''Verify that the LLDB index follows the commands in the terminal.'''
+    assert post
+    eng.feed(' dl\n')
+    assert eng.wait_paused() is None
+    eng.feed('breakpoint set --fullname Bar\n')
+    eng.feed('breakpoint set -n main\n')
+    eng.feed('run\n')
+    assert eng.wait_signs({'cur': 'test.cpp:17',
+                           'break': {1: [5, 17]}}) is None
+
+    eng.feed('breakpoint disable 1\n')
+    assert eng.wait_signs({'cur': 'test.cpp:17', 'break': {1: [17]}}) is None
+    eng.feed('breakpoint delete 2\n')
+    assert eng.wait_signs({'cur': 'test.cpp:17'}) is None
+    eng.feed('breakpoint enable 1\n')
+    assert eng.wait_signs({'cur': 'test.cpp:17', 'break': {1: [5]}}) is None
@@ -129,3 +129,58 @@ def test_expand(eng, post):
     assert eng.wait_signs({'cur': 'main.py:1'}) is None
     # Clean up the main tabpage
     eng.feed('<esc>gt:new\n<c-w>ogt')
+
+
+def test_frame_cache(eng, post, terminal_end):
+    '''Frame navigation uses the frames cached for the current stop.'''
+    assert post
+    assert terminal_end
+    eng.feed(' dp')
+    eng.feed('\n', 1000)
+    eng.feed('tbreak _main\n')
+    eng.feed('cont\n')
+    eng.feed('<esc>')
+    assert eng.wait_signs({'cur': 'main.py:15'}) is None
+    eng.feed('<f10>')
+    assert eng.wait_signs({'cur': 'main.py:16'}) is None
+    eng.feed('<f11>')
+    assert eng.wait_signs({'cur': 'main.py:8'}) is None
+
+    def _selected():
+        return eng.eval("GdbTestPeek('views', 'frames', 'selected')")
+
+    eng.feed('<c-p>')
+    assert eng.wait_signs({'cur': 'main.py:16'}) is None
+    assert eng.wait_for(_selected, lambda r: r == 1) is None
+    eng.feed('<c-n>')
+    assert eng.wait_signs({'cur': 'main.py:8'}) is None
+    assert eng.wait_for(_selected, lambda r: r == 0) is None
+
+    # The next stop drops the cache
+    eng.feed('<f10>')
+    assert eng.wait_signs({'cur': 'main.py:9'}) is None
+    assert eng.wait_for(_selected, lambda r: r is None) is None
+
+
+def test_locals(eng, post, terminal_end):
+    '''The locals panel shows the top-level values of the frame.'''
+    assert post
+    assert terminal_end
+    eng.feed(' dp')
+    eng.feed('\n', 1000)
+    eng.feed('tbreak _main\n')
+    eng.feed('cont\n')
+    eng.feed('<esc>')
+    assert eng.wait_signs({'cur': 'main.py:15'}) is None
+    eng.feed('<f10>')
+    assert eng.wait_signs({'cur': 'main.py:16'}) is None
+
+    eng.feed(':GdbLocals\n')
+
+    def _lines():
+        return eng.eval("getbufline(bufnr('Locals'), 1, '$')")
+    assert eng.wait_for(_lines, lambda r: r == ['  i = 0']) is None
+    eng.feed('<f10>')
+    eng.feed('<f10>')
+    assert eng.wait_signs({'cur': 'main.py:16'}) is None
+    assert eng.wait_for(_lines, lambda r: r == ['  i = 1']) is None
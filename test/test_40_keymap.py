@@ -101,3 +101,38 @@ def test_overall(eng, keymap):
     assert res == 0
     key = eng.eval('get(GdbTestPeekConfig(), "key_step", 0)')
     assert key == '<f5>'
+
+
+def test_reconfigure(eng, keymap):
+    '''The configuration is resolved again when a variable changes.'''
+    assert keymap
+    eng.exe("let g:nvimgdb_key_next = '<f3>'")
+    _launch(eng)
+    assert eng.eval('get(GdbTestPeekConfig(), "key_next", 0)') == '<f3>'
+    eng.exe("GdbDebugStop")
+    eng.exe("let g:nvimgdb_key_next = '<f2>'")
+    _launch(eng)
+    assert eng.eval('get(GdbTestPeekConfig(), "key_next", 0)') == '<f2>'
+
+
+def test_jump_buffers(eng, backend):
+    '''The keymaps follow the buffer shown in the jump window.'''
+    eng.feed(backend['launch'])
+    assert eng.wait_paused() is None
+
+    def _mapped(buf):
+        return eng.eval(f"len(filter(nvim_buf_get_keymap(bufnr('{buf}'),"
+                        " 'n'), {_, m -> m.rhs =~# 'GdbNext'}))")
+
+    eng.feed('<esc><c-w>w')
+    eng.feed(":e src/test.cpp\n")
+    assert _mapped('test.cpp') == 1
+    # Visiting the terminal keeps the keymaps of the jump window
+    eng.feed('<c-w>w')
+    assert _mapped('test.cpp') == 1
+    eng.feed('<c-w>w')
+    assert _mapped('test.cpp') == 1
+    # Replacing the buffer in the jump window drops them
+    eng.feed(":e src/lib.hpp\n")
+    assert _mapped('lib.hpp') == 1
+    assert _mapped('test.cpp') == 0
@@ -49,3 +49,19 @@ def test_watch_backend(eng, backend_express):
     eng.feed(':GdbNext\n')
     eng.wait_for(lambda: eng.eval(f"getbufline('{cmd}', 1)"),
             lambda out: out == res)
+
+
+def test_dump_log(eng, post, tmp_path):
+    '''The log records kept in memory are dumped on demand.'''
+    assert post
+    eng.feed(' dp\n')
+    assert eng.wait_paused() is None
+    eng.feed('<esc>')
+    eng.feed(':GdbLogLevel DEBUG\n')
+    path = tmp_path / "dump.log"
+    eng.feed(f':GdbDumpLog {path}\n')
+    assert path.read_text()
+    assert "Starting proxy" in \
+        (tmp_path / f"dump.log.proxy{eng.eval('nvim_get_current_tabpage()')}"
+         ).read_text()
+    eng.feed(':GdbLogLevel INFO\n')
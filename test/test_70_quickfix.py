@@ -144,3 +144,31 @@ def test_bt_bashdb(eng, post):
     assert eng.eval("line('.')") == 18
     eng.feed(':lnext\n')
     assert eng.eval("line('.')") == 22
+
+
+def test_bt_paged_backend(eng, backend):
+    '''Backtrace location list is loaded page by page.'''
+    eng.exe("let g:nvimgdb_backtrace_page_size = 1")
+    try:
+        eng.feed(backend['launch'])
+        assert eng.wait_paused() is None
+        eng.feed('b Bar\n')
+        eng.feed('run\n')
+        assert eng.wait_signs({'cur': 'test.cpp:5', 'break': {1: [5]}}) \
+            is None
+        eng.feed('<esc>')
+        eng.feed(':GdbLopenBacktrace\n')
+
+        def _loaded():
+            return eng.eval("GdbTestPeek('views', 'backtrace', 'loaded')")
+        assert eng.wait_for(_loaded, lambda r: r == 1) is None
+        # Entering the location list window requests the next page
+        eng.feed(':lopen\n')
+        assert eng.wait_for(_loaded, lambda r: r == 2) is None
+        eng.feed('G')
+        assert eng.wait_for(_loaded, lambda r: r == 3) is None
+        lines = [item['lnum'] for item in eng.eval("getloclist(0)")]
+        assert lines[:3] == [5, 12, 19]
+        eng.feed('<c-w>p')
+    finally:
+        eng.exe("unlet g:nvimgdb_backtrace_page_size")